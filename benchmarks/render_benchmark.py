@@ -0,0 +1,52 @@
+"""Rendering benchmark for ipy_table.
+
+Times IpyTable._repr_html_() for a large numeric table and a large text
+table (with and without HTML escaping).  Run from the project root:
+
+    python benchmarks/render_benchmark.py [num_rows]
+"""
+
+from __future__ import print_function
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ipy_table import IpyTable
+
+
+def _numeric_table(num_rows):
+    random.seed(0)
+    return IpyTable(
+        [['float', 'int', 'ratio', 'count']] +
+        [[random.random() * 1000, random.randint(0, 10 ** 6),
+          random.random(), row] for row in range(num_rows)])
+
+
+def _text_table(num_rows):
+    random.seed(0)
+    words = ['ok', 'warning', 'a & b', '<none>', 'status "ok"', 'id']
+    return IpyTable(
+        [['name', 'status', 'note', 'id']] +
+        [['name %d' % row, random.choice(words), random.choice(words),
+          'id%d' % (row % 50)] for row in range(num_rows)])
+
+
+def _time(table, repeat=3):
+    return min(timeit.repeat(table._repr_html_, number=1, repeat=repeat))
+
+
+def main(num_rows=20000):
+    numeric = _numeric_table(num_rows)
+    text = _text_table(num_rows)
+    print('numeric table, %d rows: %.3fs' % (num_rows, _time(numeric)))
+    print('text table, %d rows:    %.3fs' % (num_rows, _time(text)))
+    text.set_global_style(escape=False)
+    print('text table, no escape:  %.3fs' % _time(text))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,14 +1,26 @@
-from .ipy_table import (IpyTable, 
+from .ipy_table import (IpyTable, Style,
     tabulate, make_table, set_cell_style, set_column_style,
     set_row_style, set_global_style, apply_theme,
-    render, get_interactive_return_value
+    render, get_interactive_return_value, session
     )
 
+from .html_cache import (HtmlCache,
+    enable_html_cache, disable_html_cache, html_cache_info
+    )
+from .progressive import display_progressive
+from .ring_table import RingTable
+from .templates import TableTemplate
 from .vector_manager import VectorManager
+from .views import TableView, vstack, hstack, concat
+from .virtual_scroll import VirtualTable
 from .version import __version__
 
-__all__ = ('IpyTable', 'VectorManager',
+__all__ = ('IpyTable', 'RingTable', 'TableView', 'VirtualTable',
+    'VectorManager', 'Style', 'TableTemplate',
+    'HtmlCache',
     'tabulate', 'make_table', 'set_cell_style', 'set_column_style',
     'set_row_style', 'set_global_style', 'apply_theme',
-    'render', 'get_interactive_return_value'
+    'render', 'get_interactive_return_value', 'session',
+    'enable_html_cache', 'disable_html_cache', 'html_cache_info',
+    'display_progressive', 'vstack', 'hstack', 'concat'
     )
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""python -m ipy_table: batch rendering of table files (see cli.py)."""
+
+import sys
+
+from .cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Asyncio rendering of IpyTable objects.
+
+Large tables can take seconds to render.  The coroutines in this module
+render a table a chunk of rows at a time, yielding control to the event
+loop between chunks (and optionally rendering the chunks in an executor)
+so that rendering a single large table does not stall other tasks.
+
+This module requires Python 3.6+ and is imported lazily by
+IpyTable.render_async() and IpyTable.iter_html_async().
+"""
+
+import asyncio
+
+
+async def iter_html_async(table, chunk_rows=100, executor=None):
+    """Asynchronous iterator of the HTML chunks of an IpyTable.
+
+    Yields the same chunks as table.iter_html(chunk_rows).
+    """
+    loop = asyncio.get_event_loop()
+    yield table._TABLE_OPEN_HTML
+    for start in range(0, table._num_rows, chunk_rows):
+        stop = min(start + chunk_rows, table._num_rows)
+        if executor is None:
+            # Give other tasks a chance to run between chunks
+            await asyncio.sleep(0)
+            html = table._render_rows_html(start, stop)
+        else:
+            html = await loop.run_in_executor(
+                executor, table._render_rows_html, start, stop)
+        yield html
+    yield '</table>'
+
+
+async def render_async(table, chunk_rows=100, executor=None):
+    """Returns the HTML representation of an IpyTable.
+
+    The result is identical to table._repr_html_().
+    """
+    chunks = []
+    async for chunk in iter_html_async(table, chunk_rows, executor):
+        chunks.append(chunk)
+    return ''.join(chunks)
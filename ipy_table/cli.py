@@ -0,0 +1,277 @@
+"""Command line batch rendering of tables (python -m ipy_table).
+
+Renders table files to HTML (or serialized IpyTables), in parallel across
+a pool of worker processes:
+
+    python -m ipy_table data1.csv data2.json data3.npy --style style.json
+    python -m ipy_table --manifest reports.json --jobs 8 -o out/
+
+Inputs:
+    .csv    Comma (.tsv: tab) separated values, with a header row (see
+            IpyTable.from_csv(); column types are inferred).
+    .json   A list of rows (lists), or a list of records (objects, whose
+            keys become the header row).
+    .npy    A numpy array (requires numpy), memory-mapped and rendered a
+            block of rows at a time.
+
+A manifest is a JSON list of inputs, each either a path or an object
+{"input": path, "output": path, "style": spec}, where output and style
+(a style spec, or the path of one) are optional.  Relative paths are
+relative to the manifest.
+
+A style spec is a JSON object of optional entries, applied in this order:
+    "theme": theme name (see IpyTable.themes)
+    "global": style arguments of all cells
+    "columns": {column: style arguments}
+    "rows": {row: style arguments}
+    "cells": [[row, column, style arguments], ...]
+    "formatters": {column: format spec} (see set_column_formatter())
+    "summary": add_summary_row() arguments (e.g. {"funcs": {"qty":
+        "sum"}, "label": "Total"})
+Columns are column numbers or header row labels.
+
+Each file is written in chunks of rows as it is rendered (to a temporary
+file, renamed to the output file when it is complete), a line is
+printed as each file is done, and throughput statistics are printed at
+the end.  The exit status is 1 if any input failed.
+"""
+
+from __future__ import print_function
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from six import string_types
+
+from .ipy_table import IpyTable
+
+FORMATS = {
+    'html': '.html',
+    'ipyt': '.ipyt',
+}
+
+
+def main(argv=None):
+    """Command line entry point.  Returns the exit status."""
+    args = _parse_args(argv)
+    try:
+        jobs = _make_jobs(args)
+    except (IOError, OSError, ValueError) as error:
+        print('error: %s' % error, file=sys.stderr)
+        return 2
+    if not jobs:
+        print('error: no inputs', file=sys.stderr)
+        return 2
+    if args.output_dir and not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    start_time = time.time()
+    totals = dict(files=0, failed=0, rows=0, cells=0, bytes=0)
+    num_processes = min(args.jobs or multiprocessing.cpu_count(), len(jobs))
+    if num_processes > 1:
+        pool = multiprocessing.Pool(num_processes)
+        try:
+            for result in pool.imap_unordered(render_file, jobs):
+                _report(result, totals)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for job in jobs:
+            _report(render_file(job), totals)
+
+    elapsed = max(time.time() - start_time, 1e-9)
+    print('%d file(s) (%d failed), %d rows, %d cells, %.1f MB in %.2fs: '
+          '%.1f files/s, %.0f rows/s, %.1f MB/s' % (
+              totals['files'], totals['failed'], totals['rows'],
+              totals['cells'], totals['bytes'] / 1e6, elapsed,
+              totals['files'] / elapsed, totals['rows'] / elapsed,
+              totals['bytes'] / 1e6 / elapsed))
+    return 1 if totals['failed'] else 0
+
+
+def render_file(job):
+    """Render one input file (in a worker process).
+
+    job is a dictionary of input, output, style (spec or None), format and
+    chunk_rows.  Returns a dictionary of the job input and output, rows,
+    cells, bytes, seconds and error (None, or the error message).
+    """
+    start_time = time.time()
+    result = dict(input=job['input'], output=job['output'], rows=0,
+                  cells=0, bytes=0, error=None)
+    # Failed jobs leave no (partial) output file
+    temp_path = '%s.%d.tmp' % (job['output'], os.getpid())
+    try:
+        table = load_table(job['input'])
+        if job['style']:
+            apply_style_spec(table, job['style'])
+        try:
+            if job['format'] == 'ipyt':
+                with open(temp_path, 'wb') as output_file:
+                    output_file.write(table.to_bytes())
+            else:
+                table.write_html(temp_path, chunk_rows=job['chunk_rows'])
+            _replace(temp_path, job['output'])
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        result['rows'] = table._num_rows
+        result['cells'] = table._num_rows * table._num_columns
+        result['bytes'] = os.path.getsize(job['output'])
+    except Exception as error:
+        result['error'] = '%s: %s' % (type(error).__name__, error)
+    result['seconds'] = time.time() - start_time
+    return result
+
+
+def load_table(path):
+    """Returns an IpyTable of a .csv, .tsv, .json or .npy file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.csv', '.tsv'):
+        return IpyTable.from_csv(path)
+    if extension == '.json':
+        with io.open(path, encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        if not isinstance(data, list) or not data:
+            raise ValueError('%s: expected a list of rows or records.' % path)
+        if isinstance(data[0], dict):
+            header = list(data[0])
+            data = [header] + [[record.get(key, '') for key in header]
+                               for record in data]
+        return IpyTable(data)
+    if extension == '.npy':
+        import numpy
+        return IpyTable(numpy.load(path, mmap_mode='r'))
+    raise ValueError('%s: unsupported input type (expected .csv, .tsv, '
+                     '.json or .npy).' % path)
+
+
+def apply_style_spec(table, spec):
+    """Apply a style spec (see the module documentation) to a table."""
+    unknown = set(spec) - set(['theme', 'global', 'columns', 'rows',
+                               'cells', 'formatters', 'summary'])
+    if unknown:
+        raise ValueError('Unknown style spec entries: %s.' %
+                         ', '.join(sorted(unknown)))
+    if 'theme' in spec:
+        table.apply_theme(spec['theme'])
+    if 'global' in spec:
+        table.set_global_style(**spec['global'])
+    for column, style_args in spec.get('columns', {}).items():
+        table.set_column_style(_spec_column(table, column), **style_args)
+    for row, style_args in spec.get('rows', {}).items():
+        table.set_row_style(int(row), **style_args)
+    for row, column, style_args in spec.get('cells', []):
+        table.set_cell_style(int(row), _spec_column(table, column),
+                             **style_args)
+    for column, fn_or_spec in spec.get('formatters', {}).items():
+        table.set_column_formatter(_spec_column(table, column), fn_or_spec)
+    if 'summary' in spec:
+        summary = dict(spec['summary'])
+        summary['funcs'] = dict(
+            [(_spec_column(table, column), func)
+             for column, func in summary.get('funcs', {}).items()])
+        table.add_summary_row(**summary)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m ipy_table',
+        description='Render table files (.csv, .tsv, .json, .npy) to HTML.')
+    parser.add_argument('inputs', nargs='*', metavar='INPUT',
+                        help='input files')
+    parser.add_argument('-m', '--manifest',
+                        help='JSON list of inputs (see module docs)')
+    parser.add_argument('-s', '--style',
+                        help='JSON style spec applied to every input')
+    parser.add_argument('-o', '--output-dir',
+                        help='output directory (default: next to inputs)')
+    parser.add_argument('-f', '--format', choices=sorted(FORMATS),
+                        default='html', help='output format')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-rows', type=int, default=1000,
+                        help='rows rendered per written chunk')
+    return parser.parse_args(argv)
+
+
+def _make_jobs(args):
+    """Returns the list of render_file() jobs of the arguments."""
+    style = _load_json(args.style) if args.style else None
+    entries = [dict(input=path) for path in args.inputs]
+    if args.manifest:
+        manifest_dir = os.path.dirname(args.manifest)
+        manifest = _load_json(args.manifest)
+        if not isinstance(manifest, list):
+            raise ValueError('%s: expected a list of inputs.' % args.manifest)
+        for entry in manifest:
+            if not isinstance(entry, dict):
+                entry = dict(input=entry)
+            entry = dict(entry)
+            for key in ('input', 'output', 'style'):
+                if isinstance(entry.get(key), string_types):
+                    entry[key] = os.path.join(manifest_dir, entry[key])
+            if isinstance(entry.get('style'), string_types):
+                entry['style'] = _load_json(entry['style'])
+            entries.append(entry)
+
+    jobs = []
+    for entry in entries:
+        output = entry.get('output')
+        if output is None:
+            output = os.path.splitext(entry['input'])[0] + \
+                FORMATS[args.format]
+            if args.output_dir:
+                output = os.path.join(args.output_dir,
+                                      os.path.basename(output))
+        jobs.append(dict(input=entry['input'], output=output,
+                         style=entry.get('style', style),
+                         format=args.format, chunk_rows=args.chunk_rows))
+    return jobs
+
+
+def _report(result, totals):
+    """Print the result of a render_file() job, and add it to totals."""
+    totals['files'] += 1
+    if result['error']:
+        totals['failed'] += 1
+        print('FAILED %s: %s' % (result['input'], result['error']),
+              file=sys.stderr)
+        return
+    for key in ('rows', 'cells', 'bytes'):
+        totals[key] += result[key]
+    print('%s -> %s (%d rows, %.2fs)' % (result['input'], result['output'],
+                                        result['rows'], result['seconds']))
+    sys.stdout.flush()
+
+
+def _replace(source, destination):
+    """Rename source to destination, replacing it if it exists."""
+    if hasattr(os, 'replace'):
+        os.replace(source, destination)
+    else:
+        # (Python 2: rename replaces existing files except on Windows)
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def _load_json(path):
+    with io.open(path, encoding='utf-8') as json_file:
+        return json.load(json_file)
+
+
+def _spec_column(table, column):
+    """Returns the column number of a style spec column key."""
+    try:
+        column = int(column)
+    except ValueError:
+        pass
+    return table._column_index(column)
@@ -0,0 +1,298 @@
+"""CSV / TSV input (see IpyTable.from_csv()).
+
+Files are parsed incrementally, a block of rows at a time.  The type of
+every column (int, float or text) is inferred from the first block of
+rows (the sample), and the column is converted to it a block at a time.
+A later value which does not fit the column type is converted on its own
+(to int, float or text, see _parse()), so the value of a cell never
+depends on the rows read with it: a CsvStream renders the same HTML as
+the whole table.  Empty values of numeric columns are missing values,
+read as NULL (empty text).
+
+Whole tables store numeric columns as typed arrays (see _ColumnarRows),
+with a set of missing rows if some values are empty (see _MaskedColumn).
+A column with values which do not fit its type is stored as a list.  A
+CsvStream renders a file to HTML a block of rows at a time, without ever
+holding the whole table (see streaming.py).
+"""
+
+import csv
+import io
+import itertools
+import re
+from array import array
+
+from six import string_types
+
+from .ipy_table import _ColumnarRows
+from .streaming import TableStream
+
+# Column types, in downgrade order
+INT, FLOAT, TEXT = 'int', 'float', 'text'
+
+_TYPECODES = {INT: 'q', FLOAT: 'd'}
+
+# Numbers in canonical form only: text like '007' (a code), '1_000' or
+# ' 5' would not read back as the same text, so it is kept as text
+_INT_RE = re.compile(r'-?(?:0|[1-9][0-9]*)\Z')
+_FLOAT_RE = re.compile(
+    r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?\Z')
+
+
+def _parse_int(text):
+    """Returns the int value of text (ValueError if not a canonical int)."""
+    if not _INT_RE.match(text):
+        raise ValueError('Not an int: %r.' % text)
+    return int(text)
+
+
+def _parse_float(text):
+    """Returns the float value of text (ValueError if not canonical)."""
+    if not _FLOAT_RE.match(text):
+        raise ValueError('Not a float: %r.' % text)
+    return float(text)
+
+
+_PARSERS = {INT: _parse_int, FLOAT: _parse_float}
+
+# Value of missing (empty) numeric values
+NULL = ''
+
+
+def read_csv(path_or_file, delimiter=None, header=True, sample_rows=1000,
+             encoding='utf-8', **fmtparams):
+    """Returns the (header row, columns) of a CSV file.
+
+    Columns are typed arrays (numeric columns) or lists (text columns).
+    See IpyTable.from_csv() for the arguments.
+    """
+    header_row = None
+    columns = None
+    for block_header, block_columns in _iter_blocks(
+            path_or_file, delimiter, header, sample_rows, sample_rows,
+            encoding, fmtparams):
+        if block_header is not None:
+            header_row = block_header
+        if columns is None:
+            columns = block_columns
+            continue
+        for column, values in enumerate(block_columns):
+            columns[column] = _extend_column(columns[column], values)
+    if columns is None:
+        raise ValueError('CSV input has no rows.')
+    return header_row, columns
+
+
+class CsvStream(TableStream):
+    """A CSV file rendered to HTML a block of rows at a time.
+
+    Returned by IpyTable.from_csv(..., stream=True) (see TableStream).
+    Files given by path are re-read by each iter_html() / write_html();
+    a file object can only be rendered once.
+    """
+
+    def __init__(self, path_or_file, delimiter=None, header=True,
+                 sample_rows=1000, encoding='utf-8', **fmtparams):
+        TableStream.__init__(self)
+        self._source = (path_or_file, delimiter, header, sample_rows,
+                        encoding, fmtparams)
+
+    def _iter_block_rows(self, chunk_rows):
+        path_or_file, delimiter, header, sample_rows, encoding, fmtparams = \
+            self._source
+        for block in _iter_blocks(path_or_file, delimiter, header,
+                                  sample_rows, chunk_rows, encoding,
+                                  fmtparams):
+            yield _block_rows(block)
+
+
+def _block_rows(block):
+    """Returns the rows (lists) of an _iter_blocks() block."""
+    header_row, columns = block
+    rows = [list(row_data) for row_data in zip(*columns)]
+    if header_row is not None:
+        rows.insert(0, header_row)
+    return rows
+
+
+def _iter_blocks(path_or_file, delimiter, header, sample_rows, block_rows,
+                 encoding, fmtparams):
+    """Generates (header row, columns) of blocks of rows.
+
+    The first block holds sample_rows data rows (and the header row),
+    then blocks hold block_rows rows.  The header row is None except in
+    the first block.
+    """
+    if isinstance(path_or_file, string_types):
+        if delimiter is None and path_or_file.lower().endswith('.tsv'):
+            delimiter = '\t'
+        with io.open(path_or_file, newline='', encoding=encoding) as file:
+            for block in _iter_file_blocks(file, delimiter, header,
+                                           sample_rows, block_rows,
+                                           fmtparams):
+                yield block
+    else:
+        for block in _iter_file_blocks(path_or_file, delimiter, header,
+                                       sample_rows, block_rows, fmtparams):
+            yield block
+
+
+def _iter_file_blocks(file, delimiter, header, sample_rows, block_rows,
+                      fmtparams):
+    reader = csv.reader(file, delimiter=delimiter or ',', **fmtparams)
+    # Blank lines are skipped
+    rows = (row for row in reader if row)
+    header_row = None
+    if header:
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+    num_columns = None if header_row is None else len(header_row)
+    column_types = None
+    size = sample_rows
+    line = 1 if header_row is not None else 0
+    while True:
+        block = list(itertools.islice(rows, size))
+        if not block:
+            if header_row is not None:
+                # A header without data rows
+                yield header_row, [[] for dummy in header_row]
+            return
+        if num_columns is None:
+            num_columns = len(block[0])
+        for row in block:
+            line += 1
+            if len(row) != num_columns:
+                raise ValueError('CSV row %d has %d fields, expected %d.' %
+                                 (line, len(row), num_columns))
+        texts = list(zip(*block))
+        if column_types is None:
+            # Infer the column types from the first block
+            column_types = [_infer_type(column_texts)
+                            for column_texts in texts]
+        columns = [_convert(column_texts, column_type)
+                   for column_texts, column_type in zip(texts, column_types)]
+        yield header_row, columns
+        header_row = None
+        size = block_rows
+
+
+def _infer_type(texts):
+    """Returns the type of a column, given a sample of its text values.
+
+    Empty values are ignored.  A column of empty values is text.
+    """
+    texts = [text for text in texts if text]
+    if not texts:
+        return TEXT
+    for column_type in (INT, FLOAT):
+        try:
+            for text in texts:
+                _PARSERS[column_type](text)
+        except ValueError:
+            continue
+        return column_type
+    return TEXT
+
+
+def _convert(texts, column_type):
+    """Returns the values of a block of column text values.
+
+    A numeric column is returned as a typed array (a _MaskedColumn if
+    some values are empty) if all its values fit the column type, else
+    as a list of values converted one at a time (see _parse()).
+    """
+    if column_type == TEXT:
+        return list(texts)
+    parse = _PARSERS[column_type]
+    typecode = _TYPECODES[column_type]
+    try:
+        return array(typecode, map(parse, texts))
+    except (ValueError, OverflowError):
+        pass
+    missing = [row for row, text in enumerate(texts) if not text]
+    if missing:
+        try:
+            return _MaskedColumn(
+                array(typecode, [parse(text) if text else 0
+                                 for text in texts]),
+                missing)
+        except (ValueError, OverflowError):
+            pass
+    return [_parse(text, column_type) for text in texts]
+
+
+def _parse(text, column_type):
+    """Returns the value of a single text value of a column.
+
+    Values of numeric columns are converted to the column type if they
+    fit it, else to float if they fit it, else they are kept as text.
+    """
+    if not text:
+        return NULL
+    if column_type == INT:
+        try:
+            return _parse_int(text)
+        except ValueError:
+            pass
+    if column_type in (INT, FLOAT):
+        try:
+            return _parse_float(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _extend_column(column, values):
+    """Returns column extended by the values of a block."""
+    typecode = getattr(column, 'typecode', None)
+    if typecode is not None and typecode == getattr(values, 'typecode',
+                                                    None):
+        if (isinstance(values, _MaskedColumn)
+                and not isinstance(column, _MaskedColumn)):
+            column = _MaskedColumn(column, ())
+        column.extend(values)
+        return column
+    # Values which do not fit the column type: the column becomes a list
+    if not isinstance(column, list):
+        column = list(column)
+    column.extend(values)
+    return column
+
+
+class _MaskedColumn(object):
+    """Typed array column with missing values (read as NULL).
+
+    Arguments:
+        values: The typed array of values (missing values are 0).
+        missing: The indices of the missing values.
+    """
+
+    def __init__(self, values, missing):
+        self.values = values
+        self.missing = set(missing)
+
+    @property
+    def typecode(self):
+        return self.values.typecode
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if index in self.missing:
+            return NULL
+        return self.values[index]
+
+    def __iter__(self):
+        missing = self.missing
+        for index, value in enumerate(self.values):
+            yield NULL if index in missing else value
+
+    def extend(self, values):
+        """Append the values of a typed array or _MaskedColumn."""
+        offset = len(self.values)
+        if isinstance(values, _MaskedColumn):
+            self.missing.update(index + offset for index in values.missing)
+            values = values.values
+        self.values.extend(values)
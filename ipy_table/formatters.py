@@ -0,0 +1,119 @@
+"""Column formatters for ipy_table.
+
+A column formatter converts the values of a table column to text.  Column
+formatters are set with IpyTable.set_column_formatter(column, fn_or_spec),
+where fn_or_spec is one of:
+
+    A callable
+        Called with the cell value (of every row, including header
+        rows), returns the cell text.
+    The name of a built-in formatter
+        'int'       Integers with thousands separators (e.g. 1,234,567)
+        'float'     Floats formatted by the cell's float_format style
+        'percent'   Fractions as percentages (e.g. 0.123 => 12.3%)
+        'datetime'  datetime/date/time objects in ISO-like format
+                    (e.g. 2017-08-25 13:45:00)
+        'string'    str(value)
+    A format string
+        Either a str.format() string (e.g. '{:,.2f}') or a '%' format
+        string (e.g. '$%0.2f').
+
+Values which a built-in formatter or format string can not format
+(e.g. the text of a header row in an 'int' column) fall back to the
+default formatting.  Exceptions raised by a callable are not caught (so
+bugs in the callable are not hidden).
+"""
+
+from six import string_types
+
+
+def format_int(value):
+    """Integer with thousands separators."""
+    return '{:,d}'.format(value)
+
+
+def format_float(value, cell_style):
+    """Float formatted by the float_format style of the cell (if any)."""
+    if 'float_format' in cell_style:
+        return cell_style['float_format'] % value
+    return str(value)
+
+
+def format_percent(value):
+    """Fraction as a percentage with one decimal place."""
+    return '{:.1%}'.format(value)
+
+
+def format_datetime(value):
+    """datetime, date or time in ISO-like format (space separated)."""
+    if hasattr(value, 'hour') and hasattr(value, 'year'):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value.isoformat()
+
+
+def format_string(value):
+    """str(value)."""
+    return str(value)
+
+
+# Built-in formatters, by name.  Formatters in _STYLE_FORMATTERS are also
+# passed the cell style.
+BUILTIN_FORMATTERS = {
+    'int': format_int,
+    'float': format_float,
+    'percent': format_percent,
+    'datetime': format_datetime,
+    'string': format_string,
+    }
+
+_STYLE_FORMATTERS = {format_float}
+
+# Exceptions which cause a built-in formatter or format string to fall
+# back to the default
+_FALLBACK_ERRORS = (TypeError, ValueError, AttributeError)
+
+
+def resolve_formatter(fn_or_spec, fallback):
+    """Returns a formatter function (item, cell_style) => text.
+
+    Arguments:
+        fn_or_spec: A callable, built-in formatter name or format string
+            (see module documentation).
+        fallback: Formatter function (item, cell_style) => text used for
+            values which a built-in formatter or format string can not
+            format.
+    """
+    if isinstance(fn_or_spec, string_types):
+        if fn_or_spec in BUILTIN_FORMATTERS:
+            function = BUILTIN_FORMATTERS[fn_or_spec]
+        elif '{' in fn_or_spec:
+            function = fn_or_spec.format
+        elif '%' in fn_or_spec:
+            function = fn_or_spec.__mod__
+        else:
+            raise ValueError(
+                'Unknown formatter "%s". Expected a callable, a format '
+                'string, or one of %s.' %
+                (fn_or_spec, sorted(BUILTIN_FORMATTERS)))
+    elif callable(fn_or_spec):
+        def format_item(item, cell_style):
+            return fn_or_spec(item)
+        return format_item
+    else:
+        raise TypeError(
+            'Formatter must be a callable or a string (got %r).' %
+            (fn_or_spec,))
+
+    if function in _STYLE_FORMATTERS:
+        def format_item(item, cell_style):
+            try:
+                return function(item, cell_style)
+            except _FALLBACK_ERRORS:
+                return fallback(item, cell_style)
+    else:
+        def format_item(item, cell_style):
+            try:
+                return function(item)
+            except _FALLBACK_ERRORS:
+                return fallback(item, cell_style)
+    return format_item
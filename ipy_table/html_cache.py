@@ -0,0 +1,225 @@
+"""Process-wide cache of rendered table HTML.
+
+The cache is keyed by a fingerprint of a table's data and style state, so
+tables with identical contents share a cache entry, and modifying a table
+(through the IpyTable methods) automatically selects a different entry.
+
+The cache is disabled by default.  Enable it with enable_html_cache().
+
+Example:
+    import ipy_table
+    ipy_table.enable_html_cache(max_bytes=32 * 1024 * 1024,
+                                disk_dir='/tmp/ipy_table_cache')
+    ...
+    print(ipy_table.html_cache_info())
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from six import binary_type
+
+_CACHE = None
+
+# File name suffix of disk tier entries.  Only files with this suffix are
+# indexed (and removed) by the cache, so the disk tier can share a
+# directory with other files.
+_SUFFIX = '.ipy_table_cache.html'
+
+
+class HtmlCache(object):
+    """Bounded LRU cache of rendered HTML, with an optional on-disk tier.
+
+    Sizes are measured in bytes of UTF-8 encoded HTML (as stored in the
+    disk tier).
+
+    Arguments:
+        max_bytes: Memory budget.  Least recently used entries are evicted
+            (to the disk tier, if enabled) when the budget is exceeded.
+        disk_dir: Optional directory for the on-disk tier.  Entries found on
+            disk are promoted back into memory.  Entries which can not be
+            written to disk are only cached in memory.
+        disk_max_bytes: Optional budget for the on-disk tier (unbounded if
+            None).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None,
+                 disk_max_bytes=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._disk_entries = OrderedDict()
+        self._disk_bytes = 0
+        self._stats = dict(hits=0, disk_hits=0, misses=0, evictions=0)
+        if disk_dir is not None:
+            self._scan_disk()
+
+    def get(self, key):
+        """Returns the cached HTML for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Most recently used (OrderedDict.move_to_end() is not
+                # available on Python 2)
+                self._entries[key] = self._entries.pop(key)
+                self._stats['hits'] += 1
+                return entry[0]
+            html = self._disk_get(key)
+            if html is not None:
+                self._stats['disk_hits'] += 1
+                self._memory_put(key, html)
+                return html
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key, html):
+        """Add the HTML for key to the cache."""
+        if isinstance(html, binary_type):
+            # (A Python 2 str)
+            html = html.decode('utf-8')
+        with self._lock:
+            self._memory_put(key, html)
+            self._disk_put(key, html)
+
+    def clear(self):
+        """Remove all entries (memory and disk) and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for key in list(self._disk_entries):
+                self._disk_remove(key)
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+    def info(self):
+        """Returns a dictionary of cache statistics."""
+        with self._lock:
+            info = dict(self._stats)
+            info.update(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                disk_entries=len(self._disk_entries),
+                disk_bytes=self._disk_bytes)
+            return info
+
+    #---------------------------------
+    # Internal methods
+    #---------------------------------
+
+    def _memory_put(self, key, html):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        size = _size(html)
+        if size > self.max_bytes:
+            return
+        # key => (html, size)
+        self._entries[key] = (html, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            dummy, (evicted, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats['evictions'] += 1
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key + _SUFFIX)
+
+    def _scan_disk(self):
+        """Index the entries already present in the disk tier."""
+        if not os.path.isdir(self.disk_dir):
+            os.makedirs(self.disk_dir)
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(_SUFFIX):
+                stat = os.stat(os.path.join(self.disk_dir, name))
+                files.append((stat.st_mtime, name[:-len(_SUFFIX)],
+                              stat.st_size))
+        for dummy, key, size in sorted(files):
+            self._disk_entries[key] = size
+            self._disk_bytes += size
+
+    def _disk_get(self, key):
+        if key not in self._disk_entries:
+            return None
+        try:
+            with io.open(self._path(key), 'r', encoding='utf-8',
+                         newline='') as in_file:
+                html = in_file.read()
+        except (IOError, OSError):
+            self._disk_bytes -= self._disk_entries.pop(key)
+            return None
+        # Most recently used
+        self._disk_entries[key] = self._disk_entries.pop(key)
+        return html
+
+    def _disk_put(self, key, html):
+        if self.disk_dir is None or key in self._disk_entries:
+            return
+        path = self._path(key)
+        temp_path = '%s.%d.tmp' % (path, threading.current_thread().ident)
+        try:
+            # (No newline translation, so the file size is the entry size)
+            with io.open(temp_path, 'w', encoding='utf-8',
+                         newline='') as out_file:
+                out_file.write(html)
+            os.rename(temp_path, path)
+        except (IOError, OSError):
+            # The entry is only cached in memory
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        size = _size(html)
+        self._disk_entries[key] = size
+        self._disk_bytes += size
+        if self.disk_max_bytes is not None:
+            while self._disk_bytes > self.disk_max_bytes:
+                self._disk_remove(next(iter(self._disk_entries)))
+
+    def _disk_remove(self, key):
+        self._disk_bytes -= self._disk_entries.pop(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+def _size(html):
+    """Returns the size of HTML in bytes (UTF-8 encoded)."""
+    return len(html.encode('utf-8'))
+
+
+def enable_html_cache(max_bytes=64 * 1024 * 1024, disk_dir=None,
+                      disk_max_bytes=None):
+    """Enable the process-wide rendered HTML cache.
+
+    See HtmlCache for a description of the arguments.  Returns the cache.
+    """
+    global _CACHE
+    _CACHE = HtmlCache(max_bytes, disk_dir, disk_max_bytes)
+    return _CACHE
+
+
+def disable_html_cache():
+    """Disable (and discard) the process-wide rendered HTML cache."""
+    global _CACHE
+    _CACHE = None
+
+
+def get_html_cache():
+    """Returns the process-wide HtmlCache, or None if it is disabled."""
+    return _CACHE
+
+
+def html_cache_info():
+    """Returns the statistics of the process-wide cache (None if disabled)."""
+    cache = _CACHE
+    if cache is None:
+        return None
+    return cache.info()
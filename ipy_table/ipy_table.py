@@ -10,7 +10,8 @@ this package:
     ipy_table-Reference.ipynb
 
 All cell, row, column, and global style formatting functions accept
-optional style_args. style_args support the following arguments:
+optional style_args, and/or a precompiled Style object (see Style).
+style_args support the following arguments:
     color=<colorstring>
         <colorstring> can be any any standard web/X11 color name.
         For a list see http://en.wikipedia.org/wiki/Web_colors
@@ -30,6 +31,9 @@ optional style_args. style_args support the following arguments:
     align=<alignmentstring>
         <alignmentstring> can be 'left', 'right', or 'center'
     wrap=<True/False>
+    escape=<True/False>
+        Cell contents are HTML escaped unless escape=False, which allows
+        trusted HTML (e.g. links) in cells.
     float_format=<formatstring>
         <formatstring> is a standard Python '%' format string
         (e.g. '%0.6f' or '$%0.2f')
@@ -55,106 +59,827 @@ The full license is in the file LICENSE, distributed with this software.
 This project is maintained at http://github.com/epmoyer/ipy_table
 """
 
+import array as _array
 import copy
+import hashlib
+import itertools
+import numbers
+import operator
+import pickle
+import re
+import threading
+import zlib
 from collections import OrderedDict
-from six import string_types
+from contextlib import contextmanager
+from six import binary_type, integer_types, string_types, text_type
 
-# Private table object used for interactive mode
-_TABLE = None
-_INTERACTIVE = True
+from .formatters import resolve_formatter
+from .html_cache import get_html_cache
+
+try:
+    import contextvars
+except ImportError:
+    # Python < 3.7
+    contextvars = None
 
 #-----------------------------
 # Classes
 #-----------------------------
 
 
+class _TextMemo(object):
+    """Bounded memo of formatted cell text, for one table column.
+
+    Formatted text is keyed by the value (and its type) and the style
+    settings which affect formatting.  Values of types whose equal values
+    may format differently (e.g. floats: -0.0 == 0.0, Decimals: 1.0 ==
+    1.00) are keyed by their repr().  When full, the oldest entry is
+    evicted.
+    """
+
+    DEFAULT_MAX_ENTRIES = 4096
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, formatter):
+        """Returns a memoizing version of a formatter function."""
+        entries = self.entries
+
+        def format_item(item, cell_style):
+            item_type = type(item)
+            if item_type in _EXACT_MEMO_TYPES:
+                value_key = item
+            else:
+                try:
+                    hash(item)
+                except TypeError:
+                    # Unhashable value
+                    return formatter(item, cell_style)
+                value_key = repr(item)
+            key = (item_type, value_key, cell_style.get('float_format'),
+                   cell_style.get('wrap'), cell_style.get('escape', True))
+            html = entries.get(key)
+            if html is None:
+                self.misses += 1
+                html = formatter(item, cell_style)
+                if len(entries) >= self.max_entries:
+                    entries.pop(next(iter(entries)), None)
+                entries[key] = html
+            else:
+                self.hits += 1
+            return html
+        return format_item
+
+    def info(self):
+        """Returns a dictionary of memo statistics."""
+        return dict(hits=self.hits, misses=self.misses,
+                    entries=len(self.entries), max_entries=self.max_entries)
+
+
+class _BlockRows(object):
+    """Read-only rows read a block of rows at a time.
+
+    The (optional) header is prepended as a row.  Only the most recently
+    used block of rows is kept.  Subclasses implement _num_data_rows()
+    and _read_block().
+    """
+
+    BLOCK_ROWS = 1024
+
+    def __init__(self, header):
+        self.header = header
+        self._header_rows = 0 if header is None else 1
+        # (first row, rows) of the most recently used block
+        self._block = (None, None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_block'] = (None, None)
+        return state
+
+    def __len__(self):
+        return self._num_data_rows() + self._header_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < self._header_rows:
+            return self.header
+        index -= self._header_rows
+        start = index - index % self.BLOCK_ROWS
+        block = self._block
+        if block[0] != start:
+            block = self._block = (start, self._read_block(start))
+        return block[1][index - start]
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def sample(self, num_rows):
+        """Returns the first rows, keeping the most recently used block."""
+        block = self._block
+        rows = list(itertools.islice(self, num_rows))
+        self._block = block
+        return rows
+
+    def _num_data_rows(self):
+        """Returns the number of rows, excluding the header."""
+        raise NotImplementedError
+
+    def _read_block(self, start):
+        """Returns the (list) rows of the block of data rows at start."""
+        raise NotImplementedError
+
+
+class _ArrayRows(_BlockRows):
+    """Read-only rows of a structured or memory-mapped numpy array.
+
+    The field names of a structured array are prepended as a header row.
+    Rows are converted to Python values a block of rows at a time (so each
+    field is converted by its dtype): a memory-mapped file is read lazily
+    as it is rendered.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        if data.dtype.names is not None:
+            _BlockRows.__init__(self, list(data.dtype.names))
+        else:
+            _BlockRows.__init__(self, None)
+
+    def _num_data_rows(self):
+        return len(self.data)
+
+    def _read_block(self, start):
+        return self.data[start:start + self.BLOCK_ROWS].tolist()
+
+
+class _FunctionRows(_BlockRows):
+    """Rows of cell values computed on access (see IpyTable.from_function()).
+
+    Values are computed a block of rows at a time, by fn(row, column), or
+    by fn(row_slice, column_slice) returning the rows of the block (lists
+    or a 2D numpy array) if vectorized.  Computed blocks are kept if
+    memoize is set, else only the most recently used block is kept.
+    Pickled as a list of rows (all values are computed).
+    """
+
+    def __init__(self, num_rows, num_columns, fn, vectorized, memoize,
+                 block_rows, header):
+        if header is not None and len(header) != num_columns:
+            raise ValueError('The header must have %d columns.' % num_columns)
+        _BlockRows.__init__(self, header)
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.fn = fn
+        self.vectorized = vectorized
+        self.BLOCK_ROWS = block_rows
+        # Computed blocks (first row => rows), if memoized
+        self.memo = {} if memoize else None
+
+    def __reduce__(self):
+        return (list, ([list(row_data) for row_data in self],))
+
+    def _num_data_rows(self):
+        return self.num_rows
+
+    def _read_block(self, start):
+        if self.memo is not None and start in self.memo:
+            return self.memo[start]
+        stop = min(start + self.BLOCK_ROWS, self.num_rows)
+        if self.vectorized:
+            values = self.fn(slice(start, stop), slice(0, self.num_columns))
+            if hasattr(values, 'tolist'):
+                values = values.tolist()
+            rows = [list(row_data) for row_data in values]
+            if (len(rows) != stop - start or
+                    any(len(row_data) != self.num_columns
+                        for row_data in rows)):
+                raise ValueError(
+                    'fn(slice(%d, %d), slice(0, %d)) must return %d rows of '
+                    '%d values.' % (start, stop, self.num_columns,
+                                    stop - start, self.num_columns))
+        else:
+            fn = self.fn
+            columns = range(self.num_columns)
+            rows = [[fn(row, column) for column in columns]
+                    for row in range(start, stop)]
+        if self.memo is not None:
+            self.memo[start] = rows
+        return rows
+
+
+class _ColumnarRows(object):
+    """Read-only rows of data stored by column (see IpyTable.from_csv()).
+
+    Numeric columns are typed arrays (array.array, or sequences with
+    a typecode such as csv_input._MaskedColumn), other columns are
+    lists.  The (optional) header is prepended as a row, and rows are
+    assembled as they are accessed.
+    """
+
+    def __init__(self, header, columns):
+        self.header = header
+        self.columns = columns
+        self._header_rows = 0 if header is None else 1
+
+    def __len__(self):
+        return len(self.columns[0]) + self._header_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < self._header_rows:
+            return self.header
+        index -= self._header_rows
+        return [column[index] for column in self.columns]
+
+    def __iter__(self):
+        if self.header is not None:
+            yield self.header
+        for row_data in zip(*self.columns):
+            yield list(row_data)
+
+
+class _LazyStyleRows(object):
+    """Cell style rows of a read-only table, created on first access.
+
+    Accessing a row (self[row]) stores it, so it can be modified in
+    place.  peek() returns the styles of rows which have never been
+    accessed without storing them, so rendering a large table does not
+    allocate styles for every cell.
+    """
+
+    def __init__(self, num_rows, num_columns):
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.rows = {}
+
+    def __len__(self):
+        return self.num_rows
+
+    def __getitem__(self, row):
+        row_styles = self.rows.get(row)
+        if row_styles is None:
+            if not 0 <= row < self.num_rows:
+                raise IndexError('Style row out of range.')
+            row_styles = self.rows[row] = self._new_row(row)
+        return row_styles
+
+    def peek(self, row):
+        """Returns the styles of a row, for reading only."""
+        row_styles = self.rows.get(row)
+        if row_styles is None:
+            row_styles = self._new_row(row)
+        return row_styles
+
+    def peek_tags(self, row):
+        """Returns pre-rendered cell tags of a row (see TableTemplate).
+
+        Returns None if the row has no pre-rendered tags.
+        """
+        return None
+
+    def styled_rows(self):
+        """Returns the set of rows which may have non-default styles.
+
+        Returns None if any row may be styled.
+        """
+        return set(self.rows)
+
+    def to_list(self):
+        """Returns the styles of all rows as a list of (stored) rows."""
+        return [self[row] for row in range(self.num_rows)]
+
+    def _new_row(self, row):
+        """Returns new style dictionaries of a row never accessed."""
+        return [{'float_format': '%0.4f'}
+                for dummy in range(self.num_columns)]
+
+    def __iter__(self):
+        for row in range(self.num_rows):
+            yield self.peek(row)
+
+
 class IpyTable(object):
 
     _valid_borders = {'left', 'right', 'top', 'bottom', 'all'}
 
+    _TABLE_OPEN_HTML = (
+        '<table border="1" cellpadding="3" cellspacing="0" '
+        ' style="border:black; border-collapse:collapse;">')
+
     #---------------------------------
     # External methods
     #---------------------------------
 
     def __init__(self, array):
+        if _is_lazy_array(array):
+            # Structured arrays get a header row of field names, and
+            # memory-mapped arrays are read a block of rows at a time
+            array = _ArrayRows(array)
         self.array = array
 
         self._num_rows = len(array)
         self._num_columns = len(array[0])
 
-        # Float type checking is performed by calling
-        # str(type(value)) and comparing it to the 
-        # list below (to provide numpy compatibility
-        # without having it as a dependency)
-        self._float_types = [
-            # Python 2
-            "<type 'float'>",
-            "<type 'numpy.float16'>",
-            "<type 'numpy.float32'>",
-            "<type 'numpy.float64'>",
-            "<type 'numpy.float128'>",
-            # Python 3
-            "<class 'float'>",
-            "<class 'numpy.float16'>",
-            "<class 'numpy.float32'>",
-            "<class 'numpy.float64'>",
-            "<class 'numpy.float128'>",
-            ]
-
-        # Check that array is well formed
-        for row in array:
-            if len(row) != self._num_columns:
-                raise ValueError("Array rows must all be of equal length.")
-
-        self._cell_styles = [[{'float_format': '%0.4f'}
-                              for dummy in range(self._num_columns)]
-                             for dummy2 in range(self._num_rows)]
+        if isinstance(array, (_BlockRows, _ColumnarRows)):
+            # Rows are well formed; only create the styles which are used
+            self._cell_styles = _LazyStyleRows(self._num_rows,
+                                               self._num_columns)
+        else:
+            # Check that array is well formed
+            for row in array:
+                if len(row) != self._num_columns:
+                    raise ValueError("Array rows must all be of equal length.")
+
+            self._cell_styles = [[{'float_format': '%0.4f'}
+                                  for dummy in range(self._num_columns)]
+                                 for dummy2 in range(self._num_rows)]
+
+        # Most recently applied theme (extended to appended rows)
+        self._theme = None
+
+        # Row span index: (row, column) => row_span, for every cell
+        # with a row_span greater than 1
+        self._row_spans = {}
+
+        # Column formatters set by set_column_formatter():
+        # column => fn_or_spec
+        self._column_formatters = {}
+
+        # Formatted text memoization set by set_column_memoization():
+        # column => (memoize, max_entries) (columns not present are
+        # automatic)
+        self._column_memoization = {}
+
+        # Memoized fingerprint of the data and style state (see
+        # _fingerprint()).  Reset by _touch() whenever the table changes.
+        self._fingerprint_memo = None
+
+        # Fingerprint digests of every row and of every block of
+        # _FINGERPRINT_BLOCK_ROWS rows (None entries are stale), or None
+        # before the first fingerprint (see _update_row_digests())
+        self._row_digests = None
+        self._block_digests = None
+
+        # Incremented by _touch() whenever the table changes
+        self._revision = 0
+
+        # Incremented whenever the table data changes (set_value(),
+        # append_rows(), delete_rows())
+        self._data_revision = 0
+
+        # Incremented whenever rows are added, deleted or moved (views of
+        # the table then no longer show the right rows, see views.py)
+        self._rows_revision = 0
+
+        # Summary rows added by add_summary_row() (always the last table
+        # rows): list of dict(funcs={column: function}, header_rows=n),
+        # and the _data_revision they were computed for
+        self._summary_rows = []
+        self._summary_revision = None
+
+        # Memoized per-column formatter functions, and their formatted
+        # text memos (see _get_column_formatters())
+        self._formatter_memo = None
+        self._text_memos = {}
+
+    def __getstate__(self):
+        """Pickle protocol: returns a compact representation of the table.
+
+        Homogeneous float or int data is stored as a flat typed buffer and
+        cell styles are stored as a table of unique styles plus a per-cell
+        index into that table.
+        """
+        state = self._get_transient_free_state()
+        state['array'] = _pack_array(self.array)
+
+        unique_styles = []
+        style_ids = {}
+        style_index = _array.array('I')
+        for row_styles in self._cell_styles:
+            for cell_style in row_styles:
+                key = _style_key(cell_style)
+                style_id = style_ids.get(key)
+                if style_id is None:
+                    style_id = len(unique_styles)
+                    unique_styles.append(cell_style)
+                    if key is not None:
+                        style_ids[key] = style_id
+                style_index.append(style_id)
+        state['_cell_styles'] = (unique_styles, style_index)
+        return state
+
+    def _get_transient_free_state(self):
+        """Returns a copy of the instance dictionary without memos."""
+        state = self.__dict__.copy()
+        state['_fingerprint_memo'] = None
+        state['_row_digests'] = None
+        state['_block_digests'] = None
+        state['_formatter_memo'] = None
+        state['_text_memos'] = {}
+        return state
+
+    def __setstate__(self, state):
+        """Pickle protocol: restores a table from __getstate__() output."""
+        state = state.copy()
+        unique_styles, style_index = state.pop('_cell_styles')
+        self.__dict__.update(state)
+        self.array = _unpack_array(state['array'], self._num_columns)
+
+        # Every cell gets its own style dictionary, as styles are merged
+        # into the cell dictionaries in place.
+        num_columns = self._num_columns
+        self._cell_styles = [
+            [dict(unique_styles[style_id])
+             for style_id in style_index[start:start + num_columns]]
+            for start in range(0, len(style_index), num_columns)]
+
+    def to_bytes(self, compress=True):
+        """Serialize the table (data and styles) to a bytes object.
+
+        The result can be restored with IpyTable.from_bytes(), and is
+        suitable for storing in a shared cache.
+        """
+        payload = pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+        if compress:
+            return _SERIAL_MAGIC + b'z' + zlib.compress(payload)
+        return _SERIAL_MAGIC + b'p' + payload
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Restore a table serialized with to_bytes().
+
+        Only restore data from trusted sources (the format is based on
+        pickle).
+        """
+        if data[:len(_SERIAL_MAGIC)] != _SERIAL_MAGIC:
+            raise ValueError('Not a serialized IpyTable.')
+        encoding = data[len(_SERIAL_MAGIC):len(_SERIAL_MAGIC) + 1]
+        payload = data[len(_SERIAL_MAGIC) + 1:]
+        if encoding == b'z':
+            payload = zlib.decompress(payload)
+        elif encoding != b'p':
+            raise ValueError('Unknown IpyTable serialization encoding.')
+        table = pickle.loads(payload)
+        if not isinstance(table, cls):
+            raise TypeError('Serialized object is not a %s.' % cls.__name__)
+        return table
+
+    @classmethod
+    def from_function(cls, num_rows, num_columns, fn, vectorized=False,
+                      memoize=False, header=None, block_rows=32):
+        """Creates a table of cell values computed on demand.
+
+        Arguments:
+            num_rows, num_columns: The table size (excluding the header).
+            fn: fn(row, column) returns a cell value.  If vectorized,
+                fn(row_slice, column_slice) returns the values of a block
+                of rows (a list of rows, or a 2D numpy array).
+            memoize: If True, computed values are kept (else only the
+                values of the most recently used block of rows are kept,
+                and values are recomputed when needed again).
+            header: Optional header row (list of column labels), which is
+                not computed.  Rows and columns passed to fn exclude it.
+            block_rows: The number of rows computed at a time.
+
+        Values are computed as the table is rendered, a block of rows at
+        a time, so rendering a window (render_rows(), page(), a
+        VirtualTable) only computes the rows of the window (plus the first
+        block, sampled to pick the column formatters).  Cell styles are
+        only allocated for rows which are styled.  Modifying the table
+        data (set_value(), append_rows()...) computes all values.
+
+        Example:
+            table = IpyTable.from_function(
+                1000, 1000, lambda row, column: distance(row, column))
+            table.page(3, 20)
+        """
+        if num_rows < (0 if header is not None else 1) or num_columns < 1:
+            raise ValueError('Bad table size (%d, %d).' %
+                             (num_rows, num_columns))
+        return cls(_FunctionRows(num_rows, num_columns, fn, vectorized,
+                                 memoize, block_rows, header))
+
+    @classmethod
+    def from_csv(cls, path_or_file, delimiter=None, header=True,
+                 sample_rows=1000, encoding='utf-8', stream=False,
+                 **fmtparams):
+        """Creates a table from a CSV (or TSV) file.
+
+        Arguments:
+            path_or_file: A path, or a text file object (opened with
+                newline='').
+            delimiter: The field delimiter (default ',', or tab for paths
+                ending with .tsv).
+            header: True if the first row is a header (kept as text).
+            sample_rows: The number of rows the column types (int, float
+                or text) are inferred from.
+            encoding: The encoding of files given by path.
+            stream: If True, returns a CsvStream which renders the file
+                HTML (iter_html(), write_html()) a block of rows at a
+                time, in bounded memory.
+            fmtparams: Further csv.reader() format parameters.
+
+        The file is parsed a block of rows at a time and converted a
+        column at a time: numeric columns are stored as typed arrays
+        (empty values are missing values, rendered as empty cells), and
+        cell styles are only allocated for rows which are styled.  Later
+        values which do not fit the inferred type of their column are
+        converted on their own (to int, float or text), so a streamed
+        file renders the same HTML as the whole table.  Only numbers
+        written in canonical form are numeric: values like '007',
+        '1_000' or ' 5' are kept as text.
+
+        Example:
+            table = IpyTable.from_csv('export.csv')
+            IpyTable.from_csv('big.tsv', stream=True).write_html('big.html')
+        """
+        from .csv_input import CsvStream, read_csv
+        if stream:
+            return CsvStream(path_or_file, delimiter, header, sample_rows,
+                             encoding, **fmtparams)
+        header_row, columns = read_csv(path_or_file, delimiter, header,
+                                       sample_rows, encoding, **fmtparams)
+        return cls(_ColumnarRows(header_row, columns))
+
+    @classmethod
+    def from_query(cls, connection, sql, params=(), header=True, null='',
+                   lazy=False, stream=False, fetch_rows=1000):
+        """Creates a table from a database query.
+
+        Arguments:
+            connection: A DB-API 2.0 connection (e.g. sqlite3).
+            sql, params: The query and its parameters (in the paramstyle
+                of the driver).
+            header: True to prepend the column names as a header row.
+            null: The value of NULL cells (default: empty cells).
+            lazy: If True, the rows are counted and then fetched a block
+                of rows at a time as they are accessed (e.g. by page(),
+                render_rows() or a VirtualTable), so only the displayed
+                rows are read.  The query (a SELECT) is wrapped in
+                COUNT(*) and LIMIT / OFFSET queries.
+            stream: If True, returns a QueryStream which renders the query
+                result (iter_html(), write_html()) a block of rows at a
+                time, in bounded memory.
+            fetch_rows: The number of rows per fetchmany() call.
+
+        Column formatters are picked from the DB-API type codes of the
+        query columns (or from the types of the first values where the
+        driver does not define type codes, as with sqlite3): date / time
+        columns get the 'datetime' formatter.
+
+        Example:
+            table = IpyTable.from_query(
+                connection, 'SELECT * FROM sales WHERE year = ?', (2017,))
+        """
+        from .query_input import QueryStream, _QueryRows, read_query
+        if stream:
+            return QueryStream(connection, sql, params, header, null)
+        if lazy:
+            rows = _QueryRows(connection, sql, params, header, null,
+                              fetch_rows)
+            if len(rows) == 0:
+                raise ValueError('The query returned no rows.')
+            table = cls(rows)
+            for column, fn_or_spec in rows.formatters.items():
+                table.set_column_formatter(column, fn_or_spec)
+            return table
+        rows, formatters = read_query(connection, sql, params, header,
+                                      null, fetch_rows)
+        table = cls(rows)
+        for column, fn_or_spec in formatters.items():
+            table.set_column_formatter(column, fn_or_spec)
+        return table
+
+    @classmethod
+    def from_dataframe(cls, df, index=True, header=True):
+        """Create a table from a pandas DataFrame.
+
+        Arguments:
+            df: The pandas.DataFrame.
+            index: If True (default), the index is shown in the leftmost
+                columns (one column per index level, with the index names
+                in the last header row).
+            header: If True (default), the column labels are shown in the
+                top rows (one row per column level).
+
+        The data is converted a column at a time, by dtype: bool, int and
+        float64 columns become Python values (identical text, faster to
+        format and compactly pickled), other numeric columns keep their
+        numpy type, and other columns become their Python level values
+        (str, Timestamp, ...).  Repeated labels of the outer levels of a
+        MultiIndex are merged with column_span / row_span.  pandas is not
+        imported by ipy_table.
+        """
+        if not _is_pandas_dataframe(df):
+            raise TypeError('Expected a pandas DataFrame (got %s).' %
+                            type(df).__name__)
+        columns = df.columns
+        index_levels = df.index.nlevels if index else 0
+
+        rows = []
+        if header:
+            for level in range(columns.nlevels):
+                if level == columns.nlevels - 1:
+                    names = [('' if name is None else name)
+                             for name in df.index.names]
+                else:
+                    names = [''] * df.index.nlevels
+                rows.append(names[:index_levels]
+                            + list(columns.get_level_values(level)))
+        header_rows = len(rows)
+
+        index_values = [_column_values(df.index.get_level_values(level))
+                        for level in range(index_levels)]
+        column_values = [_column_values(df.iloc[:, column])
+                         for column in range(df.shape[1])]
+        rows.extend([list(row_data)
+                     for row_data in zip(*(index_values + column_values))])
+        if not rows:
+            raise ValueError('DataFrame has no rows to display.')
+        table = cls(rows)
+
+        # Merge repeated labels of the outer levels of a MultiIndex
+        for level in range(header_rows - 1):
+            keys = [label[:level + 1] for label in columns]
+            for start, stop in _equal_runs(keys):
+                if stop - start > 1:
+                    table._set_cell_style_norender(
+                        level, index_levels + start, column_span=stop - start)
+        for level in range(index_levels - 1):
+            keys = list(zip(*index_values[:level + 1]))
+            for start, stop in _equal_runs(keys):
+                if stop - start > 1:
+                    table._set_cell_style_norender(
+                        header_rows + start, level, row_span=stop - start)
+        return table
+
+    def to_template(self):
+        """Returns a TableTemplate of the table styling.
+
+        The template captures the cell styles, spans, theme and column
+        formatters, for creating tables of the same shape from new data
+        with from_template().  Later changes to the table do not affect
+        the template.
+        """
+        from .templates import TableTemplate
+        return TableTemplate(self)
+
+    @classmethod
+    def from_template(cls, template, data):
+        """Creates a table from a TableTemplate and data.
+
+        data must have the shape of the template (the table it was created
+        from), else ValueError is raised.  No styling is re-run: the table
+        shares the template's styles (copying the styles of a row when it
+        is restyled) and renders with its pre-rendered cell tags.
+
+        Example:
+            template = styled_table.to_template()
+            table = IpyTable.from_template(template, data)
+        """
+        return template._make_table(cls, data)
+
+    def fingerprint(self):
+        """Returns a hex digest of the table's data and styles.
+
+        Tables with equal fingerprints render to identical HTML, so the
+        fingerprint can be used as an HTTP ETag (or a cache key) without
+        rendering the table.  It is maintained incrementally: after a
+        change only the modified rows are hashed again.  Returns None if
+        the table contains data which can not be fingerprinted
+        (unpicklable objects) or has callable column formatters (whose
+        output can change without the table changing).  Changes made by
+        modifying .array directly are not detected.
+
+        Example:
+            if request_etag == table.fingerprint():
+                return not_modified_response()
+        """
+        self._refresh_summary_rows()
+        return self._fingerprint()
 
     def _repr_html_(self):
         """IPython display protocol: HTML representation.
 
         The IPython display protocol calls this method to get the HTML
         representation of this object.
+
+        If the rendered HTML cache is enabled (see enable_html_cache())
+        the HTML is looked up by the fingerprint of the table contents.
         """
-        #---------------------------------------
-        # Generate TABLE tag (<tr>)
-        #---------------------------------------
-        html = '<table border="1" cellpadding="3" cellspacing="0" ' \
-            + ' style="border:black; border-collapse:collapse;">'
-
-        for row, row_data in enumerate(self.array):
-
-            #---------------------------------------
-            # Generate ROW tag (<tr>)
-            #---------------------------------------
-            html += '<tr>'
-            for (column, item) in enumerate(row_data):
-                if not _key_is_valid(
-                        self._cell_styles[row][column], 'suppress'):
-
-                    #---------------------------------------
-                    # Generate CELL tag (<td>)
-                    #---------------------------------------
-                    # Apply floating point formatter to the cell contents
-                    # (if it is a float)
-                    item_html = self._formatter(
-                        item, self._cell_styles[row][column])
-
-                    # Add bold and italic tags if set
-                    if _key_is_valid(self._cell_styles[row][column], 'bold'):
-                        item_html = '<b>' + item_html + '</b>'
-                    if _key_is_valid(self._cell_styles[row][column], 'italic'):
-                        item_html = '<i>' + item_html + '</i>'
-
-                    # Get html style string
-                    style_html = self._get_style_html(
-                        self._cell_styles[row][column])
-
-                    # Append cell
-                    html += '<td' + style_html + '>' + item_html + '</td>'
-            html += '</tr>'
-        html += '</table>'
-        return html
+        self._refresh_summary_rows()
+        cache = get_html_cache()
+        if cache is not None:
+            key = self._fingerprint()
+            if key is not None:
+                html = cache.get(key)
+                if html is None:
+                    html = ''.join(self.iter_html())
+                    cache.put(key, html)
+                return html
+        return ''.join(self.iter_html())
+
+    def iter_html(self, chunk_rows=None):
+        """Generate the HTML representation of the table in chunks.
+
+        Yields the opening <table> tag, then the HTML of chunk_rows table
+        rows at a time (one row at a time if chunk_rows is None), then the
+        closing </table> tag.  The concatenated chunks are identical to
+        the output of _repr_html_().
+        """
+        yield self._TABLE_OPEN_HTML
+        step = chunk_rows or 1
+        for start in range(0, self._num_rows, step):
+            yield self._render_rows_html(
+                start, min(start + step, self._num_rows))
+        yield '</table>'
+
+    def write_html(self, file, chunk_rows=1000):
+        """Write the table HTML to a file (a path or a file object).
+
+        The HTML is written chunk_rows rows at a time (see iter_html()),
+        so memory use does not grow with the table size; memory-mapped
+        arrays are read lazily as they are written.
+        """
+        if isinstance(file, string_types):
+            with open(file, 'w') as html_file:
+                self.write_html(html_file, chunk_rows)
+            return
+        for chunk in self.iter_html(chunk_rows):
+            file.write(chunk)
+
+    def render_async(self, chunk_rows=100, executor=None):
+        """Render the table HTML without blocking the asyncio event loop.
+
+        Returns a coroutine which renders chunk_rows rows at a time and
+        yields control to the event loop between chunks.  If executor
+        (a concurrent.futures.Executor) is given, the chunks are rendered
+        in the executor instead of on the event loop.  The result is
+        identical to the output of _repr_html_().
+
+        Example:
+            html = await table.render_async(chunk_rows=500)
+        """
+        from .async_render import render_async
+        return render_async(self, chunk_rows, executor)
+
+    def iter_html_async(self, chunk_rows=100, executor=None):
+        """Asynchronous iterator of HTML chunks (see render_async())."""
+        from .async_render import iter_html_async
+        return iter_html_async(self, chunk_rows, executor)
+
+    def render_rows(self, start, stop, header_rows=0):
+        """Returns the HTML of a table containing only rows start to stop.
+
+        The first header_rows rows of the table (e.g. a column header) are
+        prepended to the window.  Row spans crossing the window edges are
+        clipped to the window.  Rendering time is proportional to the
+        window size, not the table size.
+        """
+        if not 0 <= header_rows <= self._num_rows:
+            raise ValueError(
+                'Bad header_rows (%d).  Expected header_rows in range 0 '
+                'to %d.' % (header_rows, self._num_rows))
+        start = max(start, header_rows)
+        if start > stop or stop > self._num_rows:
+            raise ValueError(
+                'Bad row window (%d, %d).  Expected %d <= start <= stop '
+                '<= %d.' % (start, stop, header_rows, self._num_rows))
+        return (self._TABLE_OPEN_HTML
+                + self._render_window_html(0, header_rows)
+                + self._render_window_html(start, stop)
+                + '</table>')
+
+    def page(self, index, size, header_rows=0):
+        """Returns page index (of size rows each) of the table.
+
+        The first header_rows rows are repeated at the top of every page
+        and are not counted as page rows.  The returned TablePage is
+        rendered by IPython, and its .html attribute holds its HTML.
+        """
+        if size < 1:
+            raise ValueError('Page size must be at least 1.')
+        num_pages = max(1, -(-(self._num_rows - header_rows) // size))
+        if not 0 <= index < num_pages:
+            raise ValueError(
+                'Bad page (%d).  Expected page in range 0 to %d.' %
+                (index, num_pages - 1))
+        start = header_rows + index * size
+        stop = min(start + size, self._num_rows)
+        return TablePage(self.render_rows(start, stop, header_rows),
+                         index, num_pages, start, stop)
 
     @property
     def themes(self):
@@ -168,48 +893,311 @@ class IpyTable(object):
         """
 
         if theme_name in self.themes:
-            # Color rows in alternating colors
-            for row in range(len(self.array)):
-                if row % 2:
-                    self.set_row_style(row, color='Ivory')
-                else:
-                    self.set_row_style(row, color='AliceBlue')
-            # Color column header
-            if not theme_name == 'basic_left':
-                self.set_row_style(0, bold=True, color='LightGray')
-            # Color row header
-            if not theme_name == 'basic':
-                self.set_column_style(0, bold=True, color='LightGray')
-            # Remove upper left corner cell (make white with no left
-            # and no top border)
-            if theme_name == 'basic_both':
-                self.set_cell_style(0, 0, color='White', no_border='left,top')
+            self._theme = theme_name
+            self._apply_theme_to_rows(theme_name, range(self._num_rows))
         else:
             raise ValueError('Unknown theme "%s". Expected one of %s.' %
                              (theme_name, str(self.themes)))
 
-    def set_cell_style(self, row, column, **style_args):
-        """Apply style(s) to a single cell."""
+    def set_cell_style(self, row, column, style=None, **style_args):
+        """Apply style(s) to a single cell.
+
+        style is an optional Style (or dictionary of style arguments),
+        which is combined with the style arguments.
+        """
         self._range_check(row=row, column=column)
-        self._set_cell_style_norender(row, column, **style_args)
+        cell_style = self._resolve_style(style, style_args)
+        self._touch()
+        self._apply_cell_style(row, column, cell_style)
 
-    def set_row_style(self, row, **style_args):
+    def set_row_style(self, row, style=None, **style_args):
         """Apply style(s) to a table row."""
         self._range_check(row=row)
+        cell_style = self._resolve_style(style, style_args)
+        self._touch()
         for column in range(self._num_columns):
-            self._set_cell_style_norender(row, column, **style_args)
+            self._apply_cell_style(row, column, cell_style)
 
-    def set_column_style(self, column, **style_args):
+    def set_column_style(self, column, style=None, **style_args):
         """Apply style(s) to  a table column."""
         self._range_check(column=column)
+        cell_style = self._resolve_style(style, style_args)
+        self._touch()
         for row in range(self._num_rows):
-            self._set_cell_style_norender(row, column, **style_args)
+            self._apply_cell_style(row, column, cell_style)
 
-    def set_global_style(self, **style_args):
+    def set_global_style(self, style=None, **style_args):
         """Apply style(s) to all table cells."""
+        cell_style = self._resolve_style(style, style_args)
+        self._touch()
         for row in range(self._num_rows):
             for column in range(self._num_columns):
-                self._set_cell_style_norender(row, column, **style_args)
+                self._apply_cell_style(row, column, cell_style)
+
+    def set_column_formatter(self, column, fn_or_spec):
+        """Set the formatter which converts a column's values to text.
+
+        fn_or_spec is a callable (value => text), the name of a built-in
+        formatter ('int', 'float', 'percent', 'datetime' or 'string') or a
+        format string ('{:,.2f}' or '%0.2f').  See the ipy_table.formatters
+        module for details.  Pass None to restore the default formatting.
+        """
+        self._range_check(column=column)
+        if fn_or_spec is None:
+            self._column_formatters.pop(column, None)
+        else:
+            # Validate the formatter
+            resolve_formatter(fn_or_spec, _format_default)
+            self._column_formatters[column] = fn_or_spec
+        self._touch()
+        self._formatter_memo = None
+
+    def set_column_memoization(self, column, memoize=True,
+                               max_entries=_TextMemo.DEFAULT_MAX_ENTRIES):
+        """Memoize the formatted text of a column's values.
+
+        Columns with few distinct values (status strings, repeated IDs,
+        rounded floats) are rendered faster by formatting each distinct
+        value once.  memoize can be True, False or None (automatic: the
+        column is memoized if a sample of its values has low
+        cardinality, which is the default).  At most max_entries
+        formatted values are kept per column (oldest evicted first).
+        Statistics are reported by format_memo_info().
+        """
+        self._range_check(column=column)
+        if memoize is None:
+            self._column_memoization.pop(column, None)
+        else:
+            self._column_memoization[column] = (memoize, max_entries)
+        self._formatter_memo = None
+
+    def format_memo_info(self):
+        """Returns formatted text memo statistics, by column.
+
+        Returns a dictionary of column => dict(hits, misses, entries,
+        max_entries) for the memoized columns.
+        """
+        self._get_column_formatters()
+        return dict([(column, memo.info())
+                     for column, memo in self._text_memos.items()])
+
+    def set_value(self, row, column, value):
+        """Set the data value of a single cell (styles are unchanged)."""
+        self._range_check(row=row, column=column)
+        self._touch()
+        self._data_revision += 1
+        if not _is_numpy_array(self.array):
+            self._make_rows_mutable()
+            if not isinstance(self.array[row], list):
+                self.array[row] = list(self.array[row])
+        self.array[row][column] = value
+        self._invalidate_rows(row)
+
+    def append_rows(self, rows, style=None):
+        """Append rows of data to the end of the table.
+
+        The new rows get the default cell style, plus the row styling of
+        the most recently applied theme (if any), plus the (optional)
+        style, a Style or dictionary of style arguments.  Rows are
+        inserted above the summary rows (see add_summary_row()), if any.
+
+        Example:
+            table.append_rows([[1, 2, 3], [4, 5, 6]], style=dict(italic=True))
+        """
+        self._insert_rows(self._num_rows - len(self._summary_rows), rows,
+                          style)
+
+    def add_summary_row(self, funcs, label=None, label_column=0,
+                        header_rows=1, style=None):
+        """Append a summary (footer) row of column aggregates.
+
+        Arguments:
+            funcs: Dictionary of column => aggregate.  Columns are column
+                numbers or labels of the header row (row 0).  Aggregates
+                are 'sum', 'mean', 'count', 'min', 'max', or a callable
+                which is passed the list of values.
+            label: Optional text (e.g. 'Total') for the label_column cell
+                (if it is not aggregated).
+            header_rows: The number of leading rows which are not data.
+            style: Style (or dictionary of style arguments) of the
+                summary row (default bold with a thick top border).
+
+        Aggregates are computed over the numeric values (excluding NaN and
+        bool) of the data rows, which are the rows between the header
+        rows and the summary rows.  They are recomputed (when the table
+        is rendered) only after the table data has changed.
+
+        Example:
+            table.add_summary_row({'price': 'sum', 'qty': 'mean'},
+                                  label='Total')
+        """
+        resolved = {}
+        for column, func in funcs.items():
+            column = self._column_index(column)
+            if callable(func):
+                resolved[column] = func
+            elif func in _SUMMARY_FUNCTIONS:
+                resolved[column] = _SUMMARY_FUNCTIONS[func]
+            else:
+                raise ValueError(
+                    'Unknown aggregate "%s". Expected a callable, or one of '
+                    '%s.' % (func, sorted(_SUMMARY_FUNCTIONS)))
+        self._range_check(column=label_column)
+        if style is None:
+            style = _SUMMARY_STYLE
+
+        row_data = [''] * self._num_columns
+        if label is not None and label_column not in resolved:
+            row_data[label_column] = label
+        self._insert_rows(self._num_rows, [row_data], style)
+        self._summary_rows.append(dict(funcs=resolved,
+                                       header_rows=header_rows))
+        self._summary_revision = None
+
+    def delete_rows(self, start, stop=None):
+        """Delete table rows start (inclusive) to stop (exclusive).
+
+        If stop is None only row start is deleted.  Row spans which
+        extend into the deleted rows are shortened accordingly.  Cell
+        styles (including theme colors) stay with their rows.
+        """
+        if stop is None:
+            stop = start + 1
+        self._range_check(row=start)
+        if stop <= start or stop > self._num_rows:
+            raise ValueError(
+                'Bad stop row (%d).  Expected stop in range %d to %d.' %
+                (stop, start + 1, self._num_rows))
+        self._touch()
+        self._data_revision += 1
+        self._rows_revision += 1
+        self._make_rows_mutable()
+        num_deleted = stop - start
+
+        # Forget deleted summary rows
+        first_summary_row = self._num_rows - len(self._summary_rows)
+        self._summary_rows = [
+            summary for (row, summary) in enumerate(
+                self._summary_rows, first_summary_row)
+            if not start <= row < stop]
+
+        row_spans = {}
+        for (row, column), row_span in self._row_spans.items():
+            if row < start:
+                if row + row_span > start:
+                    # Span reaches into the deleted rows; shorten it
+                    row_span -= min(row + row_span, stop) - start
+                    self._invalidate_rows(row)
+                    if row_span > 1:
+                        self._cell_styles[row][column]['row_span'] = row_span
+                    else:
+                        del self._cell_styles[row][column]['row_span']
+                if row_span > 1:
+                    row_spans[(row, column)] = row_span
+            elif row >= stop:
+                row_spans[(row - num_deleted, column)] = row_span
+            else:
+                # The span anchor is deleted, so un-hide the surviving
+                # cells it covered
+                self._invalidate_rows(stop, max(stop, row + row_span))
+                for covered_row in range(stop, row + row_span):
+                    self._cell_styles[covered_row][column].pop(
+                        'suppress', None)
+        self._row_spans = row_spans
+
+        del self.array[start:stop]
+        del self._cell_styles[start:stop]
+        self._splice_row_digests(start, stop, 0)
+        self._num_rows -= num_deleted
+        if self._theme is not None:
+            # Rows below the deleted rows are re-colored, as their parity
+            # may have changed
+            self._apply_theme_to_rows(
+                self._theme, range(start, self._num_rows))
+
+    def __getitem__(self, key):
+        """Returns a view of rows (and columns) of the table.
+
+        key is table[rows] or table[rows, columns], where rows and columns
+        are each an index, a slice, a sequence of indices or a sequence of
+        booleans (a mask).  The view shares the data and cell styles of
+        the table (see the ipy_table.views module).
+
+        Example:
+            table[1:100, [0, 2, 3]]
+        """
+        from .views import TableView
+        if isinstance(key, tuple):
+            if len(key) != 2:
+                raise IndexError('Expected table[rows] or '
+                                 'table[rows, columns].')
+            rows_key, columns_key = key
+        else:
+            rows_key, columns_key = key, None
+        rows = _select_indices(rows_key, self._num_rows, 'row')
+        if columns_key is None:
+            columns = None
+        else:
+            columns = _select_indices(columns_key, self._num_columns, 'column')
+        return TableView(self, rows, columns)
+
+    def sort_by(self, column, descending=False, header_rows=1):
+        """Returns a view of the table with its data rows sorted by a column.
+
+        column is a column number or a label of the header row (row 0).
+        The first header_rows rows and the summary rows (if any) keep
+        their positions.  The sort is stable.  The view shares the data
+        and cell styles of the table (see the ipy_table.views module).
+        """
+        from .views import TableView
+        column = self._column_index(column)
+        start, stop = self._data_row_range(header_rows)
+        if _is_numpy_array(self.array):
+            values = self.array[start:stop, column]
+            if descending:
+                # Stable descending order
+                order = (len(values) - 1 -
+                         values[::-1].argsort(kind='mergesort')[::-1]).tolist()
+            else:
+                order = values.argsort(kind='mergesort').tolist()
+        else:
+            values = [row_data[column] for row_data in self.array[start:stop]]
+            indices = range(len(values))
+            try:
+                order = sorted(indices, key=values.__getitem__,
+                               reverse=descending)
+            except TypeError:
+                # Mixed types: numbers first, then the others by text
+                order = sorted(indices, key=lambda index: _mixed_sort_key(
+                    values[index]), reverse=descending)
+        return TableView(self, list(range(start))
+                         + [start + index for index in order]
+                         + list(range(stop, self._num_rows)))
+
+    def filter(self, mask_or_predicate, header_rows=1):
+        """Returns a view of the table showing only some of its data rows.
+
+        mask_or_predicate is either a sequence of booleans (one per data
+        row) or a function called with the data of each data row,
+        returning True for the rows to show.  The first header_rows rows
+        and the summary rows (if any) are always shown.  The view shares
+        the data and cell styles of the table (see the ipy_table.views
+        module).
+        """
+        from .views import TableView
+        start, stop = self._data_row_range(header_rows)
+        if callable(mask_or_predicate):
+            rows = [row for row in range(start, stop)
+                    if mask_or_predicate(self.array[row])]
+        else:
+            mask = list(mask_or_predicate)
+            if len(mask) != stop - start:
+                raise ValueError(
+                    'Bad mask length (%d).  Expected one value per data row '
+                    '(%d).' % (len(mask), stop - start))
+            rows = [row for (row, keep) in enumerate(mask, start) if keep]
+        return TableView(self, list(range(start)) + rows
+                         + list(range(stop, self._num_rows)))
 
     def _range_check(self, **check_args):
         """Range check row and/or column index
@@ -236,55 +1224,288 @@ class IpyTable(object):
     # Internal methods
     #---------------------------------
 
+    def _insert_rows(self, position, rows, style):
+        """Insert rows of data above row position (see append_rows())."""
+        rows = [list(row) for row in rows]
+        for row_data in rows:
+            if len(row_data) != self._num_columns:
+                raise ValueError(
+                    'Appended rows must have %d columns.' % self._num_columns)
+        if not rows:
+            return
+        if style and not isinstance(style, Style):
+            style = Style(**style)
+        self._touch()
+        self._data_revision += 1
+        self._rows_revision += 1
+        self._make_rows_mutable()
+        first_new_row = position
+        self.array[position:position] = rows
+        self._cell_styles[position:position] = [
+            [{'float_format': '%0.4f'} for dummy in range(self._num_columns)]
+            for dummy2 in rows]
+        self._splice_row_digests(position, position, len(rows))
+        self._num_rows += len(rows)
+        if position < self._num_rows - len(rows):
+            # Shift the row spans of the rows below
+            self._row_spans = dict(
+                [((row + len(rows) if row >= position else row, column),
+                  row_span)
+                 for (row, column), row_span in self._row_spans.items()])
+
+        # Propagate thick bottom borders of the previous row
+        if first_new_row > 0:
+            for column in range(self._num_columns):
+                previous_style = self._cell_styles[first_new_row - 1][column]
+                if ('thick_border' in previous_style
+                        and 'bottom' in self._split_by_comma(
+                            previous_style['thick_border'])):
+                    self._merge_cell_style(first_new_row, column,
+                                           _THICK_TOP_STYLE)
+
+        new_rows = range(first_new_row, first_new_row + len(rows))
+        if self._theme is not None:
+            # (Rows below the new rows are re-colored, as their parity
+            # may have changed)
+            self._apply_theme_to_rows(
+                self._theme, range(first_new_row, self._num_rows))
+        if style:
+            for row in new_rows:
+                self.set_row_style(row, style)
+
+    def _refresh_summary_rows(self):
+        """Recompute the summary rows if the table data has changed."""
+        if (not self._summary_rows
+                or self._summary_revision == self._data_revision):
+            return
+        first_summary_row = self._num_rows - len(self._summary_rows)
+        for row, summary in enumerate(self._summary_rows, first_summary_row):
+            funcs = summary['funcs']
+            columns = sorted(funcs)
+            row_data = self.array[row]
+            for column, values in zip(columns, _numeric_columns(
+                    self.array[summary['header_rows']:first_summary_row],
+                    columns)):
+                row_data[column] = funcs[column](values)
+        self._invalidate_rows(first_summary_row, self._num_rows)
+        self._summary_revision = self._data_revision
+        self._touch()
+
+    def _column_index(self, column):
+        """Returns the number of a column given its number or header label."""
+        if isinstance(column, numbers.Integral):
+            self._range_check(column=column)
+            return column
+        header = list(self.array[0])
+        if column not in header:
+            raise ValueError('Unknown column "%s". Expected a column number '
+                             'or one of %s.' % (column, header))
+        return header.index(column)
+
+    def _data_row_range(self, header_rows):
+        """Returns (start, stop) of the data rows.
+
+        Data rows are the rows below the first header_rows rows and
+        above the summary rows.
+        """
+        if not 0 <= header_rows <= self._num_rows:
+            raise ValueError(
+                'Bad header_rows (%d).  Expected header_rows in range 0 '
+                'to %d.' % (header_rows, self._num_rows))
+        stop = max(header_rows, self._num_rows - len(self._summary_rows))
+        return header_rows, stop
+
+    def _touch(self):
+        """Record that the table data or styles have changed.
+
+        Must be called by every method which modifies the table.
+        """
+        self._fingerprint_memo = None
+        self._revision += 1
+
+    def _fingerprint(self):
+        """Returns a hex digest of the data and style state of the table.
+
+        Tables with equal fingerprints render to identical HTML.  Returns
+        None if the table contains data which can not be fingerprinted
+        (unpicklable objects), or callable column formatters: a callable
+        is pickled by name, so a redefined formatter would not change the
+        digest.  Note that modifying .array directly is not detected.
+
+        The digest is the root of a tree of digests: a digest of every
+        row (data and styles), a digest of every block of row digests,
+        and the root digest of the block digests and the column
+        formatters.  Changes mark the digests of the rows they modify as
+        stale (see _invalidate_rows()), so only those rows (and their
+        blocks) are hashed again.
+        """
+        if self._fingerprint_memo is None:
+            if not all(isinstance(fn_or_spec, string_types)
+                       for fn_or_spec in self._column_formatters.values()):
+                return None
+            try:
+                self._update_row_digests()
+                state = pickle.dumps(
+                    (type(self).__name__, self._num_columns,
+                     sorted(self._column_formatters.items())),
+                    pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                return None
+            root = hashlib.sha1(state)
+            for block_digest in self._block_digests:
+                root.update(block_digest)
+            self._fingerprint_memo = root.hexdigest()
+        return self._fingerprint_memo
+
+    def _update_row_digests(self):
+        """Compute the stale row and block digests (see _fingerprint())."""
+        if self._row_digests is None:
+            self._row_digests = [None] * self._num_rows
+            self._block_digests = []
+        row_digests = self._row_digests
+        block_digests = self._block_digests
+        num_blocks = -(-self._num_rows // _FINGERPRINT_BLOCK_ROWS)
+        block_digests.extend([None] * (num_blocks - len(block_digests)))
+        for block in range(num_blocks):
+            if block_digests[block] is not None:
+                continue
+            start = block * _FINGERPRINT_BLOCK_ROWS
+            stop = min(start + _FINGERPRINT_BLOCK_ROWS, self._num_rows)
+            for row in range(start, stop):
+                if row_digests[row] is None:
+                    row_digests[row] = self._row_digest(row)
+            block_digests[block] = hashlib.sha1(
+                b''.join(row_digests[start:stop])).digest()
+
+    def _row_digest(self, row):
+        """Returns the digest of the data and styles of a single row."""
+        cell_styles = self._cell_styles
+        if isinstance(cell_styles, _LazyStyleRows):
+            row_styles = cell_styles.peek(row)
+        else:
+            row_styles = cell_styles[row]
+        # (Style items are sorted, so equal styles have equal digests)
+        state = pickle.dumps(
+            (list(self.array[row]),
+             [sorted(cell_style.items()) for cell_style in row_styles]),
+            pickle.HIGHEST_PROTOCOL)
+        return hashlib.sha1(state).digest()
+
+    def _invalidate_rows(self, start, stop=None):
+        """Mark the fingerprint digests of rows start to stop as stale.
+
+        If stop is None only row start is marked.
+        """
+        if self._row_digests is None:
+            return
+        if stop is None:
+            stop = start + 1
+        for row in range(start, stop):
+            self._row_digests[row] = None
+        num_blocks = len(self._block_digests)
+        for block in range(start // _FINGERPRINT_BLOCK_ROWS,
+                           min((stop - 1) // _FINGERPRINT_BLOCK_ROWS + 1,
+                               num_blocks)):
+            self._block_digests[block] = None
+
+    def _splice_row_digests(self, start, stop, num_new_rows):
+        """Update the fingerprint digests for replaced rows.
+
+        Rows start to stop (exclusive) have been replaced by
+        num_new_rows new rows (stale digests).
+        """
+        if self._row_digests is None:
+            return
+        self._row_digests[start:stop] = [None] * num_new_rows
+        # The rows below have moved to other blocks
+        del self._block_digests[start // _FINGERPRINT_BLOCK_ROWS:]
+
+    def _make_rows_mutable(self):
+        """Convert the table data to a list (needed to add/remove rows)."""
+        if _is_numpy_array(self.array):
+            self.array = self.array.tolist()
+            # (Row values are no longer numpy scalars)
+            self._row_digests = None
+        elif not isinstance(self.array, list):
+            self.array = list(self.array)
+        if isinstance(self._cell_styles, _LazyStyleRows):
+            self._cell_styles = self._cell_styles.to_list()
+
+    def _apply_theme_to_rows(self, theme_name, rows):
+        """Apply a formatting theme to a range of table rows."""
+        header_rows = [row for row in rows
+                       if self._theme_row_index(row) == 0]
+        # Color rows in alternating colors
+        for row in rows:
+            if self._theme_row_index(row) % 2:
+                self.set_row_style(row, _THEME_STYLES['odd'])
+            else:
+                self.set_row_style(row, _THEME_STYLES['even'])
+        # Color column header
+        if not theme_name == 'basic_left':
+            for row in header_rows:
+                self.set_row_style(row, _THEME_STYLES['header'])
+        # Color row header
+        if not theme_name == 'basic':
+            for row in rows:
+                self.set_cell_style(row, 0, _THEME_STYLES['header'])
+        # Remove upper left corner cell (make white with no left
+        # and no top border)
+        if theme_name == 'basic_both':
+            for row in header_rows:
+                self.set_cell_style(row, 0, _THEME_STYLES['corner'])
+
+    def _theme_row_index(self, row):
+        """Returns the index of a row for theme purposes.
+
+        Row 0 is styled as the column header, and rows are colored
+        alternately by the parity of this index.
+        """
+        return row
+
     def _build_style_dict(self, **style_args):
         """Returns a cell style dictionary based on the style arguments."""
-        style_dict = copy.deepcopy(style_args)
-        for border_type in ['thick_border', 'no_border']:
-            if border_type in style_dict:
-                border_setting = style_dict[border_type]
-
-                # Type checking
-
-                if not isinstance(border_setting, string_types):
-                    raise TypeError(
-                        ('%s must be a string of comma ' % border_type) +
-                        'separated border names (e.g. "left,right")')
-                # Value checking
-                if (set(border_setting.replace(' ', '').split(',')) -
-                        IpyTable._valid_borders):
-                    raise ValueError(
-                        ('%s must be a string of comma ' % border_type) +
-                        'separated border names (e.g. "left,right"). Valid ' +
-                        'border names: %s' %
-                        str(IpyTable._valid_borders))
-                # Substitute all edges for 'all'
-                if border_setting == 'all':
-                    style_dict[border_type] = 'left,right,top,bottom'
-
-        return style_dict
+        return _normalize_style(style_args)
+
+    def _resolve_style(self, style, style_args):
+        """Returns the cell style dictionary of a style and style arguments.
+
+        The dictionary of a Style is returned as is (it must not be
+        modified).
+        """
+        if style is None:
+            return self._build_style_dict(**style_args)
+        if not isinstance(style, Style):
+            style = Style(**style)
+        if style_args:
+            style = style + Style(**style_args)
+        return style._style_dict
 
     def _merge_cell_style(self, row, column, cell_style):
         """Merge new cell style dictionary into the old
 
         Existing items are superseded by new.
         """
-        styles = self._cell_styles[row][column]
-        for (new_key, new_value) in cell_style.items():
-            if (new_key in ['thick_border', 'no_border']) and (new_key in styles):
-                # Merge the two border lists
-                old_borders = self._split_by_comma(styles[new_key])
-                new_borders = self._split_by_comma(new_value)
-                styles[new_key] = ",".join(
-                    old_borders + list(set(new_borders) - set(old_borders)))
-            else:
-                styles[new_key] = new_value
+        _merge_style(self._cell_styles[row][column], cell_style)
+        self._invalidate_rows(row)
 
     def _set_cell_style_norender(self, row, column, **style_args):
         """Apply style(s) to a single cell, without rendering."""
-        cell_style = self._build_style_dict(**style_args)
+        self._apply_cell_style(row, column,
+                               self._build_style_dict(**style_args))
 
+    def _apply_cell_style(self, row, column, cell_style):
+        """Apply a cell style dictionary to a single cell.
+
+        cell_style is not modified (it may be the dictionary of a Style).
+        """
         self._merge_cell_style(row, column, cell_style)
         if 'row_span' in cell_style:
+            if cell_style['row_span'] > 1:
+                self._row_spans[(row, column)] = cell_style['row_span']
+            else:
+                self._row_spans.pop((row, column), None)
+            self._invalidate_rows(row + 1, row + cell_style['row_span'])
             for row in range(row + 1, row + cell_style['row_span']):
                 self._cell_styles[row][column]['suppress'] = True
         if 'column_span' in cell_style:
@@ -298,36 +1519,133 @@ class IpyTable(object):
         if ('thick_border' in cell_style
                 and 'right' in cell_style['thick_border']
                 and column + 1 < self._num_columns):
-            self._merge_cell_style(
-                row, column + 1,
-                self._build_style_dict(thick_border='left'))
+            self._merge_cell_style(row, column + 1, _THICK_LEFT_STYLE)
 
         # If a clear left hand border was specified, then also apply it
         # to the right of the adjacent cell (if one exists)
         if ('no_border' in cell_style
                 and 'left' in cell_style['no_border']
                 and column > 0):
-            self._merge_cell_style(
-                row, column - 1,
-                self._build_style_dict(no_border='right'))
+            self._merge_cell_style(row, column - 1, _NO_RIGHT_STYLE)
 
         # If a thick bottom border was specified, then also apply it to
         # the top of the adjacent cell (if one exists)
         if ('thick_border' in cell_style
                 and 'bottom' in cell_style['thick_border']
                 and row + 1 < self._num_rows):
-            self._merge_cell_style(
-                row + 1, column,
-                self._build_style_dict(thick_border='top'))
+            self._merge_cell_style(row + 1, column, _THICK_TOP_STYLE)
 
         # If a clear top border was specified, then also apply it to
         # the bottom of the adjacent cell (if one exists)
         if ('no_border' in cell_style
                 and 'top' in cell_style['no_border']
                 and row > 0):
-            self._merge_cell_style(
-                row - 1, column,
-                self._build_style_dict(no_border='bottom'))
+            self._merge_cell_style(row - 1, column, _NO_BOTTOM_STYLE)
+
+    def _render_rows_html(self, start, stop):
+        """Returns the HTML of table rows start (inclusive) to stop."""
+        self._refresh_summary_rows()
+        return ''.join([self._render_row_html(row)
+                        for row in range(start, stop)])
+
+    def _render_window_html(self, start, stop):
+        """Returns the HTML of table rows start to stop as a standalone block.
+
+        Row spans are clipped to the window: a cell spanning into the
+        window from a row above is rendered in the first window row, and
+        spans extending below the window are shortened.  Only the row span
+        index is scanned, so the cost is proportional to the window size.
+        """
+        self._refresh_summary_rows()
+        # row => {column: anchor row of a span cell to render there}
+        clipped = {}
+        for (row, column), row_span in self._row_spans.items():
+            if row < start < row + row_span:
+                clipped.setdefault(start, {})[column] = row
+            elif start <= row < stop < row + row_span:
+                clipped.setdefault(row, {})[column] = row
+
+        chunks = []
+        for row in range(start, stop):
+            if row not in clipped:
+                chunks.append(self._render_row_html(row))
+                continue
+            row_data = list(self.array[row])
+            row_styles = list(self._cell_styles[row])
+            for column, anchor_row in clipped[row].items():
+                cell_style = dict(self._cell_styles[anchor_row][column])
+                cell_style.pop('suppress', None)
+                row_span = min(anchor_row + cell_style['row_span'],
+                               stop) - row
+                if row_span > 1:
+                    cell_style['row_span'] = row_span
+                else:
+                    del cell_style['row_span']
+                row_data[column] = self.array[anchor_row][column]
+                row_styles[column] = cell_style
+            chunks.append(self._render_cells_html(row_data, row_styles))
+        return ''.join(chunks)
+
+    def _render_row_html(self, row):
+        """Returns the HTML of a single table row (<tr>...</tr>)."""
+        cell_styles = self._cell_styles
+        if isinstance(cell_styles, _LazyStyleRows):
+            row_tags = cell_styles.peek_tags(row)
+            if row_tags is not None:
+                return self._render_tagged_cells_html(
+                    self.array[row], cell_styles.peek(row), row_tags)
+            row_styles = cell_styles.peek(row)
+        else:
+            row_styles = cell_styles[row]
+        return self._render_cells_html(self.array[row], row_styles)
+
+    def _render_tagged_cells_html(self, row_data, row_styles, row_tags):
+        """Returns the HTML of a table row with pre-rendered cell tags.
+
+        row_tags holds the (opening, closing) HTML around the text of
+        every cell (None for suppressed cells), as rendered by
+        _render_cells_html() for the row styles.
+        """
+        html = '<tr>'
+        formatters = self._get_column_formatters()
+        for (column, item) in enumerate(row_data):
+            tags = row_tags[column]
+            if tags is not None:
+                html += (tags[0] + formatters[column](item, row_styles[column])
+                         + tags[1])
+        html += '</tr>'
+        return html
+
+    def _render_cells_html(self, row_data, row_styles):
+        """Returns the HTML of a table row, given its data and styles."""
+        #---------------------------------------
+        # Generate ROW tag (<tr>)
+        #---------------------------------------
+        html = '<tr>'
+        formatters = self._get_column_formatters()
+        for (column, item) in enumerate(row_data):
+            cell_style = row_styles[column]
+            if not _key_is_valid(cell_style, 'suppress'):
+
+                #---------------------------------------
+                # Generate CELL tag (<td>)
+                #---------------------------------------
+                # Convert the cell contents to (escaped) HTML text
+                item_html = formatters[column](item, cell_style)
+
+                # Add bold and italic tags if set
+                if _key_is_valid(cell_style, 'bold'):
+                    item_html = '<b>' + item_html + '</b>'
+                if _key_is_valid(cell_style, 'italic'):
+                    item_html = '<i>' + item_html + '</i>'
+
+                # Get html style string
+                style_html = self._get_style_html(cell_style)
+
+                # Append cell
+                html += '<td' + style_html + '>' + item_html + '</td>'
+        html += '</tr>'
+        return html
 
     def _get_style_html(self, style_dict):
         """Parse the style dictionary and return equivalent html style text."""
@@ -381,27 +1699,201 @@ class IpyTable(object):
         """Apply formatting to cell contents.
 
         Applies float format to item if item is a float (or numpy float).
+        Escapes HTML special characters unless escape is disabled.
         Converts spaces to non-breaking if wrap is not enabled.
         Returns string.
         """
-        if _is_float_type(item) and 'float_format' in cell_style:
-            text = cell_style['float_format'] % item
-        else:
-            if isinstance(item, string_types):
-                text = item
-            else:
-                text = str(item)
+        return _text_to_html(_format_default(item, cell_style), cell_style)
 
-        # If cell wrapping is not specified
-        if not ('wrap' in cell_style and cell_style['wrap']):
-            # Convert all spaces to non-breaking and return
-            text = text.replace(' ', '&nbsp;')
-        return text
+    def _get_column_formatters(self):
+        """Returns a list of formatter functions (item, cell_style) => html.
+
+        On first use, a type inference pass over the table data selects a
+        specialized formatter for every column (avoiding the per-cell type
+        checks of the default formatter), which is combined with the
+        column formatter set by set_column_formatter() (if any).
+        """
+        if self._formatter_memo is None:
+            formatters = []
+            self._text_memos = {}
+            # Only a sample of the rows is inspected: values of types not
+            # seen in the sample are handled as they are encountered.
+            # (Rows read by block are sampled from the first block only.)
+            if isinstance(self.array, _BlockRows):
+                sample = self.array.sample(min(
+                    _CARDINALITY_SAMPLE,
+                    self.array._header_rows + self.array.BLOCK_ROWS))
+            else:
+                sample = list(itertools.islice(self.array,
+                                               _CARDINALITY_SAMPLE))
+            for column in range(self._num_columns):
+                column_values = [row_data[column] for row_data in sample]
+                item_types = set([type(item) for item in column_values])
+                formatter = _make_inferred_formatter(item_types)
+                if column in self._column_formatters:
+                    formatter = _make_html_formatter(resolve_formatter(
+                        self._column_formatters[column], _format_default))
+
+                memoize, max_entries = self._column_memoization.get(
+                    column, (None, _TextMemo.DEFAULT_MAX_ENTRIES))
+                if memoize is None:
+                    memoize = _has_low_cardinality(column_values)
+                if memoize:
+                    memo = self._text_memos[column] = _TextMemo(max_entries)
+                    formatter = memo.wrap(formatter)
+                formatters.append(formatter)
+            self._formatter_memo = formatters
+        return self._formatter_memo
 
     def _split_by_comma(self, comma_delimited_text):
         """Returns a list of the words in the comma delimited text."""
         return comma_delimited_text.replace(' ', '').split(',')
 
+class Style(object):
+    """A validated, immutable set of style arguments.
+
+    Style(**style_args) takes the style arguments described in the module
+    documentation, which are validated and normalized once.  A Style can
+    be passed to any of the style formatting functions (optionally along
+    with further style arguments), and as the style of append_rows() and
+    add_summary_row().  Applying a Style does not repeat the validation.
+
+    Styles are hashable, and are combined with +, where the items of the
+    right hand style supersede those of the left, except border lists
+    which are merged.  A Style is a read-only mapping of its style
+    arguments (so **style can also be used).
+
+    Example:
+        highlight = Style(bold=True, color='Yellow')
+        table.set_row_style(3, highlight)
+        table.set_cell_style(4, 0, highlight + Style(thick_border='all'))
+    """
+
+    __slots__ = ('_style_dict', '_key')
+
+    def __init__(self, **style_args):
+        self._initialize(_normalize_style(style_args))
+
+    def _initialize(self, style_dict):
+        object.__setattr__(self, '_style_dict', style_dict)
+        object.__setattr__(self, '_key', tuple(sorted(
+            style_dict.items(), key=operator.itemgetter(0))))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Style objects are immutable.')
+
+    def __reduce__(self):
+        return (_make_style, (dict(self._style_dict),))
+
+    def __add__(self, other):
+        if not isinstance(other, Style):
+            return NotImplemented
+        style_dict = dict(self._style_dict)
+        _merge_style(style_dict, other._style_dict)
+        return _make_style(style_dict)
+
+    def __eq__(self, other):
+        if not isinstance(other, Style):
+            return NotImplemented
+        return self._key == other._key
+
+    def __ne__(self, other):
+        if not isinstance(other, Style):
+            return NotImplemented
+        return self._key != other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return 'Style(%s)' % ', '.join(
+            ['%s=%r' % item for item in self._key])
+
+    def __len__(self):
+        return len(self._style_dict)
+
+    def __iter__(self):
+        return iter(self._style_dict)
+
+    def __getitem__(self, name):
+        return self._style_dict[name]
+
+    def keys(self):
+        return self._style_dict.keys()
+
+
+def _make_style(style_dict):
+    """Returns a Style of a normalized style dictionary."""
+    style = Style.__new__(Style)
+    style._initialize(style_dict)
+    return style
+
+
+def _normalize_style(style_args):
+    """Returns a validated cell style dictionary of style arguments."""
+    style_dict = copy.deepcopy(style_args)
+    for border_type in ['thick_border', 'no_border']:
+        if border_type in style_dict:
+            border_setting = style_dict[border_type]
+
+            # Type checking
+
+            if not isinstance(border_setting, string_types):
+                raise TypeError(
+                    ('%s must be a string of comma ' % border_type) +
+                    'separated border names (e.g. "left,right")')
+            # Value checking
+            if (set(border_setting.replace(' ', '').split(',')) -
+                    IpyTable._valid_borders):
+                raise ValueError(
+                    ('%s must be a string of comma ' % border_type) +
+                    'separated border names (e.g. "left,right"). Valid ' +
+                    'border names: %s' %
+                    str(IpyTable._valid_borders))
+            # Substitute all edges for 'all'
+            if border_setting == 'all':
+                style_dict[border_type] = 'left,right,top,bottom'
+
+    return style_dict
+
+
+_THEME_STYLES = {
+    'odd': Style(color='Ivory'),
+    'even': Style(color='AliceBlue'),
+    'header': Style(bold=True, color='LightGray'),
+    'corner': Style(color='White', no_border='left,top'),
+}
+
+_SUMMARY_STYLE = Style(bold=True, thick_border='top')
+
+# Borders propagated to adjacent cells (see _apply_cell_style())
+_THICK_LEFT_STYLE = Style(thick_border='left')._style_dict
+_THICK_TOP_STYLE = Style(thick_border='top')._style_dict
+_NO_RIGHT_STYLE = Style(no_border='right')._style_dict
+_NO_BOTTOM_STYLE = Style(no_border='bottom')._style_dict
+
+
+class TablePage(object):
+    """A page of rows of an IpyTable (see IpyTable.page()).
+
+    Attributes:
+        html: The HTML of the page
+        index: The page number
+        num_pages: The number of pages in the table
+        start, stop: The table rows of the page (start inclusive)
+    """
+
+    def __init__(self, html, index, num_pages, start, stop):
+        self.html = html
+        self.index = index
+        self.num_pages = num_pages
+        self.start = start
+        self.stop = stop
+
+    def _repr_html_(self):
+        """IPython display protocol: HTML representation."""
+        return self.html
+
 #-----------------------------
 # Public functions
 #-----------------------------
@@ -409,10 +1901,6 @@ class IpyTable(object):
 
 def tabulate(data_list, columns, interactive=True):
     """Renders a list (not array) of items into an HTML table."""
-    global _TABLE
-    global _INTERACTIVE
-
-    _INTERACTIVE = interactive
     total_items = len(data_list)
     rows = int(total_items / columns)
     if total_items % columns:
@@ -428,44 +1916,41 @@ def tabulate(data_list, columns, interactive=True):
     array = [array[x:x + columns] for x in range(0, len(array), columns)]
 
     # Render the array
-    _TABLE = IpyTable(array)
+    interactive_session = _get_session()
+    interactive_session.table = IpyTable(array)
+    interactive_session.interactive = interactive
     return get_interactive_return_value()
 
 
 def make_table(array, interactive=True):
     """Create a table in interactive mode."""
-    global _TABLE
-    global _INTERACTIVE
-    _TABLE = IpyTable(array)
-    _INTERACTIVE = interactive
+    interactive_session = _get_session()
+    interactive_session.table = IpyTable(array)
+    interactive_session.interactive = interactive
     return get_interactive_return_value()
 
 
-def set_cell_style(row, column, **style_args):
+def set_cell_style(row, column, style=None, **style_args):
     """Apply style(s) to a single cell."""
-    global _TABLE
-    _TABLE.set_cell_style(row, column, **style_args)
+    _get_session().table.set_cell_style(row, column, style, **style_args)
     return get_interactive_return_value()
 
 
-def set_column_style(column, **style_args):
+def set_column_style(column, style=None, **style_args):
     """Apply style(s) to  a table column."""
-    global _TABLE
-    _TABLE.set_column_style(column, **style_args)
+    _get_session().table.set_column_style(column, style, **style_args)
     return get_interactive_return_value()
 
 
-def set_row_style(row, **style_args):
+def set_row_style(row, style=None, **style_args):
     """Apply style(s) to a table row."""
-    global _TABLE
-    _TABLE.set_row_style(row, **style_args)
+    _get_session().table.set_row_style(row, style, **style_args)
     return get_interactive_return_value()
 
 
-def set_global_style(**style_args):
+def set_global_style(style=None, **style_args):
     """Apply style(s) to all table cells."""
-    global _TABLE
-    _TABLE.set_global_style(**style_args)
+    _get_session().table.set_global_style(style, **style_args)
     return get_interactive_return_value()
 
 
@@ -475,15 +1960,13 @@ def apply_theme(style_name):
     The list of available themes is returned by the .themes property of
     an IpyTable object.
     """
-    global _TABLE
-    _TABLE.apply_theme(style_name)
+    _get_session().table.apply_theme(style_name)
     return get_interactive_return_value()
 
 
 def render():
-    """Render the current table.  Returns the global IpyTable object instance"""
-    global _TABLE
-    return _TABLE
+    """Render the current table.  Returns the working IpyTable object instance"""
+    return _get_session().table
 
 
 def get_interactive_return_value():
@@ -493,25 +1976,105 @@ def get_interactive_return_value():
     be used instead of the class interface to build up a table and
     interactively modify it's style, rendering the new table on each call.
 
-    By default all interactive functions return the working global
-    IpyTable object (_TABLE), which typically gets rendered by IPython.
+    By default all interactive functions return the working IpyTable
+    object of the current session, which typically gets rendered by IPython.
     That behavior can be suppressed by setting interactive=False
     when creating a new table with make_table() or tabulate().  If
     interactive rendering is suppressed then all interactive functions will
     return None, and rendering can be achieved explicitly by calling
-    render() (which will always return the working global IpyTable object).
+    render() (which will always return the working IpyTable object).
     """
-    global _INTERACTIVE
-    global _TABLE
-    if _INTERACTIVE:
-        return _TABLE
+    interactive_session = _get_session()
+    if interactive_session.interactive:
+        return interactive_session.table
     else:
         return None
 
+
+@contextmanager
+def session():
+    """Scope the interactive functions to a private working table.
+
+    Within a "with session():" block make_table(), set_cell_style(),
+    render(), etc. operate on a working table which is private to the
+    current thread or asyncio task, so tables built concurrently do not
+    clobber each other.  The previous working table is restored on exit.
+
+    Outside of any session() block each thread has its own default
+    working table, which preserves the classic single-user notebook
+    behavior.
+    """
+    token = _SESSION.set(_Session())
+    try:
+        yield
+    finally:
+        _SESSION.reset(token)
+
 #-----------------------------
 # Private functions
 #-----------------------------
 
+
+class _Session(object):
+    """Working state of the interactive functions."""
+
+    def __init__(self):
+        self.table = None
+        self.interactive = True
+
+
+class _ThreadLocalVar(object):
+    """Minimal stand-in for contextvars.ContextVar (Python < 3.7).
+
+    Values are scoped to the current thread.
+    """
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self._default = default
+        self._local = threading.local()
+
+    def get(self, *default):
+        if hasattr(self._local, 'value'):
+            return self._local.value
+        if default:
+            return default[0]
+        return self._default
+
+    def set(self, value):
+        token = (self._local.__dict__.get('value', _MISSING),)
+        self._local.value = value
+        return token
+
+    def reset(self, token):
+        if token[0] is _MISSING:
+            del self._local.value
+        else:
+            self._local.value = token[0]
+
+
+_MISSING = object()
+
+if contextvars is not None:
+    _SESSION = contextvars.ContextVar('ipy_table_session', default=None)
+else:
+    _SESSION = _ThreadLocalVar('ipy_table_session')
+
+# Default sessions (used outside of any session() block), one per thread
+_DEFAULT_SESSIONS = threading.local()
+
+
+def _get_session():
+    """Returns the interactive session of the current context."""
+    interactive_session = _SESSION.get()
+    if interactive_session is None:
+        interactive_session = getattr(_DEFAULT_SESSIONS, 'session', None)
+        if interactive_session is None:
+            interactive_session = _Session()
+            _DEFAULT_SESSIONS.session = interactive_session
+    return interactive_session
+
+
 _FLOAT_TYPES = [
     # Python 2
     "<type 'float'>",
@@ -522,12 +2085,13 @@ _FLOAT_TYPES = [
     "<type 'numpy.float128'>",
     # Python 3
     "<class 'float'>",
-    "<class 'numpy.float'>"
     "<class 'numpy.float'>",
     "<class 'numpy.float16'>",
     "<class 'numpy.float32'>",
     "<class 'numpy.float64'>",
     "<class 'numpy.float128'>",
+    # numpy >= 2.0 (float128 is an alias of longdouble)
+    "<class 'numpy.longdouble'>",
     ]
 
 def _is_float_type(value):
@@ -541,12 +2105,383 @@ def _is_float_type(value):
     return str(type(value)) in _FLOAT_TYPES
     
 
+# Header identifying the IpyTable.to_bytes() format
+_SERIAL_MAGIC = b'IPYT1'
+
+
+def _is_numpy_array(data):
+    """True if data is a numpy.ndarray (without importing numpy)."""
+    return str(type(data)) in ("<type 'numpy.ndarray'>",
+                               "<class 'numpy.ndarray'>")
+
+
+def _pack_array(data):
+    """Returns a compact picklable representation of table data.
+
+    A list of lists holding only floats (or only ints) is stored as a
+    flat typed array buffer, anything else is stored unmodified.
+    """
+    if (type(data) is list
+            and all(type(row) is list for row in data)):
+        for typecode, item_type in (('d', float), ('q', int)):
+            items = itertools.chain.from_iterable(data)
+            if all(type(item) is item_type for item in items):
+                try:
+                    return (typecode, _array.array(
+                        typecode, itertools.chain.from_iterable(data)))
+                except (OverflowError, ValueError):
+                    # Integers too large for the buffer (or no 'q'
+                    # typecode on this Python)
+                    pass
+    return (None, data)
+
+
+def _unpack_array(packed, num_columns):
+    """Inverse of _pack_array()."""
+    typecode, data = packed
+    if typecode is None:
+        return data
+    flat = data.tolist()
+    return [flat[start:start + num_columns]
+            for start in range(0, len(flat), num_columns)]
+
+
+def _style_key(cell_style):
+    """Returns a hashable key for a style dictionary (None if unhashable)."""
+    try:
+        key = tuple(sorted(cell_style.items()))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _format_float(item, cell_style):
+    """Default formatter for float cells."""
+    if 'float_format' in cell_style:
+        return cell_style['float_format'] % item
+    return str(item)
+
+
+def _format_string(item, cell_style):
+    """Default formatter for string cells."""
+    return item
+
+
+def _format_other(item, cell_style):
+    """Default formatter for all other cells."""
+    return str(item)
+
+
+def _get_type_formatter(item_type):
+    """Returns the default formatter function for values of a type."""
+    if str(item_type) in _FLOAT_TYPES:
+        return _format_float
+    if issubclass(item_type, string_types):
+        return _format_string
+    return _format_other
+
+
+def _format_default(item, cell_style):
+    """Default formatter (item, cell_style) => text."""
+    return _get_type_formatter(type(item))(item, cell_style)
+
+
+# Automatic memoization: sample size, minimum sample size, and maximum
+# ratio of distinct values to sampled values
+_CARDINALITY_SAMPLE = 1000
+_CARDINALITY_MIN_SAMPLE = 100
+_CARDINALITY_MAX_RATIO = 0.2
+
+# Types whose equal values always format identically (values of other
+# types are memoized by their repr(), see _TextMemo)
+_EXACT_MEMO_TYPES = frozenset(
+    integer_types + (bool, text_type, binary_type, type(None)))
+
+# Number of row digests combined in a block digest (see
+# IpyTable._fingerprint())
+_FINGERPRINT_BLOCK_ROWS = 256
+
+
+def _has_low_cardinality(column_values):
+    """True if a sample of the column values has few distinct values."""
+    sample = column_values[:_CARDINALITY_SAMPLE]
+    if len(sample) < _CARDINALITY_MIN_SAMPLE:
+        return False
+    try:
+        distinct = len(set([(type(item), item) for item in sample]))
+    except TypeError:
+        # Unhashable values
+        return False
+    return distinct <= len(sample) * _CARDINALITY_MAX_RATIO
+
+
+def _text_to_html(text, cell_style):
+    """Convert cell text to HTML.
+
+    Escapes the HTML special characters (unless escape is disabled) and
+    converts spaces to non-breaking (unless wrap is enabled).
+    """
+    # Chained str.replace() calls, guarded by a cheap membership test, are
+    # several times faster than a str.translate() pass on CPython.
+    if cell_style.get('escape', True) and (
+            '&' in text or '<' in text or '>' in text or '"' in text):
+        text = text.replace('&', '&amp;').replace('<', '&lt;') \
+            .replace('>', '&gt;').replace('"', '&quot;')
+    if not cell_style.get('wrap'):
+        text = text.replace(' ', '&nbsp;')
+    return text
+
+
+# Matches '%' conversion specifications with a field width (which can pad
+# the formatted value with spaces)
+_FORMAT_WIDTH_RE = re.compile(r'%[-#0+]*[1-9*]')
+
+# float_format string => True if its output never needs _text_to_html()
+_HTML_SAFE_FORMATS = {}
+
+
+def _float_to_html(item, cell_style):
+    """HTML formatter for float cells.
+
+    Skips the HTML conversion of the formatted value when the float format
+    can not produce special characters or spaces.
+    """
+    float_format = cell_style.get('float_format')
+    if float_format is None:
+        # str() of a float never needs conversion
+        return str(item)
+    text = float_format % item
+    safe = _HTML_SAFE_FORMATS.get(float_format)
+    if safe is None:
+        safe = _HTML_SAFE_FORMATS[float_format] = not (
+            '&' in float_format or '<' in float_format
+            or '>' in float_format or '"' in float_format
+            or ' ' in float_format
+            or _FORMAT_WIDTH_RE.search(float_format))
+    if safe:
+        return text
+    return _text_to_html(text, cell_style)
+
+
+def _integral_to_html(item, cell_style):
+    """HTML formatter for integer cells (str() never needs conversion)."""
+    return str(item)
+
+
+def _string_to_html(item, cell_style):
+    """HTML formatter for string cells."""
+    return _text_to_html(item, cell_style)
+
+
+def _other_to_html(item, cell_style):
+    """HTML formatter for all other cells."""
+    return _text_to_html(str(item), cell_style)
+
+
+def _get_type_html_formatter(item_type):
+    """Returns the default HTML formatter function for values of a type."""
+    if str(item_type) in _FLOAT_TYPES:
+        return _float_to_html
+    if issubclass(item_type, numbers.Integral):
+        return _integral_to_html
+    if issubclass(item_type, string_types):
+        return _string_to_html
+    return _other_to_html
+
+
+def _make_inferred_formatter(item_types):
+    """Returns an HTML formatter function for a column of item_types values.
+
+    The default formatter of each type is looked up once, and values of
+    any other type are handled as they are encountered.
+    """
+    type_formatters = dict([(item_type, _get_type_html_formatter(item_type))
+                            for item_type in item_types])
+
+    def format_item(item, cell_style):
+        item_type = type(item)
+        try:
+            formatter = type_formatters[item_type]
+        except KeyError:
+            formatter = type_formatters[item_type] = \
+                _get_type_html_formatter(item_type)
+        return formatter(item, cell_style)
+    return format_item
+
+
+def _make_html_formatter(text_formatter):
+    """Returns an HTML formatter function wrapping a text formatter."""
+    def format_item(item, cell_style):
+        return _text_to_html(text_formatter(item, cell_style), cell_style)
+    return format_item
+
+
+_DATAFRAME_TYPES = (
+    "<class 'pandas.core.frame.DataFrame'>",
+    # pandas >= 3.0
+    "<class 'pandas.DataFrame'>",
+    )
+
+
+def _is_pandas_dataframe(data):
+    """True if data is a pandas.DataFrame (without importing pandas)."""
+    return any(str(data_type) in _DATAFRAME_TYPES
+               for data_type in type(data).__mro__)
+
+
+def _column_values(values):
+    """Returns a list of the values of a pandas Series or Index.
+
+    bool, int and float64 data is converted to the equivalent Python
+    values in a single (C level) tolist() pass.  Other floats keep their
+    numpy type (str() of e.g. a numpy.float32 differs from str() of the
+    equivalent Python float).  Anything else (strings, datetimes,
+    categoricals, nullable extension types...) is converted to its Python
+    level objects.
+    """
+    if type(values.dtype).__module__.split('.')[0] != 'numpy':
+        # pandas extension type (to_numpy() would convert e.g. a
+        # nullable Int64 column with missing values to floats)
+        return values.astype(object).to_numpy().tolist()
+    array = values.to_numpy()
+    if array.dtype.kind in 'biu' or array.dtype.name == 'float64':
+        return array.tolist()
+    if array.dtype.kind == 'f':
+        return list(array)
+    return values.astype(object).to_numpy().tolist()
+
+
+def _equal_runs(keys):
+    """Yields (start, stop) of the runs of equal consecutive keys."""
+    start = 0
+    for index in range(1, len(keys) + 1):
+        if index == len(keys) or keys[index] != keys[start]:
+            yield start, index
+            start = index
+
+
+def _summary_mean(values):
+    """Mean of the values ('' if there are none)."""
+    if not values:
+        return ''
+    return sum(values) / float(len(values))
+
+
+def _summary_min(values):
+    """min() of the values ('' if there are none)."""
+    if not values:
+        return ''
+    return min(values)
+
+
+def _summary_max(values):
+    """max() of the values ('' if there are none)."""
+    if not values:
+        return ''
+    return max(values)
+
+
+# Built-in aggregates of add_summary_row(), by name
+_SUMMARY_FUNCTIONS = {
+    'sum': sum,
+    'mean': _summary_mean,
+    'count': len,
+    'min': _summary_min,
+    'max': _summary_max,
+    }
+
+
+def _merge_style(styles, cell_style):
+    """Merge a new cell style dictionary into styles (in place).
+
+    Existing items are superseded by new, except border lists which are
+    merged.
+    """
+    for (new_key, new_value) in cell_style.items():
+        if (new_key in ['thick_border', 'no_border']) and (new_key in styles):
+            # Merge the two border lists
+            old_borders = styles[new_key].replace(' ', '').split(',')
+            new_borders = new_value.replace(' ', '').split(',')
+            styles[new_key] = ",".join(
+                old_borders + list(set(new_borders) - set(old_borders)))
+        else:
+            styles[new_key] = new_value
+
+
+def _select_indices(key, length, name):
+    """Returns the list of indices selected by an index key (see __getitem__).
+    """
+    if isinstance(key, slice):
+        return list(range(*key.indices(length)))
+    if isinstance(key, numbers.Integral):
+        keys = [key]
+    else:
+        keys = list(key)
+        if keys and all(type(item).__name__ in ('bool', 'bool_')
+                        for item in keys):
+            # Boolean mask
+            if len(keys) != length:
+                raise IndexError('Bad %s mask length (%d).  Expected %d.' %
+                                 (name, len(keys), length))
+            return [index for (index, keep) in enumerate(keys) if keep]
+    indices = []
+    for index in keys:
+        index = int(index)
+        if not -length <= index < length:
+            raise IndexError('Bad %s (%d).  Expected %s in range 0 to %d.' %
+                             (name, index, name, length - 1))
+        indices.append(index % length)
+    return indices
+
+
+def _mixed_sort_key(item):
+    """Sort key of values of mixed types (numbers first)."""
+    if isinstance(item, numbers.Number):
+        return (0, item, '')
+    return (1, 0, str(item))
+
+
+def _numeric_columns(rows, columns):
+    """Returns the numeric values (excluding NaN and bool) of columns.
+
+    The columns are extracted from the rows in a single pass (by a C
+    level itemgetter), then filtered.
+    """
+    if not columns:
+        return []
+    if len(columns) == 1:
+        extracted = [[row_data[columns[0]] for row_data in rows]]
+    else:
+        extracted = list(zip(*map(operator.itemgetter(*columns), rows)))
+        if not extracted:
+            extracted = [[] for dummy in columns]
+    return [[item for item in column_values
+             if isinstance(item, numbers.Number)
+             and not isinstance(item, bool) and item == item]
+            for column_values in extracted]
+
+
+def _is_lazy_array(data):
+    """True if data is a structured or memory-mapped numpy array.
+
+    (Checked without importing numpy.)
+    """
+    if str(type(data)) in ("<class 'numpy.memmap'>",
+                           "<class 'numpy.core.memmap.memmap'>",
+                           "<class 'numpy.recarray'>",
+                           "<class 'numpy.rec.recarray'>",
+                           "<class 'numpy.core.records.recarray'>"):
+        return True
+    return _is_numpy_array(data) and data.dtype.names is not None
+
+
 def _convert_to_list(data):
     """Accepts a list or a numpy.ndarray and returns a list."""
 
     # The following check is performed as a string comparison
     # so that ipy_table does not need to require (import) numpy.
-    if str(type(data)) == "<type 'numpy.ndarray'>":
+    if _is_numpy_array(data) or _is_lazy_array(data):
         return data.tolist()
 
     return data
@@ -0,0 +1,117 @@
+"""Progressive display of large tables in IPython / Jupyter.
+
+display_progressive() displays the first rows of a table immediately, then
+renders the remaining rows in a background thread, updating the displayed
+output (through an IPython display handle) as chunks of rows are
+rendered.  The notebook is responsive at once instead of waiting for the
+whole table to be rendered.
+
+Chunk sizes grow geometrically, so the total amount of HTML sent to the
+frontend by the updates is a small multiple of the final table size.
+"""
+
+import threading
+
+
+class ProgressiveDisplay(object):
+    """Progress of a display_progressive() call.
+
+    Attributes:
+        rows_rendered: The number of table rows displayed so far.
+        done: True once the whole table has been displayed.
+    """
+
+    def __init__(self, table, handle, first_chunk, growth):
+        self.table = table
+        self.rows_rendered = 0
+        self.done = False
+        self._handle = handle
+        self._first_chunk = first_chunk
+        self._growth = growth
+        self._chunks = []
+        self._error = None
+        self._thread = None
+
+    def wait(self, timeout=None):
+        """Wait until the whole table has been displayed.
+
+        Re-raises any exception raised while rendering.  Returns done.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+        return self.done
+
+    def _ipython_display_(self):
+        # Displaying the progress object (e.g. as the last expression of a
+        # cell) must not add a second output.
+        pass
+
+    def _render_chunk(self, num_rows):
+        """Render the next num_rows rows and update the displayed table."""
+        table = self.table
+        start = self.rows_rendered
+        stop = min(start + num_rows, table._num_rows)
+        self._chunks.append(table._render_rows_html(start, stop))
+        self.rows_rendered = stop
+        html = table._TABLE_OPEN_HTML + ''.join(self._chunks) + '</table>'
+        if self._handle is None:
+            self._handle = _display_html(html)
+        else:
+            self._handle.update(_html_object(html))
+
+    def _render_remaining(self):
+        """Render the remaining rows, in geometrically growing chunks."""
+        try:
+            chunk_rows = self._first_chunk
+            while self.rows_rendered < self.table._num_rows:
+                chunk_rows = max(1, int(chunk_rows * self._growth))
+                self._render_chunk(chunk_rows)
+            self.done = True
+        except Exception as error:
+            self._error = error
+
+
+def display_progressive(table, first_chunk=100, growth=2.0, background=True,
+                        handle=None):
+    """Display a table progressively (see module documentation).
+
+    Arguments:
+        table: The IpyTable to display.
+        first_chunk: The number of rows displayed immediately.
+        growth: The size of each subsequent chunk relative to the
+            previous one.
+        background: If True (default), render the remaining chunks in a
+            background thread and return immediately.  The table must
+            not be modified until the returned ProgressiveDisplay is done.
+        handle: Optional existing IPython DisplayHandle to update (a new
+            display is created by default).
+
+    Returns a ProgressiveDisplay.
+    """
+    if first_chunk < 1:
+        raise ValueError('first_chunk must be at least 1.')
+    if growth < 1:
+        raise ValueError('growth must be at least 1.')
+    progress = ProgressiveDisplay(table, handle, first_chunk, growth)
+    progress._render_chunk(first_chunk)
+    if background:
+        progress._thread = threading.Thread(target=progress._render_remaining)
+        progress._thread.daemon = True
+        progress._thread.start()
+    else:
+        progress._render_remaining()
+        progress.wait()
+    return progress
+
+
+def _html_object(html):
+    from IPython.display import HTML
+    return HTML(html)
+
+
+def _display_html(html):
+    """Display HTML, returns the display handle."""
+    from IPython.display import display
+    return display(_html_object(html), display_id=True)
@@ -0,0 +1,184 @@
+"""Database query input (see IpyTable.from_query()).
+
+Rows are fetched from a DB-API 2.0 connection (e.g. sqlite3) with
+cursor.fetchmany(), a block of rows at a time.  The column names of the
+query are the header row, NULL values are replaced by the null text, and
+column formatters are picked from the DB-API type codes of the cursor
+description (for drivers which define DB-API type objects), or else from
+the Python types of the first rows (e.g. 'datetime' for date / time
+values).
+
+Queries are either read into a whole table, read lazily (a block of rows
+is fetched as it is accessed, e.g. by IpyTable.page() or a VirtualTable),
+or rendered as a stream (see streaming.py).
+"""
+
+import datetime
+import sys
+
+from .ipy_table import _BlockRows, _ColumnarRows
+from .streaming import TableStream
+
+_DATETIME_TYPES = (datetime.date, datetime.time)
+
+
+def read_query(connection, sql, params, header, null, fetch_rows):
+    """Returns (rows, column formatters) of a query.
+
+    rows is a _ColumnarRows of the whole query result.
+    """
+    cursor = _execute(connection, sql, params)
+    names = _column_names(cursor)
+    columns = [[] for dummy in names]
+    formatters = None
+    while True:
+        block = cursor.fetchmany(fetch_rows)
+        if formatters is None:
+            formatters = _column_formatters(connection, cursor.description,
+                                            block)
+        if not block:
+            break
+        for column, values in enumerate(zip(*block)):
+            columns[column].extend(_replace_nulls(values, null))
+    if not header and not columns[0]:
+        raise ValueError('The query returned no rows.')
+    return (_ColumnarRows(names if header else None, columns), formatters)
+
+
+class _QueryRows(_BlockRows):
+    """Rows of a query, fetched a block of rows at a time when accessed.
+
+    The number of rows is counted, and the first block of rows fetched
+    (to pick the column formatters), when the rows are created.  Blocks
+    are fetched by a query of the rows from the block on (LIMIT /
+    OFFSET); reading the following block continues fetching from the
+    same cursor.  Pickled as a list of rows.
+    """
+
+    def __init__(self, connection, sql, params, header, null, fetch_rows):
+        self.connection = connection
+        self.sql = _strip_sql(sql)
+        self.params = params
+        self.null = null
+        self.BLOCK_ROWS = fetch_rows
+        cursor = _execute(connection,
+                          'SELECT COUNT(*) FROM (%s) AS ipy_query' %
+                          self.sql, params)
+        self.num_rows = cursor.fetchone()[0]
+
+        cursor = _execute(connection, self.sql, params)
+        _BlockRows.__init__(self, _column_names(cursor) if header else None)
+        sample = cursor.fetchmany(fetch_rows)
+        self.formatters = _column_formatters(connection, cursor.description,
+                                             sample)
+        self._block = (0, _convert_rows(sample, null))
+        # (first row of the next block, cursor) of sequential reads
+        self._cursor = (len(sample), cursor)
+
+    def __getstate__(self):
+        state = _BlockRows.__getstate__(self)
+        state['_cursor'] = (None, None)
+        return state
+
+    def __reduce__(self):
+        return (list, ([list(row_data) for row_data in self],))
+
+    def _num_data_rows(self):
+        return self.num_rows
+
+    def _read_block(self, start):
+        next_start, cursor = self._cursor
+        if next_start != start:
+            cursor = _execute(
+                self.connection,
+                'SELECT * FROM (%s) AS ipy_query LIMIT %d OFFSET %d' %
+                (self.sql, max(self.num_rows - start, 0), start),
+                self.params)
+        rows = cursor.fetchmany(self.BLOCK_ROWS)
+        self._cursor = (start + len(rows), cursor)
+        return _convert_rows(rows, self.null)
+
+
+class QueryStream(TableStream):
+    """A query result rendered to HTML a block of rows at a time.
+
+    Returned by IpyTable.from_query(..., stream=True) (see TableStream).
+    The query is executed by each iter_html() / write_html().
+    """
+
+    def __init__(self, connection, sql, params=(), header=True, null=''):
+        TableStream.__init__(self)
+        self._source = (connection, sql, params, header, null)
+
+    def _iter_block_rows(self, chunk_rows):
+        connection, sql, params, header, null = self._source
+        cursor = _execute(connection, sql, params)
+        block = cursor.fetchmany(chunk_rows)
+        self._default_formatters = _column_formatters(
+            connection, cursor.description, block)
+        header_row = _column_names(cursor) if header else None
+        while block or header_row is not None:
+            rows = _convert_rows(block, null)
+            if header_row is not None:
+                rows.insert(0, header_row)
+                header_row = None
+            yield rows
+            block = cursor.fetchmany(chunk_rows)
+
+
+def _execute(connection, sql, params):
+    """Returns a cursor of the executed query."""
+    cursor = connection.cursor()
+    cursor.execute(sql, params)
+    return cursor
+
+
+def _strip_sql(sql):
+    """Returns a query without trailing whitespace and semicolons."""
+    return sql.strip().rstrip(';').rstrip()
+
+
+def _column_names(cursor):
+    if cursor.description is None:
+        raise ValueError('The SQL statement is not a query (it returns no '
+                         'rows).')
+    return [entry[0] for entry in cursor.description]
+
+
+def _convert_rows(rows, null):
+    """Returns fetched rows as lists, with NULL values replaced by null."""
+    columns = [_replace_nulls(values, null) for values in zip(*rows)]
+    return [list(row_data) for row_data in zip(*columns)]
+
+
+def _replace_nulls(values, null):
+    """Returns a sequence of values with None replaced by null."""
+    if None in values:
+        return [null if value is None else value for value in values]
+    return values
+
+
+def _column_formatters(connection, description, sample):
+    """Returns {column: formatter name} of the columns of a query.
+
+    Formatters are picked by the DB-API type codes of the cursor
+    description, if the driver module (found by the connection type)
+    defines a DATETIME type object.  Otherwise columns whose sampled
+    values (other than NULL) are all dates / times get the 'datetime'
+    formatter.
+    """
+    module = sys.modules.get(type(connection).__module__.split('.')[0])
+    datetime_type = getattr(module, 'DATETIME', None)
+    formatters = {}
+    for column, entry in enumerate(description or ()):
+        type_code = entry[1]
+        if datetime_type is not None and type_code is not None:
+            if type_code == datetime_type:
+                formatters[column] = 'datetime'
+            continue
+        values = [row_data[column] for row_data in sample
+                  if row_data[column] is not None]
+        if values and all(isinstance(value, _DATETIME_TYPES)
+                          for value in values):
+            formatters[column] = 'datetime'
+    return formatters
@@ -0,0 +1,195 @@
+"""Bounded ring buffer table for live log / metrics displays.
+
+A RingTable keeps only the most recent rows (up to a fixed capacity),
+below an optional fixed header row.  Pushing a row costs O(columns): the
+oldest row (its data, styles and rendered HTML) is released when the
+table is full, and the HTML of every row is cached, so re-displaying the
+table only renders rows which are new or have been restyled.
+
+Themes are applied by the absolute position of a row in the stream
+(rather than by its current position in the table), so the alternating
+row colors do not flicker as rows scroll.
+
+Example:
+    table = RingTable(100, header=['time', 'event'])
+    table.apply_theme('basic')
+    ...
+    table.push_row([timestamp, message])
+"""
+
+from collections import deque
+
+from .ipy_table import IpyTable, Style, _THICK_TOP_STYLE
+
+
+class RingTable(IpyTable):
+    """Table holding the most recent capacity rows (plus optional header).
+
+    Arguments:
+        capacity: The maximum number of (non-header) rows.
+        header: Optional header row, always displayed as row 0.
+        num_columns: The number of columns (required if header is None).
+    """
+
+    def __init__(self, capacity, header=None, num_columns=None):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1.')
+        if header is None:
+            if not num_columns:
+                raise ValueError('Either header or num_columns is required.')
+            IpyTable.__init__(self, [[''] * num_columns])
+            fixed_rows = 0
+        else:
+            IpyTable.__init__(self, [list(header)])
+            fixed_rows = 1
+        self.capacity = capacity
+        self.array = _RingRows(self.array[:fixed_rows], capacity)
+        self._cell_styles = _RingRows(self._cell_styles[:fixed_rows], capacity)
+        self._row_html = _RingRows([None] * fixed_rows, capacity)
+        self._num_rows = fixed_rows
+
+        # Number of rows evicted so far (i.e. the stream position of the
+        # oldest row in the ring)
+        self._evicted_rows = 0
+
+    def __getstate__(self):
+        return self._get_transient_free_state()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def push_row(self, row_data, style=None):
+        """Append a row, evicting the oldest row if the table is full.
+
+        See append_rows() for a description of style.
+        """
+        self.append_rows([row_data], style)
+
+    def append_rows(self, rows, style=None):
+        """Append rows, evicting the oldest rows if the table is full.
+
+        The new rows get the default cell style, plus the row styling of
+        the most recently applied theme (if any), plus the (optional)
+        style, a Style or dictionary of style arguments.
+        """
+        if style and not isinstance(style, Style):
+            style = Style(**style)
+        for row_data in rows:
+            row_data = list(row_data)
+            if len(row_data) != self._num_columns:
+                raise ValueError(
+                    'Appended rows must have %d columns.' % self._num_columns)
+            self._touch()
+            self._rows_revision += 1
+            if len(self.array.ring) == self.capacity:
+                self._evicted_rows += 1
+                fixed_rows = len(self.array.fixed)
+                self._splice_row_digests(fixed_rows, fixed_rows + 1, 0)
+            else:
+                self._num_rows += 1
+            self.array.append(row_data)
+            self._cell_styles.append(
+                [{'float_format': '%0.4f'}
+                 for dummy in range(self._num_columns)])
+            self._row_html.append(None)
+            row = self._num_rows - 1
+            self._splice_row_digests(row, row, 1)
+
+            # Propagate thick bottom borders of the previous row
+            if row > 0:
+                for column in range(self._num_columns):
+                    previous_style = self._cell_styles[row - 1][column]
+                    if ('thick_border' in previous_style
+                            and 'bottom' in self._split_by_comma(
+                                previous_style['thick_border'])):
+                        self._merge_cell_style(row, column, _THICK_TOP_STYLE)
+
+            if self._theme is not None:
+                self._apply_theme_to_rows(self._theme, range(row, row + 1))
+            if style:
+                self.set_row_style(row, style)
+
+    def delete_rows(self, start, stop=None):
+        """Not supported (rows are only removed by eviction)."""
+        raise TypeError('RingTable rows can not be deleted.')
+
+    def add_summary_row(self, funcs, label=None, label_column=0,
+                        header_rows=1, style=None):
+        """Not supported (the ring holds only the most recent rows)."""
+        raise TypeError('RingTable does not support summary rows.')
+
+    def set_value(self, row, column, value):
+        """Set the data value of a single cell (styles are unchanged)."""
+        IpyTable.set_value(self, row, column, value)
+        self._row_html[row] = None
+
+    def set_column_formatter(self, column, fn_or_spec):
+        """Set the formatter which converts a column's values to text."""
+        IpyTable.set_column_formatter(self, column, fn_or_spec)
+        for row in range(self._num_rows):
+            self._row_html[row] = None
+
+    #---------------------------------
+    # Internal methods
+    #---------------------------------
+
+    def _make_rows_mutable(self):
+        # Rows are always stored as lists
+        pass
+
+    def _theme_row_index(self, row):
+        fixed_rows = len(self.array.fixed)
+        if row < fixed_rows:
+            return row
+        return row + self._evicted_rows
+
+    def _merge_cell_style(self, row, column, cell_style):
+        IpyTable._merge_cell_style(self, row, column, cell_style)
+        self._row_html[row] = None
+
+    def _apply_cell_style(self, row, column, cell_style):
+        if 'row_span' in cell_style:
+            raise ValueError('row_span is not supported by RingTable.')
+        IpyTable._apply_cell_style(self, row, column, cell_style)
+
+    def _render_row_html(self, row):
+        html = self._row_html[row]
+        if html is None:
+            html = IpyTable._render_row_html(self, row)
+            self._row_html[row] = html
+        return html
+
+
+class _RingRows(object):
+    """Sequence of fixed (header) rows followed by a bounded ring of rows."""
+
+    def __init__(self, fixed, capacity):
+        self.fixed = list(fixed)
+        self.ring = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.fixed) + len(self.ring)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < len(self.fixed):
+            return self.fixed[index]
+        return self.ring[index - len(self.fixed)]
+
+    def __setitem__(self, index, value):
+        if index < len(self.fixed):
+            self.fixed[index] = value
+        else:
+            self.ring[index - len(self.fixed)] = value
+
+    def __iter__(self):
+        for row in self.fixed:
+            yield row
+        for row in self.ring:
+            yield row
+
+    def append(self, row):
+        self.ring.append(row)
@@ -0,0 +1,126 @@
+"""Tables rendered to HTML a block of rows at a time.
+
+A TableStream renders rows read from a source (a CSV file, a database
+query...) without ever holding the whole table: a theme, column styles
+and column formatters are recorded, and applied to every block of rows as
+it is rendered.  The HTML is identical to that of the whole table styled
+the same way.
+"""
+
+from six import string_types
+
+from .ipy_table import IpyTable
+
+
+class TableStream(object):
+    """Base class of streamed tables (see the module documentation).
+
+    Subclasses implement _iter_block_rows().
+    """
+
+    def __init__(self):
+        self._theme = None
+        # Recorded set_column_style() and set_column_formatter() calls
+        self._column_styles = []
+        self._column_formatters = {}
+        # Formatters picked by the source (column => fn_or_spec), which
+        # set_column_formatter() supersedes
+        self._default_formatters = {}
+
+    def apply_theme(self, theme_name):
+        """Apply a formatting theme to the rendered table."""
+        self._theme = theme_name
+
+    def set_column_style(self, column, style=None, **style_args):
+        """Apply style(s) to a table column (see IpyTable)."""
+        self._column_styles.append((column, style, style_args))
+
+    def set_column_formatter(self, column, fn_or_spec):
+        """Set the formatter of a column (see IpyTable)."""
+        self._column_formatters[column] = fn_or_spec
+
+    def iter_html(self, chunk_rows=1000):
+        """Generate the table HTML, chunk_rows rows at a time.
+
+        Yields the opening <table> tag, the HTML of each block of rows
+        and the closing </table> tag.
+        """
+        blocks = self._iter_block_rows(chunk_rows)
+        yield IpyTable._TABLE_OPEN_HTML
+
+        # Each block is rendered as part of a table which also holds the
+        # last row of the previous block and the first row of the next,
+        # so borders are propagated across the blocks.
+        previous_row = None
+        row_offset = 0
+        block_rows = next(blocks, None)
+        if block_rows is not None:
+            # Columns given by label are looked up in the first row
+            first_rows = IpyTable([block_rows[0]])
+            column_styles = [
+                (first_rows._column_index(column), style, style_args)
+                for column, style, style_args in self._column_styles]
+            column_formatters = [
+                (first_rows._column_index(column), fn_or_spec)
+                for column, fn_or_spec in
+                (list(self._default_formatters.items()) +
+                 list(self._column_formatters.items()))]
+        while block_rows is not None:
+            next_block_rows = next(blocks, None)
+            rows = list(block_rows)
+            first = 0
+            if previous_row is not None:
+                rows.insert(0, previous_row)
+                first = 1
+            if next_block_rows is not None:
+                rows.append(next_block_rows[0])
+            chunk = self._make_chunk(rows, row_offset - first,
+                                     column_styles, column_formatters)
+            yield chunk._render_rows_html(first, first + len(block_rows))
+            previous_row = block_rows[-1]
+            row_offset += len(block_rows)
+            block_rows = next_block_rows
+        if row_offset == 0:
+            raise ValueError('The table has no rows.')
+        yield '</table>'
+
+    def write_html(self, file, chunk_rows=1000):
+        """Write the table HTML to a file (a path or a file object)."""
+        if isinstance(file, string_types):
+            with open(file, 'w') as html_file:
+                self.write_html(html_file, chunk_rows)
+            return
+        for chunk in self.iter_html(chunk_rows):
+            file.write(chunk)
+
+    def _iter_block_rows(self, chunk_rows):
+        """Generates lists of about chunk_rows rows (lists) of the table.
+
+        The first row of the first block is the first table row (the
+        header row, if any).  Blocks are not empty.  _default_formatters
+        may be set until the first block is generated.
+        """
+        raise NotImplementedError
+
+    def _make_chunk(self, rows, row_offset, column_styles,
+                    column_formatters):
+        """Returns a styled table of rows (table row row_offset first)."""
+        chunk = _StreamChunk(rows, row_offset)
+        if self._theme is not None:
+            chunk.apply_theme(self._theme)
+        for column, style, style_args in column_styles:
+            chunk.set_column_style(column, style, **style_args)
+        for column, fn_or_spec in column_formatters:
+            chunk.set_column_formatter(column, fn_or_spec)
+        return chunk
+
+
+class _StreamChunk(IpyTable):
+    """Rows of a TableStream, styled as rows row_offset... of the table."""
+
+    def __init__(self, rows, row_offset):
+        self._row_offset = row_offset
+        IpyTable.__init__(self, rows)
+
+    def _theme_row_index(self, row):
+        return row + self._row_offset
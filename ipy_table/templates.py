@@ -0,0 +1,159 @@
+"""Style templates: the styling of a table, reusable for new data.
+
+A TableTemplate captures the cell styles, spans, theme and column
+formatters of a table (IpyTable.to_template()).  IpyTable.from_template()
+creates a table of the same shape from a template and new data, without
+re-running any styling.  Tables created from a template share the
+template's style dictionaries until a row is restyled (its styles are
+then copied for that table), and render their cells with the template's
+pre-rendered cell tags.
+
+Example:
+    table = IpyTable(first_data)
+    table.apply_theme('basic')
+    table.set_column_style(2, align='right')
+    template = table.to_template()
+
+    for data in more_data:
+        display(IpyTable.from_template(template, data))
+"""
+
+from array import array
+
+from .ipy_table import (_ArrayRows, _LazyStyleRows, _is_lazy_array,
+                        _key_is_valid, _style_key)
+
+
+class TableTemplate(object):
+    """The styling of a table (see the module documentation).
+
+    Templates are immutable.  Cell styles are stored once per distinct
+    style, and row styles once per distinct row of styles (a themed table
+    has only a few), along with the HTML tags each cell style renders to.
+    """
+
+    def __init__(self, table):
+        if table._summary_rows:
+            raise ValueError('Tables with summary rows can not be used as '
+                             'templates.')
+        self._num_rows = table._num_rows
+        self._num_columns = table._num_columns
+        self._theme = table._theme
+        self._row_spans = dict(table._row_spans)
+        self._column_formatters = dict(table._column_formatters)
+        self._column_memoization = dict(table._column_memoization)
+
+        cell_styles = table._cell_styles
+        unique_styles = []
+        style_ids = {}
+        # Distinct rows of style ids => index into _row_styles
+        row_ids = {}
+        # Per distinct row: style dictionaries and (opening, closing) tags
+        self._row_styles = []
+        self._row_tags = []
+        # Per row: index into _row_styles
+        self._row_index = array('I')
+        for row in range(self._num_rows):
+            if isinstance(cell_styles, _LazyStyleRows):
+                row_styles = cell_styles.peek(row)
+            else:
+                row_styles = cell_styles[row]
+            ids = []
+            for cell_style in row_styles:
+                key = _style_key(cell_style)
+                style_id = style_ids.get(key)
+                if style_id is None:
+                    style_id = len(unique_styles)
+                    unique_styles.append(
+                        (dict(cell_style), _cell_tags(table, cell_style)))
+                    if key is not None:
+                        style_ids[key] = style_id
+                ids.append(style_id)
+            ids = tuple(ids)
+            if ids not in row_ids:
+                row_ids[ids] = len(self._row_styles)
+                self._row_styles.append(
+                    [unique_styles[style_id][0] for style_id in ids])
+                self._row_tags.append(
+                    [unique_styles[style_id][1] for style_id in ids])
+            self._row_index.append(row_ids[ids])
+
+    @property
+    def shape(self):
+        """(number of rows, number of columns) of the template's tables."""
+        return (self._num_rows, self._num_columns)
+
+    def _make_table(self, cls, data):
+        """Returns a table of class cls with the template's styling."""
+        if _is_lazy_array(data):
+            data = _ArrayRows(data)
+        if len(data) != self._num_rows:
+            raise ValueError('Data has %d rows, the template has %d.' %
+                             (len(data), self._num_rows))
+        rows = [data[0]] if isinstance(data, _ArrayRows) else data
+        for row_data in rows:
+            if len(row_data) != self._num_columns:
+                raise ValueError('Data rows must have %d columns (the '
+                                 'template columns).' % self._num_columns)
+
+        table = cls([[''] * self._num_columns])
+        table.array = data
+        table._num_rows = self._num_rows
+        table._cell_styles = _TemplateStyleRows(self)
+        table._theme = self._theme
+        table._row_spans = dict(self._row_spans)
+        table._column_formatters = dict(self._column_formatters)
+        table._column_memoization = dict(self._column_memoization)
+        return table
+
+
+class _TemplateStyleRows(_LazyStyleRows):
+    """Cell style rows of a table created from a TableTemplate.
+
+    Rows never accessed read the template's (shared) style dictionaries
+    and pre-rendered tags; accessing a row copies its styles.
+    """
+
+    def __init__(self, template):
+        _LazyStyleRows.__init__(self, template._num_rows,
+                                template._num_columns)
+        self.template = template
+
+    def peek(self, row):
+        row_styles = self.rows.get(row)
+        if row_styles is None:
+            template = self.template
+            row_styles = template._row_styles[template._row_index[row]]
+        return row_styles
+
+    def peek_tags(self, row):
+        if row in self.rows:
+            return None
+        template = self.template
+        return template._row_tags[template._row_index[row]]
+
+    def styled_rows(self):
+        return None
+
+    def _new_row(self, row):
+        template = self.template
+        return [dict(cell_style) for cell_style in
+                template._row_styles[template._row_index[row]]]
+
+
+def _cell_tags(table, cell_style):
+    """Returns the (opening, closing) HTML around the text of a cell.
+
+    Returns None for suppressed cells (see IpyTable._render_cells_html()).
+    """
+    if _key_is_valid(cell_style, 'suppress'):
+        return None
+    opening = '<td' + table._get_style_html(cell_style) + '>'
+    closing = '</td>'
+    if _key_is_valid(cell_style, 'italic'):
+        opening += '<i>'
+        closing = '</i>' + closing
+    if _key_is_valid(cell_style, 'bold'):
+        opening += '<b>'
+        closing = '</b>' + closing
+    return (opening, closing)
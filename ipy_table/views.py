@@ -0,0 +1,533 @@
+"""Views of the rows and columns of IpyTables, and table stacking.
+
+Views are returned by IpyTable.sort_by(), IpyTable.filter() and by
+indexing (table[rows, columns], with indices, slices, index sequences or
+boolean masks).  A TableView holds only lists of the parent table rows
+(and columns) it shows: the data and cell styles are read from the
+parent table's storage, so creating a view does not copy data or style
+dictionaries, and styles follow their rows.  Rendering a view costs the
+same as rendering a table of the same size.
+
+Changes to the parent's values and styles show through its views.  The
+first change made through a view (styling, set_value(), ...) gives the
+view a private copy of its rows (copy-on-write), so the parent is never
+modified through a view.  Adding rows to or deleting rows from the
+parent (or pushing rows into a RingTable) moves the rows a view refers
+to, so the view can then no longer be used: reading its rows raises
+ValueError.  (A view which has already been modified holds its own
+copy of its rows.)
+
+Spans crossing the edges of a view (or split by a sort) are clipped to
+the view: each run of adjacent view cells covered by the same span is
+rendered as a span of its own, showing the spanning cell's value.
+Cells at the edges of a view keep their borders, so a view renders as a
+crop of its parent.
+
+vstack() and hstack() combine tables into a view of all their rows
+(referencing the rows of the combined tables, without copying cells).
+"""
+
+import bisect
+
+from .ipy_table import IpyTable, _LazyStyleRows, _merge_style
+
+# Style of the cells covered by a clipped span (never modified: views
+# copy their styles before they are modified)
+_SUPPRESSED = {'suppress': True}
+
+# Style keys of spans (set by the clipping of each view)
+_SPAN_KEYS = ('row_span', 'column_span', 'suppress')
+
+
+class TableView(IpyTable):
+    """View of rows of a parent table (see module documentation).
+
+    Arguments:
+        parent: The parent IpyTable.
+        rows: The parent row of every view row.
+        columns: The parent column of every view column (None for all
+            columns).
+    """
+
+    def __init__(self, parent, rows, columns=None):
+        # Tables whose rows are shown, with their _rows_revision
+        sources = [(parent, parent._rows_revision)]
+        parent_view = None
+        if isinstance(parent, TableView) and parent._parent is not None:
+            # View of a view: index the underlying table directly
+            parent._check_sources()
+            sources = parent._sources
+            parent_view = parent
+            view_rows = list(rows)
+            view_columns = (list(range(parent._num_columns))
+                            if columns is None else list(columns))
+            rows = [parent._rows[row] for row in view_rows]
+            if columns is None:
+                columns = parent._columns
+            elif parent._columns is not None:
+                columns = [parent._columns[column] for column in columns]
+            parent = parent._parent
+        if columns is not None:
+            columns = list(columns)
+            num_columns = len(columns)
+        else:
+            num_columns = parent._num_columns
+        IpyTable.__init__(self, [[''] * num_columns])
+        self._parent = parent
+        self._sources = sources
+        self._rows = list(rows)
+        self._columns = columns
+        self.array = _ViewRows(self)
+        self._cell_styles = _ViewStyles(self)
+        self._num_rows = len(self._rows)
+        self._theme = parent._theme
+        for view_column, column in enumerate(self._parent_columns()):
+            if column in parent._column_formatters:
+                self._column_formatters[view_column] = \
+                    parent._column_formatters[column]
+            if column in parent._column_memoization:
+                self._column_memoization[view_column] = \
+                    parent._column_memoization[column]
+
+        # Clipped spans: view (row, column) => value / style
+        self._value_overrides = {}
+        self._style_overrides = {}
+        if (self._columns is None
+                and self._rows == list(range(parent._num_rows))):
+            # The whole table: no spans are cut
+            self._row_spans = dict(parent._row_spans)
+        else:
+            self._clip_spans()
+        if parent_view is not None:
+            self._carry_overrides(parent_view, view_rows, view_columns)
+
+    def _get_revision(self):
+        if self._parent is None:
+            return self._own_revision
+        return ((self._own_revision, self._parent._revision)
+                + tuple(table._revision for table, dummy in self._sources))
+
+    def _set_revision(self, revision):
+        self._own_revision = revision
+
+    # Changes of the parent table change the view
+    _revision = property(_get_revision, _set_revision)
+
+    def __getstate__(self):
+        state = IpyTable.__getstate__(self)
+        state['_parent'] = None
+        state['_sources'] = []
+        state['_rows'] = []
+        state['_value_overrides'] = {}
+        state['_style_overrides'] = {}
+        return state
+
+    #---------------------------------
+    # Internal methods
+    #---------------------------------
+
+    def _touch(self):
+        if self._parent is not None:
+            self._copy_rows()
+        IpyTable._touch(self)
+
+    def _copy_rows(self):
+        """Copy-on-write: copy the view rows (data and styles)."""
+        self.array = [list(row_data) for row_data in self.array]
+        self._cell_styles = [[dict(cell_style) for cell_style in row_styles]
+                             for row_styles in self._cell_styles]
+        self._parent = None
+        self._sources = []
+        self._row_digests = None
+        self._value_overrides = {}
+        self._style_overrides = {}
+
+    def _fingerprint(self):
+        if self._parent is not None:
+            # The parent may have changed since the fingerprint was taken
+            self._fingerprint_memo = None
+            self._row_digests = None
+        return IpyTable._fingerprint(self)
+
+    def _refresh_summary_rows(self):
+        if self._parent is not None:
+            # (The sources of stacked tables are the stacked tables)
+            for table, dummy in self._sources:
+                table._refresh_summary_rows()
+        IpyTable._refresh_summary_rows(self)
+
+    def _check_sources(self):
+        """Raise ValueError if rows of the viewed tables have moved."""
+        for table, rows_revision in self._sources:
+            if table._rows_revision != rows_revision:
+                raise ValueError(
+                    'Rows have been added to or deleted from the table '
+                    'since the view was created.')
+
+    def _parent_columns(self):
+        """Returns the parent column of every view column."""
+        if self._columns is None:
+            return list(range(self._num_columns))
+        return self._columns
+
+    def _clip_spans(self):
+        """Compute the styles and values of the spans clipped by the view.
+
+        Cells covered by each parent span are grouped by the span's anchor
+        cell; every block of adjacent view rows and columns of a group is
+        rendered as one span.
+        """
+        parent = self._parent
+        parent_styles = parent._cell_styles
+        columns = self._parent_columns()
+
+        # Parent cells covered by row spans => anchor row
+        row_span_anchors = {}
+        for (anchor_row, column), row_span in parent._row_spans.items():
+            for row in range(anchor_row + 1, anchor_row + row_span):
+                row_span_anchors[(row, column)] = anchor_row
+
+        # Parent rows which can hold spans
+        if isinstance(parent_styles, _LazyStyleRows):
+            candidate_rows = parent_styles.styled_rows()
+        else:
+            candidate_rows = None
+
+        # Span anchor => {view row: [view columns]}
+        groups = {}
+        for view_row, row in enumerate(self._rows):
+            if candidate_rows is not None and row not in candidate_rows:
+                continue
+            row_styles = parent_styles[row]
+            for view_column, column in enumerate(columns):
+                cell_style = row_styles[column]
+                if 'suppress' in cell_style:
+                    anchor = self._find_anchor(row, column, row_span_anchors)
+                elif (cell_style.get('row_span', 1) > 1
+                      or cell_style.get('column_span', 1) > 1):
+                    anchor = (row, column)
+                else:
+                    continue
+                if anchor is not None:
+                    groups.setdefault(anchor, {}).setdefault(
+                        view_row, []).append(view_column)
+
+        for anchor, cells in groups.items():
+            anchor_style = parent_styles[anchor[0]][anchor[1]]
+            for row_run in _runs(sorted(cells)):
+                view_columns = sorted(set(
+                    view_column for view_row in row_run
+                    for view_column in cells[view_row]))
+                for column_run in _runs(view_columns):
+                    self._clip_span(anchor, anchor_style, row_run,
+                                    column_run)
+
+    def _propagate_seam_borders(self, seam, axis):
+        """Propagate borders across the seam of stacked tables.
+
+        seam is the first row (axis 0) or column (axis 1) of a stacked
+        table.  Applies the same propagation as set_cell_style() does
+        between adjacent cells (thick bottom / right borders, clear top /
+        left borders), through style overrides.
+        """
+        if axis == 0:
+            pairs = [((seam - 1, column), (seam, column))
+                     for column in range(self._num_columns)]
+            forward, backward = ('bottom', 'top'), ('top', 'bottom')
+        else:
+            pairs = [((row, seam - 1), (row, seam))
+                     for row in range(self._num_rows)]
+            forward, backward = ('right', 'left'), ('left', 'right')
+        for before, after in pairs:
+            before_style = self._cell_styles[before[0]][before[1]]
+            after_style = self._cell_styles[after[0]][after[1]]
+            if forward[0] in self._split_by_comma(
+                    before_style.get('thick_border', '')):
+                self._override_style(after, thick_border=forward[1])
+            if backward[0] in self._split_by_comma(
+                    after_style.get('no_border', '')):
+                self._override_style(before, no_border=backward[1])
+
+    def _carry_overrides(self, parent_view, rows, columns):
+        """Carry the overrides of a parent view into a view of it.
+
+        rows and columns are the parent view row and column of every view
+        row and column.  Overridden styles (e.g. borders propagated across
+        the seams of stacked tables) keep the spans clipped by this view.
+        """
+        style_overrides = parent_view._style_overrides
+        value_overrides = parent_view._value_overrides
+        for view_row, row in enumerate(rows):
+            row_styles = style_overrides.get(row, {})
+            row_values = value_overrides.get(row, {})
+            if not (row_styles or row_values):
+                continue
+            for view_column, column in enumerate(columns):
+                if (column in row_values and view_column not in
+                        self._value_overrides.get(view_row, {})):
+                    self._value_overrides.setdefault(
+                        view_row, {})[view_column] = row_values[column]
+                if column not in row_styles:
+                    continue
+                cell_style = dict(
+                    (key, value) for key, value in row_styles[column].items()
+                    if key not in _SPAN_KEYS)
+                if not cell_style:
+                    continue
+                current_style = self._cell_styles[view_row][view_column]
+                for key in _SPAN_KEYS:
+                    if key in current_style:
+                        cell_style[key] = current_style[key]
+                self._style_overrides.setdefault(
+                    view_row, {})[view_column] = cell_style
+
+    def _override_style(self, cell, **style_args):
+        """Merge style arguments into the (overridden) style of a cell."""
+        row, column = cell
+        cell_style = dict(self._cell_styles[row][column])
+        _merge_style(cell_style, self._build_style_dict(**style_args))
+        self._style_overrides.setdefault(row, {})[column] = cell_style
+
+    def _find_anchor(self, row, column, row_span_anchors):
+        """Returns the anchor (row, column) of the span covering a cell."""
+        if (row, column) in row_span_anchors:
+            return (row_span_anchors[(row, column)], column)
+        row_styles = self._parent._cell_styles[row]
+        for anchor_column in range(column - 1, -1, -1):
+            cell_style = row_styles[anchor_column]
+            if anchor_column + cell_style.get('column_span', 1) > column:
+                return (row, anchor_column)
+            if 'suppress' not in cell_style:
+                break
+        return None
+
+    def _clip_span(self, anchor, anchor_style, row_run, column_run):
+        """Render a block of view cells covered by a span as one span."""
+        top, left = row_run[0], column_run[0]
+        columns = self._parent_columns()
+        row_span = len(row_run)
+        column_span = len(column_run)
+        if row_span > 1:
+            self._row_spans[(top, left)] = row_span
+        if ((self._rows[top], columns[left]) == anchor
+                and row_span == anchor_style.get('row_span', 1)
+                and column_span == anchor_style.get('column_span', 1)):
+            # The whole span is in the view
+            return
+
+        cell_style = dict(anchor_style)
+        cell_style.pop('suppress', None)
+        cell_style.pop('row_span', None)
+        cell_style.pop('column_span', None)
+        if row_span > 1:
+            cell_style['row_span'] = row_span
+        if column_span > 1:
+            cell_style['column_span'] = column_span
+        self._style_overrides.setdefault(top, {})[left] = cell_style
+        self._value_overrides.setdefault(top, {})[left] = \
+            self._parent.array[anchor[0]][anchor[1]]
+        for view_row in row_run:
+            for view_column in column_run:
+                if (view_row, view_column) != (top, left):
+                    self._style_overrides.setdefault(
+                        view_row, {})[view_column] = _SUPPRESSED
+
+
+class _ViewRows(object):
+    """Data rows of a TableView, read from the parent table."""
+
+    def __init__(self, view):
+        self.view = view
+
+    def __reduce__(self):
+        # Pickled (and fingerprinted) as a plain list of rows
+        return (list, ([list(row_data) for row_data in self],))
+
+    def __len__(self):
+        return len(self.view._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        view = self.view
+        view._check_sources()
+        row_data = view._parent.array[view._rows[index]]
+        if view._columns is not None:
+            row_data = [row_data[column] for column in view._columns]
+        overrides = view._value_overrides.get(index)
+        if overrides:
+            row_data = list(row_data)
+            for column, value in overrides.items():
+                row_data[column] = value
+        return row_data
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+class _ViewStyles(_ViewRows):
+    """Cell style rows of a TableView, read from the parent table."""
+
+    def __reduce__(self):
+        return (list, ([list(row_styles) for row_styles in self],))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        view = self.view
+        view._check_sources()
+        parent_styles = view._parent._cell_styles
+        row = view._rows[index]
+        if isinstance(parent_styles, _LazyStyleRows):
+            row_styles = parent_styles.peek(row)
+        else:
+            row_styles = parent_styles[row]
+        if view._columns is not None:
+            row_styles = [row_styles[column] for column in view._columns]
+        overrides = view._style_overrides.get(index)
+        if overrides:
+            row_styles = list(row_styles)
+            for column, cell_style in overrides.items():
+                row_styles[column] = cell_style
+        return row_styles
+
+
+def vstack(tables):
+    """Returns a view of tables stacked vertically (rows of each in turn).
+
+    The tables must have the same number of columns.  Borders are
+    propagated across the seams as if the rows were in one table (a thick
+    bottom border of a table's last row is also applied to the top of the
+    next table's first row, etc.).  Column formatters are kept (tables
+    setting different formatters for the same column raise ValueError).
+    The view shares the data and styles of the tables (see module
+    documentation).
+    """
+    return concat(tables, axis=0)
+
+
+def hstack(tables):
+    """Returns a view of tables side by side (columns of each in turn).
+
+    The tables must have the same number of rows.  See vstack().
+    """
+    return concat(tables, axis=1)
+
+
+def concat(tables, axis=0):
+    """Returns a view of tables stacked along an axis (0: vstack, 1: hstack).
+    """
+    tables = list(tables)
+    if not tables:
+        raise ValueError('No tables to stack.')
+    if axis not in (0, 1):
+        raise ValueError('Bad axis (%r).  Expected 0 or 1.' % (axis,))
+    if axis == 0:
+        num_columns = tables[0]._num_columns
+        if any(table._num_columns != num_columns for table in tables):
+            raise ValueError('Stacked tables must have the same number of '
+                             'columns.')
+        offsets = _offsets([table._num_rows for table in tables])
+        combined = IpyTable([[''] * num_columns])
+        combined._num_rows = offsets[-1]
+    else:
+        num_rows = tables[0]._num_rows
+        if any(table._num_rows != num_rows for table in tables):
+            raise ValueError('Stacked tables must have the same number of '
+                             'rows.')
+        offsets = _offsets([table._num_columns for table in tables])
+        combined = IpyTable([[''] * offsets[-1]])
+        combined._num_rows = num_rows
+    for table in tables:
+        table._refresh_summary_rows()
+    combined.array = _ConcatRows([table.array for table in tables],
+                                 offsets, axis)
+    combined._cell_styles = _ConcatRows(
+        [table._cell_styles for table in tables], offsets, axis)
+
+    for table, offset in zip(tables, offsets):
+        row_offset, column_offset = (offset, 0) if axis == 0 else (0, offset)
+        for (row, column), row_span in table._row_spans.items():
+            combined._row_spans[(row + row_offset,
+                                 column + column_offset)] = row_span
+        for column, fn_or_spec in table._column_formatters.items():
+            column += column_offset
+            if combined._column_formatters.get(
+                    column, fn_or_spec) != fn_or_spec:
+                raise ValueError('Stacked tables have different formatters '
+                                 'for column %d.' % column)
+            combined._column_formatters[column] = fn_or_spec
+        for column, memoization in table._column_memoization.items():
+            combined._column_memoization[column + column_offset] = \
+                memoization
+
+    view = TableView(combined, range(combined._num_rows))
+    # The view shows the rows of the stacked tables
+    view._sources = [(table, table._rows_revision) for table in tables]
+    for seam in offsets[1:-1]:
+        view._propagate_seam_borders(seam, axis)
+    return view
+
+
+class _ConcatRows(object):
+    """Rows of tables stacked vertically (axis 0) or horizontally (axis 1).
+
+    Rows of vertically stacked tables are returned as they are stored in
+    their table; rows of horizontally stacked tables are concatenated when
+    they are accessed.
+    """
+
+    def __init__(self, parts, offsets, axis):
+        self.parts = parts
+        self.offsets = offsets
+        self.axis = axis
+
+    def __reduce__(self):
+        return (list, ([list(row) for row in self],))
+
+    def __len__(self):
+        if self.axis == 0:
+            return self.offsets[-1]
+        return len(self.parts[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+        if self.axis == 0:
+            part = bisect.bisect_right(self.offsets, index) - 1
+            return _read_row(self.parts[part], index - self.offsets[part])
+        row = []
+        for part in self.parts:
+            row.extend(_read_row(part, index))
+        return row
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+def _read_row(rows, index):
+    """Returns a row of a table's data or styles, for reading only."""
+    if isinstance(rows, _LazyStyleRows):
+        return rows.peek(index)
+    return rows[index]
+
+
+def _offsets(sizes):
+    """Returns the start of every part, plus the total size."""
+    offsets = [0]
+    for size in sizes:
+        offsets.append(offsets[-1] + size)
+    return offsets
+
+
+def _runs(indices):
+    """Splits sorted indices into runs of consecutive indices."""
+    runs = []
+    for index in indices:
+        if runs and runs[-1][-1] + 1 == index:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+    return runs
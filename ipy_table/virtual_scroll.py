@@ -0,0 +1,305 @@
+"""Virtual scrolling display of large tables in a Jupyter notebook.
+
+A VirtualTable displays an IpyTable in a fixed height viewport.  Only the
+first rows are included in the notebook output; as the user scrolls, a
+small JavaScript client requests windows of rows from the kernel over the
+Jupyter comm protocol, and the kernel renders them from the IpyTable
+(caching recently rendered windows).  The saved notebook output therefore
+stays small however large the table is.
+
+The JavaScript client requires the classic Jupyter Notebook (it uses the
+Jupyter.notebook.kernel comm manager).  In other frontends the first
+rows are displayed statically.
+
+The kernel keeps the most recently displayed virtual tables (and so
+their tables), so their outputs can keep requesting windows after the
+cell which displayed them has finished.  close() releases a virtual
+table (its displayed output then stops scrolling).
+
+Example:
+    from ipy_table import IpyTable, VirtualTable
+    table = IpyTable(rows)
+    table.apply_theme('basic')
+    virtual_table = VirtualTable(table, height=400)
+    virtual_table
+    ...
+    virtual_table.close()
+
+Comm protocol (target 'ipy_table.virtual_scroll'):
+    open data:  {'table_id': <id>}
+    request:    {'request_id': <n>, 'start': <row>, 'stop': <row>}
+    response:   {'request_id': <n>, 'start': <row>, 'stop': <row>,
+                 'num_rows': <table rows>, 'html': <window table html>}
+    error:      {'request_id': <n>, 'error': <message>}
+"""
+
+import json
+import uuid
+from collections import OrderedDict
+
+COMM_TARGET = 'ipy_table.virtual_scroll'
+
+# The most recently displayed virtual tables, by table id (the displayed
+# outputs keep requesting windows after the cell which created the
+# VirtualTable has finished)
+_VIRTUAL_TABLES = OrderedDict()
+_MAX_VIRTUAL_TABLES = 64
+
+_COMM_TARGET_REGISTERED = False
+
+
+class VirtualTable(object):
+    """Virtual scrolling display of an IpyTable.
+
+    Arguments:
+        table: The IpyTable to display.
+        window_rows: Rows per requested window (windows are aligned to
+            multiples of window_rows, and two windows are displayed at a
+            time).
+        height: Viewport height in pixels.
+        header_rows: Number of leading table rows (e.g. a column header)
+            repeated at the top of every window.
+        cache_windows: Maximum number of rendered windows cached.
+    """
+
+    def __init__(self, table, window_rows=50, height=400, header_rows=1,
+                 cache_windows=32):
+        if window_rows < 1:
+            raise ValueError('window_rows must be at least 1.')
+        self.table = table
+        self.window_rows = window_rows
+        self.height = height
+        self.header_rows = min(header_rows, table._num_rows)
+        self.cache_windows = cache_windows
+        self.table_id = uuid.uuid4().hex
+        # Comms of the displayed outputs (see attach())
+        self._comms = []
+        self._windows = OrderedDict()
+        self._windows_revision = None
+        self._stats = dict(hits=0, misses=0)
+
+    def _repr_html_(self):
+        """IPython display protocol: HTML representation.
+
+        Contains the first two windows of rows, and the JavaScript client.
+        """
+        self._check_open()
+        _register_comm_target()
+        _VIRTUAL_TABLES[self.table_id] = self
+        while len(_VIRTUAL_TABLES) > _MAX_VIRTUAL_TABLES:
+            _VIRTUAL_TABLES.popitem(last=False)
+        element_id = 'ipy-table-virtual-' + self.table_id
+        start = self.header_rows
+        stop = min(self.table._num_rows, start + 2 * self.window_rows)
+        return _VIEWPORT_HTML % dict(
+            element_id=element_id,
+            height=self.height,
+            table_html=self.render_window(start, stop),
+            script=_CLIENT_JS % dict(
+                element_id=element_id,
+                config=json.dumps(dict(
+                    target=COMM_TARGET,
+                    table_id=self.table_id,
+                    num_rows=self.table._num_rows,
+                    header_rows=self.header_rows,
+                    window_rows=self.window_rows,
+                    shown=start))))
+
+    def render_window(self, start, stop):
+        """Returns the table HTML of rows start to stop (cached)."""
+        self._check_open()
+        if self._windows_revision != self.table._revision:
+            # The table has changed
+            self._windows.clear()
+            self._windows_revision = self.table._revision
+        key = (start, stop)
+        html = self._windows.get(key)
+        if html is not None:
+            # Most recently used (OrderedDict.move_to_end() is not
+            # available on Python 2)
+            self._windows[key] = self._windows.pop(key)
+            self._stats['hits'] += 1
+            return html
+        self._stats['misses'] += 1
+        html = self.table.render_rows(start, stop, self.header_rows)
+        self._windows[key] = html
+        while len(self._windows) > self.cache_windows:
+            self._windows.popitem(last=False)
+        return html
+
+    def handle_request(self, request):
+        """Returns the response to a window request (see module docs)."""
+        if self.table is None:
+            return dict(request_id=request.get('request_id'),
+                        error='The table has been closed.')
+        num_rows = self.table._num_rows
+        try:
+            start = max(self.header_rows, min(int(request['start']), num_rows))
+            stop = max(start, min(int(request['stop']), num_rows))
+        except (KeyError, TypeError, ValueError):
+            return dict(request_id=request.get('request_id'),
+                        error='Bad window request: %r' % (request,))
+        return dict(request_id=request.get('request_id'),
+                    start=start, stop=stop, num_rows=num_rows,
+                    html=self.render_window(start, stop))
+
+    def attach(self, comm):
+        """Serve window requests received on a comm."""
+        def on_msg(msg):
+            comm.send(self.handle_request(msg['content']['data']))
+        comm.on_msg(on_msg)
+        self._comms.append(comm)
+
+    def close(self):
+        """Release the table and its cached windows.
+
+        The virtual table is forgotten by the kernel, and the comms of
+        its displayed outputs are closed.  A closed virtual table can not
+        be displayed again.
+        """
+        if _VIRTUAL_TABLES.get(self.table_id) is self:
+            del _VIRTUAL_TABLES[self.table_id]
+        for comm in self._comms:
+            comm.close()
+        self._comms = []
+        self._windows.clear()
+        self.table = None
+
+    def window_cache_info(self):
+        """Returns a dictionary of window cache statistics."""
+        info = dict(self._stats)
+        info['windows'] = len(self._windows)
+        return info
+
+    def _check_open(self):
+        if self.table is None:
+            raise ValueError('The VirtualTable has been closed.')
+
+
+class LocalFrontend(object):
+    """In-process stand-in for the JavaScript client.
+
+    Opens a (local) comm to a displayed VirtualTable as the
+    JavaScript client does, and requests windows through it.  Intended
+    for testing.
+    """
+
+    def __init__(self, table_id):
+        self.comm = _LocalComm()
+        self._request_id = 0
+        _open_comm(self.comm, dict(content=dict(data=dict(table_id=table_id))))
+
+    def request(self, start, stop):
+        """Request a window of rows, returns the response data."""
+        self._request_id += 1
+        self.comm.deliver(dict(request_id=self._request_id,
+                               start=start, stop=stop))
+        return self.comm.sent[-1]
+
+
+class _LocalComm(object):
+    """Minimal in-process implementation of the kernel side Comm API."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        self._callback = None
+
+    def on_msg(self, callback):
+        self._callback = callback
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def close(self):
+        self.closed = True
+
+    def deliver(self, data):
+        """Deliver a message from the frontend."""
+        self._callback(dict(content=dict(data=data)))
+
+
+def _open_comm(comm, open_msg):
+    """Comm target handler: attach a comm to the requested VirtualTable."""
+    table_id = open_msg['content']['data'].get('table_id')
+    virtual_table = _VIRTUAL_TABLES.get(table_id)
+    if virtual_table is None:
+        comm.send(dict(request_id=None,
+                       error='Unknown table id %r (re-run the cell).' %
+                       (table_id,)))
+        return
+    virtual_table.attach(comm)
+
+
+def _register_comm_target():
+    """Register the comm target with the running kernel (if any)."""
+    global _COMM_TARGET_REGISTERED
+    if _COMM_TARGET_REGISTERED:
+        return
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return
+    shell = get_ipython()
+    kernel = getattr(shell, 'kernel', None)
+    if kernel is None:
+        return
+    kernel.comm_manager.register_target(COMM_TARGET, _open_comm)
+    _COMM_TARGET_REGISTERED = True
+
+
+_VIEWPORT_HTML = (
+    '<div id="%(element_id)s">'
+    '<div class="ipy-table-viewport" '
+    'style="height:%(height)dpx; overflow-y:auto; position:relative;">'
+    '<div class="ipy-table-spacer"></div>'
+    '<div class="ipy-table-content" '
+    'style="position:absolute; top:0; left:0;">%(table_html)s</div>'
+    '</div>'
+    '<script type="text/javascript">%(script)s</script>'
+    '</div>')
+
+_CLIENT_JS = '''
+(function() {
+    var config = %(config)s;
+    var root = document.getElementById('%(element_id)s');
+    var viewport = root.querySelector('.ipy-table-viewport');
+    var spacer = root.querySelector('.ipy-table-spacer');
+    var content = root.querySelector('.ipy-table-content');
+    var rows = content.querySelectorAll('tr');
+    if (rows.length <= config.header_rows || typeof Jupyter === 'undefined'
+            || !Jupyter.notebook || !Jupyter.notebook.kernel) {
+        return;
+    }
+    var rowHeight = rows[rows.length - 1].getBoundingClientRect().height;
+    // Header height plus the (estimated) height of all data rows
+    spacer.style.height = Math.ceil(
+        content.getBoundingClientRect().height
+        + (config.num_rows - rows.length) * rowHeight) + 'px';
+    var comm = Jupyter.notebook.kernel.comm_manager.new_comm(
+        config.target, {table_id: config.table_id});
+    var wanted = config.shown, nextId = 0;
+    comm.on_msg(function(msg) {
+        var data = msg.content.data;
+        // Ignore errors and responses to superseded requests
+        if (data.error || data.request_id !== nextId) {
+            return;
+        }
+        content.innerHTML = data.html;
+        content.style.top =
+            ((data.start - config.header_rows) * rowHeight) + 'px';
+    });
+    viewport.addEventListener('scroll', function() {
+        var first = Math.floor(viewport.scrollTop / rowHeight);
+        var start = config.header_rows
+            + Math.floor(first / config.window_rows) * config.window_rows;
+        if (start === wanted) {
+            return;
+        }
+        wanted = start;
+        nextId += 1;
+        comm.send({request_id: nextId, start: start,
+                   stop: start + 2 * config.window_rows});
+    });
+})();
+'''
@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from ipy_table import IpyTable
+
+
+def _make_table():
+    table = IpyTable([[row, row * 1.5, 'item %d' % row] for row in range(25)])
+    table.apply_theme('basic')
+    table.set_cell_style(3, 1, row_span=4, thick_border='all')
+    return table
+
+
+def test_iter_html_matches_repr_html():
+    table = _make_table()
+    assert ''.join(table.iter_html(chunk_rows=7)) == table._repr_html_()
+
+
+def test_render_async_matches_repr_html():
+    table = _make_table()
+    html = asyncio.run(table.render_async(chunk_rows=4))
+    assert html == table._repr_html_()
+
+
+def test_render_async_with_executor():
+    table = _make_table()
+    with ThreadPoolExecutor(2) as executor:
+        html = asyncio.run(table.render_async(chunk_rows=10, executor=executor))
+    assert html == table._repr_html_()
+
+
+def test_iter_html_async_yields_between_chunks():
+    table = _make_table()
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        chunks = [chunk async for chunk in table.iter_html_async(chunk_rows=5)]
+        task.cancel()
+        return chunks
+
+    chunks = asyncio.run(main())
+    assert len(chunks) == 7
+    assert len(ticks) >= 4
@@ -0,0 +1,86 @@
+import io
+import json
+
+from ipy_table import IpyTable
+from ipy_table.cli import main
+
+
+def _write(path, text):
+    with io.open(str(path), 'w', encoding='utf-8') as output_file:
+        output_file.write(text)
+
+
+def _read(path):
+    with io.open(str(path), encoding='utf-8') as input_file:
+        return input_file.read()
+
+
+def test_renders_csv_and_json_with_style(tmp_path, capsys):
+    _write(tmp_path / 'sales.csv', u'item,qty\napple,1\npear,2.5\n')
+    _write(tmp_path / 'records.json',
+           json.dumps([{'item': 'fig', 'qty': 3}]))
+    _write(tmp_path / 'style.json', json.dumps(
+        {'theme': 'basic', 'columns': {'qty': {'align': 'right'}},
+         'summary': {'funcs': {'1': 'sum'}, 'label': 'Total'}}))
+
+    status = main([str(tmp_path / 'sales.csv'),
+                   str(tmp_path / 'records.json'),
+                   '--style', str(tmp_path / 'style.json'),
+                   '-o', str(tmp_path / 'out'), '--jobs', '1'])
+    assert status == 0
+
+    expected = IpyTable.from_csv(str(tmp_path / 'sales.csv'))
+    expected.apply_theme('basic')
+    expected.set_column_style(1, align='right')
+    expected.add_summary_row({1: 'sum'}, label='Total')
+    assert _read(tmp_path / 'out' / 'sales.html') == expected._repr_html_()
+    assert '<td' in _read(tmp_path / 'out' / 'records.html')
+    output = capsys.readouterr().out
+    assert '2 file(s) (0 failed), 7 rows' in output
+
+
+def test_manifest_in_worker_processes(tmp_path, capsys):
+    for name in ('a', 'b', 'c'):
+        _write(tmp_path / (name + '.json'), json.dumps([[name], [1]]))
+    _write(tmp_path / 'manifest.json', json.dumps(
+        ['a.json',
+         {'input': 'b.json', 'output': 'b_out.html',
+          'style': {'rows': {'0': {'bold': True}}}},
+         {'input': 'c.json', 'style': {'no_such_entry': 1}},
+         'missing.csv']))
+
+    status = main(['--manifest', str(tmp_path / 'manifest.json'),
+                   '--jobs', '2'])
+    assert status == 1
+    assert _read(tmp_path / 'a.html') == IpyTable([['a'], [1]])._repr_html_()
+    assert '<b>b</b>' in _read(tmp_path / 'b_out.html')
+    captured = capsys.readouterr()
+    assert captured.err.count('FAILED') == 2
+    assert '4 file(s) (2 failed)' in captured.out
+
+
+def test_failed_jobs_leave_no_output(tmp_path, monkeypatch, capsys):
+    _write(tmp_path / 'data.csv', u'a,b\n1,2\n3,4\n')
+
+    def failing_iter_html(self, chunk_rows=None):
+        yield '<table>'
+        raise RuntimeError('render failed')
+
+    def failing_to_bytes(self):
+        raise RuntimeError('serialization failed')
+
+    monkeypatch.setattr(IpyTable, 'iter_html', failing_iter_html)
+    monkeypatch.setattr(IpyTable, 'to_bytes', failing_to_bytes)
+    for output_format in ('html', 'ipyt'):
+        assert main([str(tmp_path / 'data.csv'), '-f', output_format,
+                     '-o', str(tmp_path / 'out'), '-j', '1']) == 1
+        assert list((tmp_path / 'out').iterdir()) == []
+    assert capsys.readouterr().err.count('FAILED') == 2
+
+
+def test_serialized_output(tmp_path):
+    _write(tmp_path / 'data.csv', u'a,b\n1,2\n')
+    assert main([str(tmp_path / 'data.csv'), '-f', 'ipyt', '-j', '1']) == 0
+    with open(str(tmp_path / 'data.ipyt'), 'rb') as table_file:
+        table = IpyTable.from_bytes(table_file.read())
+    assert table.array[:] == [['a', 'b'], [1, 2]]
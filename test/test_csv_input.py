@@ -0,0 +1,116 @@
+import io
+import pickle
+
+import pytest
+
+from ipy_table import IpyTable
+
+CSV_TEXT = (u'id,name,price,qty\n'
+            u'1,apple,2.5,3\n'
+            u'\n'
+            u'2,"pear, green",1,\n'
+            u'3,plum,0.25,7\n')
+
+
+def test_column_types_and_compact_storage():
+    table = IpyTable.from_csv(io.StringIO(CSV_TEXT))
+    assert table.array[0] == ['id', 'name', 'price', 'qty']
+    assert table.array[1] == [1, 'apple', 2.5, 3]
+    # Missing values of numeric columns are empty
+    assert table.array[2] == [2, 'pear, green', 1.0, '']
+    columns = table.array.columns
+    assert [getattr(column, 'typecode', None) for column in columns] == [
+        'q', None, 'd', 'q']
+    assert table._repr_html_() == IpyTable(
+        [['id', 'name', 'price', 'qty'], [1, 'apple', 2.5, 3],
+         [2, 'pear, green', 1.0, ''], [3, 'plum', 0.25, 7]])._repr_html_()
+    assert table._num_rows == 4
+
+    table.set_cell_style(2, 1, bold=True)
+    assert list(table._cell_styles.rows) == [2]
+    expected = IpyTable([list(row) for row in table.array])
+    expected.set_cell_style(2, 1, bold=True)
+    assert table._repr_html_() == expected._repr_html_()
+    assert pickle.loads(pickle.dumps(table))._repr_html_() == \
+        expected._repr_html_()
+
+
+def test_types_are_inferred_on_a_sample(tmp_path):
+    path = str(tmp_path / 'data.tsv')
+    with io.open(path, 'w') as tsv_file:
+        tsv_file.write(u'a\tb\n')
+        for row in range(10):
+            tsv_file.write(u'%d\t%d\n' % (row, row))
+        tsv_file.write(u'1.5\tn/a\n')
+    table = IpyTable.from_csv(path, sample_rows=4)
+    # Later values which do not fit the column type are converted on
+    # their own
+    assert table.array[-1] == [1.5, 'n/a']
+    assert table.array[1] == [0, 0]
+    assert type(table.array[1][0]) is int
+
+    table = IpyTable.from_csv(path, header=False)
+    assert table.array[0] == ['a', 'b']
+
+
+def test_stream_renders_like_the_whole_table(tmp_path):
+    path = str(tmp_path / 'rows.csv')
+    with io.open(path, 'w') as csv_file:
+        csv_file.write(u'n,square,label\n')
+        for row in range(50):
+            csv_file.write(u'%d,%d,row %d\n' % (row, row * row, row))
+
+    table = IpyTable.from_csv(path)
+    table.apply_theme('basic')
+    table.set_column_style(1, align='right', thick_border='bottom')
+    table.set_column_formatter(1, '{:,}')
+
+    stream = IpyTable.from_csv(path, sample_rows=7, stream=True)
+    stream.apply_theme('basic')
+    stream.set_column_style('square', align='right', thick_border='bottom')
+    stream.set_column_formatter(1, '{:,}')
+    chunks = list(stream.iter_html(chunk_rows=10))
+    assert len(chunks) == 8
+    assert ''.join(chunks) == table._repr_html_()
+
+    html_file = io.StringIO()
+    stream.write_html(html_file, chunk_rows=3)
+    assert html_file.getvalue() == table._repr_html_()
+
+
+def test_stream_with_values_not_fitting_the_column_type():
+    csv_text = u'a,b\n0,0\n1,1\n,2\n3,3\n5,2.5\n4,\n'
+    table = IpyTable.from_csv(io.StringIO(csv_text), sample_rows=2)
+    assert table.array[:] == [['a', 'b'], [0, 0], [1, 1], ['', 2], [3, 3],
+                              [5, 2.5], [4, '']]
+    for chunk_rows in (1, 2, 4):
+        stream = IpyTable.from_csv(io.StringIO(csv_text), sample_rows=2,
+                                   stream=True)
+        assert ''.join(stream.iter_html(chunk_rows=chunk_rows)) == \
+            table._repr_html_()
+
+
+def test_only_canonical_numbers_are_numeric():
+    csv_text = (u'zip,code,count,ratio\n'
+                u'02134,007,1_000, 5\n'
+                u'10001,12,2000,1e3\n')
+    table = IpyTable.from_csv(io.StringIO(csv_text))
+    assert table.array[1:] == [['02134', '007', '1_000', ' 5'],
+                               ['10001', '12', '2000', '1e3']]
+    table = IpyTable.from_csv(io.StringIO(csv_text), sample_rows=1)
+    assert table.array[1:] == [['02134', '007', '1_000', ' 5'],
+                               ['10001', '12', '2000', '1e3']]
+    csv_text = u'a,b\n0,-0.5\n-12,2.5E-3\n'
+    assert IpyTable.from_csv(io.StringIO(csv_text)).array[1:] == [
+        [0, -0.5], [-12, 0.0025]]
+    csv_text = u'a\n1\n2\n007\n-3.5\n'
+    assert IpyTable.from_csv(io.StringIO(csv_text), sample_rows=2).array[
+        1:] == [[1], [2], ['007'], [-3.5]]
+
+
+def test_bad_input():
+    with pytest.raises(ValueError):
+        IpyTable.from_csv(io.StringIO(u'a,b\n1,2\n3\n'))
+    with pytest.raises(ValueError):
+        IpyTable.from_csv(io.StringIO(u''))
+    assert IpyTable.from_csv(io.StringIO(u'a,b\n')).array[:] == [['a', 'b']]
@@ -0,0 +1,67 @@
+import pytest
+
+from ipy_table import IpyTable
+
+
+def _rows(first, last):
+    return [[row, row * 1.5] for row in range(first, last)]
+
+
+def test_set_value_keeps_styles():
+    table = IpyTable([(1, 2), (3, 4)])
+    table.set_cell_style(1, 1, bold=True)
+    table.set_value(1, 1, 'x')
+    assert table.array[1] == [3, 'x']
+    assert table._cell_styles[1][1]['bold']
+    with pytest.raises(ValueError):
+        table.set_value(2, 0, 'x')
+
+
+def test_append_rows_extends_theme():
+    table = IpyTable(_rows(0, 3))
+    table.apply_theme('basic_left')
+    table.append_rows(_rows(3, 6), style=dict(italic=True))
+
+    expected = IpyTable(_rows(0, 6))
+    expected.apply_theme('basic_left')
+    for row in range(3, 6):
+        expected.set_row_style(row, italic=True)
+    assert table._repr_html_() == expected._repr_html_()
+
+
+def test_append_rows_checks_length():
+    table = IpyTable(_rows(0, 2))
+    with pytest.raises(ValueError):
+        table.append_rows([[1, 2, 3]])
+
+
+def test_delete_rows_shortens_spans():
+    table = IpyTable(_rows(0, 8))
+    table.set_cell_style(1, 0, row_span=4)
+    table.set_cell_style(5, 1, row_span=3)
+    table.delete_rows(3, 6)
+
+    expected = IpyTable(_rows(0, 3) + _rows(6, 8))
+    expected.set_cell_style(1, 0, row_span=2)
+    assert table._num_rows == 5
+    assert table._row_spans == {(1, 0): 2}
+    assert table._repr_html_() == expected._repr_html_()
+
+
+def test_delete_rows_keeps_theme_stripes():
+    table = IpyTable(_rows(0, 6))
+    table.apply_theme('basic')
+    table.delete_rows(2)
+    table.append_rows(_rows(6, 8))
+
+    expected = IpyTable(_rows(0, 2) + _rows(3, 8))
+    expected.apply_theme('basic')
+    assert table._repr_html_() == expected._repr_html_()
+
+
+def test_delete_single_row():
+    table = IpyTable(_rows(0, 3))
+    table.delete_rows(1)
+    assert table.array == _rows(0, 1) + _rows(2, 3)
+    with pytest.raises(ValueError):
+        table.delete_rows(1, 3)
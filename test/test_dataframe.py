@@ -0,0 +1,84 @@
+import re
+
+import pytest
+
+from ipy_table import IpyTable
+
+pd = pytest.importorskip('pandas')
+np = pytest.importorskip('numpy')
+
+
+def _cells(html):
+    return re.findall(r'<td[^>]*>(.*?)</td>', html)
+
+
+def _frame(num_rows=5):
+    return pd.DataFrame(
+        {'count': np.arange(num_rows),
+         'ratio': np.linspace(0, 1, num_rows),
+         'small': np.linspace(0, 1, num_rows).astype('float32'),
+         'flag': np.arange(num_rows) % 2 == 0,
+         'name': ['n <%d>' % row for row in range(num_rows)]},
+        index=pd.Index(['r%d' % row for row in range(num_rows)], name='key'))
+
+
+def test_header_and_index():
+    table = IpyTable.from_dataframe(_frame())
+    assert table.array[0] == ['key', 'count', 'ratio', 'small', 'flag', 'name']
+    assert table.array[1][0] == 'r0'
+    assert _cells(table._repr_html_())[6:12] == [
+        'r0', '0', '0.0000', '0.0000', 'True', 'n&nbsp;&lt;0&gt;']
+
+
+def test_without_index_or_header():
+    table = IpyTable.from_dataframe(_frame(), index=False, header=False)
+    assert table._num_rows == 5
+    assert table._num_columns == 5
+    assert IpyTable.from_dataframe(_frame(), index=False).array[0][0] == 'count'
+
+
+def test_multi_index_spans():
+    columns = pd.MultiIndex.from_tuples([('A', 'x'), ('A', 'y'), ('B', 'x')])
+    index = pd.MultiIndex.from_tuples([('g', 1), ('g', 2), ('h', 1)],
+                                      names=['group', 'item'])
+    table = IpyTable.from_dataframe(
+        pd.DataFrame(np.arange(9.).reshape(3, 3), index=index,
+                     columns=columns))
+    assert table.array[0] == ['', '', 'A', 'A', 'B']
+    assert table.array[1] == ['group', 'item', 'x', 'y', 'x']
+    assert table._cell_styles[0][2]['column_span'] == 2
+    assert table._cell_styles[0][3]['suppress']
+    assert table._row_spans == {(2, 0): 2}
+
+
+def test_column_conversion_by_dtype():
+    table = IpyTable.from_dataframe(_frame(), index=False, header=False)
+    assert [type(item) for item in table.array[0]] == [
+        int, float, np.float32, bool, str]
+    table.set_column_style(2, float_format=None)
+    assert _cells(table._repr_html_())[7] == str(np.float32(0.25))
+
+
+def test_datetime_and_missing_values():
+    df = pd.DataFrame({'when': pd.to_datetime(['2017-08-25 13:45']),
+                       'count': pd.array([None], dtype='Int64')})
+    table = IpyTable.from_dataframe(df, index=False)
+    table.set_column_formatter(0, 'datetime')
+    cells = _cells(table._repr_html_())
+    assert cells[2] == '2017-08-25&nbsp;13:45:00'
+    # Missing value text depends on the pandas version (<NA> or nan)
+    assert cells[3] in ('&lt;NA&gt;', 'nan')
+
+
+def test_nullable_int_column_keeps_ints():
+    df = pd.DataFrame({'count': pd.array([1, None, 3], dtype='Int64')})
+    table = IpyTable.from_dataframe(df, index=False, header=False)
+    assert [type(row_data[0]) for row_data in table.array[::2]] == [int, int]
+    cells = _cells(table._repr_html_())
+    assert cells[::2] == ['1', '3']
+    assert cells[1] in ('&lt;NA&gt;', 'nan')
+
+
+def test_rejects_non_dataframes():
+    with pytest.raises(TypeError):
+        IpyTable.from_dataframe([[1, 2]])
@@ -0,0 +1,33 @@
+import re
+
+from ipy_table import IpyTable
+
+
+def _cells(table):
+    return re.findall(r'<td[^>]*>(.*?)</td>', table._repr_html_())
+
+
+def test_special_characters_are_escaped():
+    table = IpyTable([['a<b', 'x & "y"', 1.5, None]])
+    assert _cells(table) == [
+        'a&lt;b', 'x&nbsp;&amp;&nbsp;&quot;y&quot;', '1.5000', 'None']
+
+
+def test_escape_opt_out_for_trusted_html():
+    table = IpyTable([['<a href="x">link</a>', '<i>x</i>']])
+    table.set_cell_style(0, 0, escape=False, wrap=True)
+    assert _cells(table) == ['<a href="x">link</a>', '&lt;i&gt;x&lt;/i&gt;']
+
+
+def test_float_format_output_is_converted_when_needed():
+    table = IpyTable([[1.5, 2.5, 3.5]])
+    table.set_cell_style(0, 0, float_format='%6.2f')
+    table.set_cell_style(0, 1, float_format='<%0.1f>')
+    table.set_cell_style(0, 2, float_format='%0.1f')
+    assert _cells(table) == ['&nbsp;&nbsp;1.50', '&lt;2.5&gt;', '3.5']
+
+
+def test_user_formatter_output_is_escaped():
+    table = IpyTable([[1], [2]])
+    table.set_column_formatter(0, '<{}>')
+    assert _cells(table) == ['&lt;1&gt;', '&lt;2&gt;']
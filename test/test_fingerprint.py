@@ -0,0 +1,101 @@
+import pickle
+
+from ipy_table import IpyTable, RingTable
+
+
+def _fresh_fingerprint(table):
+    """Returns the fingerprint of a table, computed from scratch."""
+    table._row_digests = None
+    table._fingerprint_memo = None
+    return table.fingerprint()
+
+
+def _make_table(num_rows=1000):
+    return IpyTable([['n', 'square']] +
+                    [[row, row * row] for row in range(num_rows)])
+
+
+def test_fingerprint_follows_values_and_styles():
+    table = _make_table()
+    fingerprint = table.fingerprint()
+    assert fingerprint == _make_table().fingerprint()
+
+    table.set_value(500, 1, -1)
+    assert table.fingerprint() != fingerprint
+    table.set_value(500, 1, 500 * 500)
+    assert table.fingerprint() != fingerprint
+    # (Row 500 holds n = 499, below the header row)
+    table.set_value(500, 1, 499 * 499)
+    assert table.fingerprint() == fingerprint
+
+    table.set_cell_style(700, 0, bold=True)
+    assert table.fingerprint() not in (fingerprint, None)
+    assert table.fingerprint() == _fresh_fingerprint(table)
+
+    table.set_column_formatter(1, '{:,}')
+    assert table.fingerprint() == _fresh_fingerprint(table)
+
+
+def test_only_changed_rows_are_hashed(monkeypatch):
+    table = _make_table(5000)
+    table.apply_theme('basic')
+    table.fingerprint()
+
+    hashed = []
+    row_digest = IpyTable._row_digest
+
+    def recording_row_digest(self, row):
+        hashed.append(row)
+        return row_digest(self, row)
+
+    monkeypatch.setattr(IpyTable, '_row_digest', recording_row_digest)
+    table.set_cell_style(1234, 1, thick_border='bottom')
+    table.set_value(4000, 0, 'x')
+    fingerprint = table.fingerprint()
+    assert sorted(hashed) == [1234, 1235, 4000]
+    assert fingerprint == table.fingerprint()
+    assert fingerprint == _fresh_fingerprint(table)
+
+
+def test_row_insertion_deletion_spans_and_summaries():
+    table = _make_table(600)
+    table.apply_theme('basic')
+    table.set_cell_style(10, 0, row_span=4)
+    table.set_cell_style(300, 1, thick_border='bottom')
+    table.add_summary_row({1: sum}, label='Total')
+    table.fingerprint()
+
+    table.append_rows([[1, 2], [3, 4]])
+    assert table.fingerprint() == _fresh_fingerprint(table)
+    table.delete_rows(12, 270)
+    assert table.fingerprint() == _fresh_fingerprint(table)
+    before = table.fingerprint()
+    table.set_value(5, 1, 10 ** 6)
+    fingerprint = table.fingerprint()
+    # (The summary row is recomputed as well)
+    assert fingerprint != before
+    assert fingerprint == _fresh_fingerprint(table)
+
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored.fingerprint() == fingerprint
+    assert IpyTable.from_bytes(table.to_bytes()).fingerprint() == fingerprint
+
+
+def test_ring_tables_and_views():
+    table = RingTable(300, header=['time', 'event'])
+    table.apply_theme('basic')
+    for row in range(400):
+        table.push_row([row, 'event %d' % row])
+        if row % 97 == 0:
+            assert table.fingerprint() == _fresh_fingerprint(table)
+    assert table.fingerprint() == _fresh_fingerprint(table)
+
+    parent = _make_table(100)
+    view = parent[10:20]
+    fingerprint = view.fingerprint()
+    parent.set_value(15, 0, 'changed')
+    assert view.fingerprint() != fingerprint
+    view.set_cell_style(0, 0, bold=True)
+    assert view.fingerprint() == _fresh_fingerprint(view)
+    assert IpyTable([[None]]).fingerprint() is not None
+    assert IpyTable([[lambda: 0]]).fingerprint() is None
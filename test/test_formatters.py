@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+
+from ipy_table import IpyTable
+
+
+def _cell_texts(table, column):
+    formatters = table._get_column_formatters()
+    return [formatters[column](row_data[column], table._cell_styles[row][column])
+            for row, row_data in enumerate(table.array)]
+
+
+def test_builtin_formatters_fall_back_for_header():
+    table = IpyTable([
+        ['count', 'ratio', 'when', 'value'],
+        [1234567, 0.1234, datetime.datetime(2017, 8, 25, 13, 45), 2.5],
+        [12, 1.5, datetime.date(2017, 8, 25), 3.25]])
+    table.set_column_formatter(0, 'int')
+    table.set_column_formatter(1, 'percent')
+    table.set_column_formatter(2, 'datetime')
+    table.set_column_formatter(3, '${:,.2f}')
+    assert _cell_texts(table, 0) == ['count', '1,234,567', '12']
+    assert _cell_texts(table, 1) == ['ratio', '12.3%', '150.0%']
+    assert _cell_texts(table, 2) == ['when', '2017-08-25&nbsp;13:45:00', '2017-08-25']
+    assert _cell_texts(table, 3) == ['value', '$2.50', '$3.25']
+
+
+def test_callable_and_percent_format_string():
+    table = IpyTable([[1.5], [2.25]])
+    table.set_column_formatter(0, '%0.1f units')
+    assert _cell_texts(table, 0) == ['1.5&nbsp;units', '2.2&nbsp;units']
+    table.set_column_formatter(0, lambda value: 'v=%s' % value)
+    assert 'v=2.25</td>' in table._repr_html_()
+    table.set_column_formatter(0, None)
+    assert _cell_texts(table, 0) == ['1.5000', '2.2500']
+
+
+def test_callable_errors_are_not_hidden():
+    table = IpyTable([['price'], [1.5]])
+    table.set_column_formatter(0, lambda value: '%0.2f' % value)
+    with pytest.raises(TypeError):
+        table._repr_html_()
+    table.set_column_formatter(0, lambda value: (
+        value if isinstance(value, str) else '%0.2f' % value))
+    assert _cell_texts(table, 0) == ['price', '1.50']
+
+
+def test_float_formatter_uses_cell_float_format():
+    table = IpyTable([[1.23456, 'x']])
+    table.set_column_formatter(0, 'float')
+    table.set_cell_style(0, 0, float_format='%0.1f')
+    assert _cell_texts(table, 0) == ['1.2']
+
+
+def test_bad_formatter():
+    table = IpyTable([[1]])
+    with pytest.raises(ValueError):
+        table.set_column_formatter(0, 'no_such_formatter')
+    with pytest.raises(TypeError):
+        table.set_column_formatter(0, 5)
+
+
+def test_inferred_formatters_match_default():
+    table = IpyTable([['a', 1], [1.5, 'b c'], [None, 2.0]])
+    table.set_global_style(wrap=True)
+    for column in range(2):
+        assert _cell_texts(table, column) == [
+            table._formatter(row_data[column], table._cell_styles[row][column])
+            for row, row_data in enumerate(table.array)]
+    # Types not seen by the inference pass are handled too
+    table.set_value(0, 0, 7.0)
+    assert _cell_texts(table, 0)[0] == '7.0000'
@@ -0,0 +1,81 @@
+import pickle
+
+import pytest
+
+from ipy_table import IpyTable
+
+
+def _recording(calls):
+    def cell(row, column):
+        calls.append(row)
+        return row * 10 + column
+    return cell
+
+
+def test_only_displayed_rows_are_computed():
+    calls = []
+    table = IpyTable.from_function(10000, 3, _recording(calls),
+                                   header=['a', 'b', 'c'], block_rows=8)
+    assert table._num_rows == 10001
+    assert table.array[0] == ['a', 'b', 'c']
+    del calls[:]
+    table.page(500, 10, header_rows=1)
+    # The first block (sampled for the column formatters) and the
+    # blocks of the window
+    assert sorted(set(calls)) == list(range(8)) + list(range(5000, 5016))
+
+    expected = IpyTable([['a', 'b', 'c']] +
+                        [[row * 10 + column for column in range(3)]
+                         for row in range(10000)])
+    assert table.render_rows(7001, 7011, header_rows=1) == \
+        expected.render_rows(7001, 7011, header_rows=1)
+    assert list(table._cell_styles.rows) == []
+
+
+def test_memoization():
+    calls = []
+    table = IpyTable.from_function(100, 2, _recording(calls), memoize=True,
+                                   block_rows=10)
+    table.render_rows(50, 60)
+    table.render_rows(0, 5)
+    table.render_rows(50, 60)
+    # Blocks 0 and 50, computed once
+    assert len(calls) == 2 * 20
+    assert sorted(table.array.memo) == [0, 50]
+
+    calls = []
+    table = IpyTable.from_function(100, 2, _recording(calls), block_rows=10)
+    table.render_rows(50, 60)
+    del calls[:]
+    table.render_rows(0, 5)
+    table.render_rows(50, 60)
+    assert len(calls) == 2 * 20
+
+
+def test_vectorized():
+    np = pytest.importorskip('numpy')
+
+    def block(rows, columns):
+        return np.add.outer(np.arange(rows.start, rows.stop) * 10,
+                            np.arange(columns.start, columns.stop))
+
+    table = IpyTable.from_function(50, 4, block, vectorized=True)
+    assert table.array[37] == [370, 371, 372, 373]
+    assert type(table.array[37][0]) is int
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored._repr_html_() == table._repr_html_()
+
+    with pytest.raises(ValueError):
+        IpyTable.from_function(50, 4, lambda rows, columns: [[1]],
+                               vectorized=True)
+
+
+def test_updates_and_bad_sizes():
+    table = IpyTable.from_function(3, 2, lambda row, column: row)
+    table.set_value(1, 1, 'x')
+    table.append_rows([[7, 7]])
+    assert table.array == [[0, 0], [1, 'x'], [2, 2], [7, 7]]
+    with pytest.raises(ValueError):
+        IpyTable.from_function(0, 2, lambda row, column: row)
+    with pytest.raises(ValueError):
+        IpyTable.from_function(2, 2, lambda row, column: row, header=['a'])
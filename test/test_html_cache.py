@@ -0,0 +1,103 @@
+import pytest
+
+from ipy_table import (IpyTable, HtmlCache,
+    enable_html_cache, disable_html_cache, html_cache_info)
+
+
+@pytest.fixture
+def cache():
+    cache = enable_html_cache()
+    yield cache
+    disable_html_cache()
+
+
+def _make_table():
+    table = IpyTable([[1, 2.5, 'a'], [3, 4.5, 'b']])
+    table.apply_theme('basic')
+    return table
+
+
+def test_identical_tables_share_entries(cache):
+    html = _make_table()._repr_html_()
+    assert _make_table()._repr_html_() == html
+    info = html_cache_info()
+    assert (info['hits'], info['misses'], info['entries']) == (1, 1, 1)
+
+
+def test_style_change_invalidates(cache):
+    table = _make_table()
+    before = table._repr_html_()
+    table.set_cell_style(0, 0, italic=True)
+    after = table._repr_html_()
+    assert after != before
+    assert after == ''.join(table.iter_html())
+    assert html_cache_info()['misses'] == 2
+
+
+def test_callable_formatters_are_not_cached(cache):
+    table = _make_table()
+    table.set_column_formatter(0, lambda value: 'x%s' % value)
+    assert table.fingerprint() is None
+    assert 'x1' in table._repr_html_()
+    # A redefined formatter renders its own output
+    table = _make_table()
+    table.set_column_formatter(0, lambda value: 'y%s' % value)
+    assert 'y1' in table._repr_html_()
+    assert html_cache_info()['entries'] == 0
+
+
+def test_lru_eviction():
+    cache = HtmlCache(max_bytes=10)
+    cache.put('a', '12345')
+    cache.put('b', '12345')
+    cache.get('a')
+    cache.put('c', '12345')
+    assert cache.get('b') is None
+    assert cache.get('a') == '12345'
+    assert cache.info()['evictions'] == 1
+
+
+def test_disk_tier(tmpdir):
+    cache = HtmlCache(max_bytes=10, disk_dir=str(tmpdir))
+    cache.put('a', '12345')
+    cache.put('b', '1234567890')
+    assert cache.get('a') == '12345'
+    assert cache.info()['disk_hits'] == 1
+
+    # A new cache picks up the entries on disk
+    cache = HtmlCache(disk_dir=str(tmpdir))
+    assert cache.get('b') == '1234567890'
+    cache.clear()
+    assert tmpdir.listdir() == []
+
+
+def test_disk_tier_only_owns_its_files(tmpdir):
+    report = tmpdir.join('report.html')
+    report.write('<p>Report</p>')
+    cache = HtmlCache(disk_dir=str(tmpdir))
+    assert cache.info()['disk_entries'] == 0
+    cache.put('a', '12345')
+    assert HtmlCache(disk_dir=str(tmpdir)).info()['disk_entries'] == 1
+    cache.clear()
+    assert tmpdir.listdir() == [report]
+
+
+def test_disk_write_errors_fall_back_to_memory(tmpdir):
+    disk_dir = tmpdir.join('cache')
+    cache = HtmlCache(disk_dir=str(disk_dir))
+    disk_dir.remove()
+    cache.put('a', '12345')
+    assert cache.get('a') == '12345'
+    assert cache.info()['disk_entries'] == 0
+    # Byte strings are stored as text
+    cache = HtmlCache(disk_dir=str(tmpdir))
+    cache.put('b', u'caf\xe9'.encode('utf-8'))
+    assert HtmlCache(disk_dir=str(tmpdir)).get('b') == u'caf\xe9'
+
+
+def test_sizes_are_utf8_bytes_in_memory_and_on_disk(tmpdir):
+    cache = HtmlCache(disk_dir=str(tmpdir))
+    cache.put('a', u'caf\xe9\r\n')
+    assert cache.info()['bytes'] == cache.info()['disk_bytes'] == 7
+    assert HtmlCache(disk_dir=str(tmpdir)).info()['disk_bytes'] == 7
+    assert HtmlCache(disk_dir=str(tmpdir)).get('a') == u'caf\xe9\r\n'
@@ -0,0 +1,79 @@
+import io
+import pickle
+import re
+
+import pytest
+
+from ipy_table import IpyTable
+
+np = pytest.importorskip('numpy')
+
+
+def _cells(html):
+    return re.findall(r'<td[^>]*>(.*?)</td>', html)
+
+
+def _records(num_rows):
+    records = np.zeros(num_rows, dtype=[('id', 'i4'), ('value', 'f8'),
+                                        ('name', 'U8')])
+    records['id'] = np.arange(num_rows)
+    records['value'] = np.arange(num_rows) * 0.5
+    records['name'] = ['n <%d>' % row for row in range(num_rows)]
+    return records
+
+
+def test_structured_array_header_and_fields():
+    table = IpyTable(_records(3))
+    assert table._num_rows == 4
+    assert _cells(table._repr_html_()) == [
+        'id', 'value', 'name',
+        '0', '0.0000', 'n&nbsp;&lt;0&gt;',
+        '1', '0.5000', 'n&nbsp;&lt;1&gt;',
+        '2', '1.0000', 'n&nbsp;&lt;2&gt;']
+    assert IpyTable(np.rec.array(_records(3))).array[0] == [
+        'id', 'value', 'name']
+
+
+def test_memmap_is_read_lazily(tmp_path):
+    path = str(tmp_path / 'records.npy')
+    np.save(path, _records(5000))
+    data = np.load(path, mmap_mode='r')
+    table = IpyTable(data)
+    table.apply_theme('basic')
+    table.set_cell_style(4000, 1, bold=True)
+
+    expected = IpyTable([['id', 'value', 'name']] +
+                        [list(row) for row in _records(5000).tolist()])
+    expected.apply_theme('basic')
+    expected.set_cell_style(4000, 1, bold=True)
+
+    html_file = io.StringIO()
+    table.write_html(html_file, chunk_rows=700)
+    assert html_file.getvalue() == expected._repr_html_()
+    assert table._repr_html_() == html_file.getvalue()
+    # Only one block of converted rows is held at a time
+    assert len(table.array._block[1]) <= table.array.BLOCK_ROWS
+
+
+def test_untouched_rows_do_not_allocate_styles(tmp_path):
+    path = str(tmp_path / 'values.npy')
+    np.save(path, np.arange(30000.).reshape(10000, 3))
+    table = IpyTable(np.load(path, mmap_mode='r'))
+    table.set_cell_style(5, 1, italic=True)
+    table.render_rows(100, 200)
+    table._repr_html_()
+    assert list(table._cell_styles.rows) == [5]
+
+
+def test_updates_and_pickling(tmp_path):
+    table = IpyTable(_records(3))
+    table.set_value(1, 2, 'changed')
+    table.append_rows([[9, 9.5, 'new']])
+    assert _cells(table._repr_html_())[3:6] == ['0', '0.0000', 'changed']
+    assert _cells(table._repr_html_())[-3:] == ['9', '9.5000', 'new']
+
+    path = str(tmp_path / 'write.html')
+    restored = pickle.loads(pickle.dumps(IpyTable(_records(3))))
+    restored.write_html(path)
+    with open(path) as html_file:
+        assert html_file.read() == IpyTable(_records(3))._repr_html_()
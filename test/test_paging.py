@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from ipy_table import IpyTable
+
+
+def _data(num_rows):
+    return [['a', 'b', 'c']] + [[row, row * 0.5, 'r%d' % row]
+                                for row in range(1, num_rows)]
+
+
+def _styled(data):
+    table = IpyTable(data)
+    table.apply_theme('basic')
+    table.set_cell_style(2, 1, row_span=5, thick_border='bottom')
+    table.set_cell_style(8, 2, row_span=2)
+    return table
+
+
+def test_render_rows_clips_spans():
+    html = _styled(_data(12)).render_rows(4, 9, header_rows=1)
+    rows = [re.findall(r'<td([^>]*)>(.*?)</td>', row_html)
+            for row_html in html.split('</tr>')[:-1]]
+    assert len(rows) == 6
+    assert [len(cells) for cells in rows] == [3, 3, 2, 2, 3, 3]
+
+    # Row 4: the span anchored at row 2 is shown, clipped to the window
+    attributes, text = rows[1][1]
+    assert text == '1.0000'
+    assert 'rowspan="3"' in attributes
+    assert 'border-bottom: 3px solid' in attributes
+
+    # Row 8: the span reaching below the window is removed
+    attributes, text = rows[5][2]
+    assert text == 'r8'
+    assert 'rowspan' not in attributes
+
+
+def test_full_window_matches_repr_html():
+    table = _styled(_data(12))
+    assert table.render_rows(0, 12) == table._repr_html_()
+
+
+def test_pages():
+    table = _styled(_data(12))
+    pages = [table.page(index, 4, header_rows=1) for index in range(3)]
+    assert [(page.start, page.stop) for page in pages] == [(1, 5), (5, 9), (9, 12)]
+    assert pages[0].num_pages == 3
+    assert pages[2]._repr_html_() == table.render_rows(9, 12, header_rows=1)
+    with pytest.raises(ValueError):
+        table.page(3, 4, header_rows=1)
@@ -0,0 +1,54 @@
+from ipy_table import IpyTable, display_progressive
+from ipy_table import progressive
+
+
+class _FakeHandle(object):
+
+    def __init__(self):
+        self.updates = []
+
+    def update(self, obj):
+        self.updates.append(obj.data)
+
+
+def _table(num_rows):
+    table = IpyTable([[row, row * 0.5] for row in range(num_rows)])
+    table.apply_theme('basic')
+    return table
+
+
+def test_chunks_grow_and_end_with_full_table():
+    table = _table(1000)
+    handle = _FakeHandle()
+    progress = display_progressive(table, first_chunk=100, handle=handle)
+    assert progress.wait(10)
+    assert progress.rows_rendered == 1000
+    assert [html.count('<tr>') for html in handle.updates] == [100, 300, 700, 1000]
+    assert handle.updates[-1] == table._repr_html_()
+
+
+def test_foreground_rendering():
+    table = _table(10)
+    handle = _FakeHandle()
+    progress = display_progressive(table, first_chunk=4, growth=1,
+                                   background=False, handle=handle)
+    assert progress.done
+    assert [html.count('<tr>') for html in handle.updates] == [4, 8, 10]
+
+
+def test_default_display_uses_display_handle(monkeypatch):
+    displayed = []
+    handle = _FakeHandle()
+
+    def fake_display_html(html):
+        displayed.append(html)
+        return handle
+
+    monkeypatch.setattr(progressive, '_display_html', fake_display_html)
+    table = _table(5)
+    progress = display_progressive(table, first_chunk=2)
+    assert progress.wait(10)
+    # The first chunk creates the display, later chunks update it
+    assert [html.count('<tr>') for html in displayed] == [2]
+    assert [html.count('<tr>') for html in handle.updates] == [5]
+    assert handle.updates[-1] == table._repr_html_()
@@ -0,0 +1,80 @@
+import datetime
+import io
+import pickle
+import sqlite3
+
+import pytest
+
+from ipy_table import IpyTable
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(':memory:',
+                                 detect_types=sqlite3.PARSE_DECLTYPES)
+    connection.execute('CREATE TABLE sales (id INTEGER, item TEXT, '
+                       'price REAL, sold TIMESTAMP)')
+    connection.executemany(
+        'INSERT INTO sales VALUES (?, ?, ?, ?)',
+        [(row, None if row % 4 == 0 else 'item %d' % row, row * 0.5,
+          datetime.datetime(2017, 8, 25, 13, 45, row % 60, 500))
+         for row in range(30)])
+    yield connection
+    connection.close()
+
+
+SQL = 'SELECT id, item, price, sold FROM sales WHERE id < ? ORDER BY id'
+
+
+def test_query_header_nulls_and_formatters(connection):
+    table = IpyTable.from_query(connection, SQL, (10,), fetch_rows=3)
+    assert table._num_rows == 11
+    assert table.array[0] == ['id', 'item', 'price', 'sold']
+    assert table.array[1][:3] == [0, '', 0.0]
+    assert table.array[2][1] == 'item 1'
+    assert table._column_formatters == {3: 'datetime'}
+    assert '2017-08-25&nbsp;13:45:01<' in table._repr_html_()
+    assert list(table._cell_styles.rows) == []
+
+    table = IpyTable.from_query(connection, SQL, (10,), header=False,
+                                null=None)
+    assert table.array[0][:2] == [0, None]
+
+
+def test_lazy_rows_are_fetched_by_block(connection):
+    whole = IpyTable.from_query(connection, SQL, (30,))
+    lazy = IpyTable.from_query(connection, SQL + ';', (30,), lazy=True,
+                               fetch_rows=4)
+    assert len(lazy.array) == 31
+    assert lazy.page(3, 5, header_rows=1).html == \
+        whole.page(3, 5, header_rows=1).html
+    # Only one block of rows is held
+    assert len(lazy.array._block[1]) <= 4
+    assert lazy.array[-1] == whole.array[-1]
+    assert lazy._repr_html_() == whole._repr_html_()
+    assert pickle.loads(pickle.dumps(lazy)).array[:] == whole.array[:]
+
+
+def test_stream_renders_like_the_whole_table(connection):
+    whole = IpyTable.from_query(connection, SQL, (30,))
+    whole.apply_theme('basic')
+    whole.set_column_style(2, thick_border='bottom')
+
+    stream = IpyTable.from_query(connection, SQL, (30,), stream=True)
+    stream.apply_theme('basic')
+    stream.set_column_style('price', thick_border='bottom')
+    assert len(list(stream.iter_html(chunk_rows=7))) == 7
+    html_file = io.StringIO()
+    stream.write_html(html_file, chunk_rows=4)
+    assert html_file.getvalue() == whole._repr_html_()
+
+
+def test_bad_queries(connection):
+    with pytest.raises(ValueError):
+        IpyTable.from_query(connection, SQL, (0,), header=False)
+    with pytest.raises(ValueError):
+        IpyTable.from_query(connection, SQL, (0,), header=False, lazy=True)
+    assert IpyTable.from_query(connection, SQL, (0,)).array[:] == [
+        ['id', 'item', 'price', 'sold']]
+    with pytest.raises(ValueError):
+        IpyTable.from_query(connection, 'UPDATE sales SET price = 0')
@@ -0,0 +1,57 @@
+import pytest
+
+from ipy_table import IpyTable, RingTable
+
+
+def _rows(first, last):
+    return [[row, row * 0.5] for row in range(first, last)]
+
+
+def test_ring_table_matches_scrolled_table():
+    table = RingTable(4, header=['a', 'b'])
+    table.apply_theme('basic_both')
+    for row_data in _rows(0, 7):
+        table.push_row(row_data, style=dict(thick_border='bottom'))
+
+    # Equivalent to the rows of the full table which were not evicted
+    # (rows keep the colors of their stream position)
+    expected = IpyTable([['a', 'b']])
+    expected.apply_theme('basic_both')
+    expected.append_rows(_rows(0, 7), style=dict(thick_border='bottom'))
+    expected = expected[[0, 4, 5, 6, 7]]
+    assert list(table.array) == [['a', 'b']] + _rows(3, 7)
+    assert table._repr_html_() == expected._repr_html_()
+
+
+def test_theme_colors_stable_while_scrolling():
+    table = RingTable(3, num_columns=2)
+    table.apply_theme('basic')
+    table.push_row([0, 0])
+    for row_data in _rows(1, 6):
+        table.push_row(row_data)
+        colors = [table._cell_styles[row][1]['color'] for row in range(3)
+                  if row < table._num_rows]
+        last_value = table.array[table._num_rows - 1][0]
+        assert colors[-1] == ('Ivory' if last_value % 2 else 'AliceBlue')
+
+
+def test_only_new_rows_are_rendered(monkeypatch):
+    table = RingTable(50, header=['a', 'b'])
+    table.append_rows(_rows(0, 50))
+    table._repr_html_()
+    rendered = []
+    original = IpyTable._render_row_html
+    monkeypatch.setattr(
+        IpyTable, '_render_row_html',
+        lambda self, row: rendered.append(row) or original(self, row))
+    table.push_row([50, 25.0])
+    table.set_cell_style(10, 0, bold=True)
+    table._repr_html_()
+    assert sorted(rendered) == [10, 50]
+
+
+def test_row_span_not_supported():
+    table = RingTable(3, num_columns=2)
+    table.push_row([1, 2])
+    with pytest.raises(ValueError):
+        table.set_cell_style(0, 0, row_span=2)
@@ -0,0 +1,42 @@
+import pickle
+
+from ipy_table import IpyTable
+
+
+def _make_table(array):
+    table = IpyTable(array)
+    table.apply_theme('basic_both')
+    table.set_cell_style(1, 1, row_span=2, thick_border='all')
+    return table
+
+
+def test_pickle_round_trip():
+    table = _make_table([[row * 0.5, row * 2.0, row * 3.0] for row in range(10)])
+    restored = pickle.loads(pickle.dumps(table))
+    assert restored.array == table.array
+    assert restored._cell_styles == table._cell_styles
+    assert restored._repr_html_() == table._repr_html_()
+
+
+def test_restored_cell_styles_are_independent():
+    table = _make_table([[1, 2], [3, 4], [5, 6], [7, 8]])
+    restored = pickle.loads(pickle.dumps(table))
+    restored.set_cell_style(3, 1, italic=True)
+    assert 'italic' not in restored._cell_styles[3][0]
+    assert 'italic' not in restored._cell_styles[1][1]
+
+
+def test_to_bytes_round_trip_mixed_data():
+    table = _make_table([['a', 1, 2.5], ['b', 2 ** 70, None], ['c', 3, 4.5]])
+    restored = IpyTable.from_bytes(table.to_bytes())
+    assert restored.array == table.array
+    assert restored._repr_html_() == table._repr_html_()
+    restored = IpyTable.from_bytes(table.to_bytes(compress=False))
+    assert restored._repr_html_() == table._repr_html_()
+
+
+def test_compact_state_is_smaller():
+    table = _make_table([[float(row * column) for column in range(10)]
+                         for row in range(1000)])
+    naive = pickle.dumps((table.array, table._cell_styles), -1)
+    assert len(pickle.dumps(table, -1)) < len(naive) / 2
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+from ipy_table import make_table, set_cell_style, render, session
+
+
+def test_session_restores_previous_table():
+    make_table([[1, 2]], interactive=False)
+    outer = render()
+    with session():
+        inner = make_table([[3, 4]])
+        assert render() is inner
+        assert inner is not outer
+    assert render() is outer
+
+
+def test_threads_have_independent_tables():
+    results = {}
+    barrier = threading.Barrier(4)
+
+    def worker(index):
+        make_table([[index]], interactive=False)
+        barrier.wait()
+        set_cell_style(0, 0, bold=True)
+        results[index] = render().array[0][0]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {0: 0, 1: 1, 2: 2, 3: 3}
+
+
+def test_asyncio_tasks_have_independent_tables():
+
+    async def build(index):
+        with session():
+            make_table([[index]])
+            await asyncio.sleep(0)
+            return render().array[0][0]
+
+    async def main():
+        return await asyncio.gather(*[build(i) for i in range(4)])
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
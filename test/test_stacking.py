@@ -0,0 +1,123 @@
+import pickle
+
+import pytest
+
+from ipy_table import IpyTable, vstack, hstack, concat
+
+
+def _pair():
+    top = IpyTable([['name', 'qty'], ['apple', 1]])
+    top.apply_theme('basic')
+    bottom = IpyTable([['pear', 2], ['plum', 3]])
+    bottom.set_column_formatter(1, '{:03d}')
+    return top, bottom
+
+
+def test_vstack_renders_one_table():
+    top, bottom = _pair()
+    bottom.set_cell_style(0, 0, row_span=2)
+    stacked = vstack([top, bottom])
+    assert stacked._num_rows == 4
+    assert stacked.array[:] == [['name', 'qty'], ['apple', 1],
+                                ['pear', 2], ['plum', 3]]
+    assert stacked._row_spans == {(2, 0): 2}
+
+    expected = IpyTable([['name', 'qty'], ['apple', 1]])
+    expected.apply_theme('basic')
+    expected.append_rows([['pear', 2], ['plum', 3]])
+    for row in (2, 3):
+        expected._cell_styles[row] = [dict(bottom._cell_styles[row - 2][0]),
+                                      dict(bottom._cell_styles[row - 2][1])]
+    expected._row_spans[(2, 0)] = 2
+    expected.set_column_formatter(1, '{:03d}')
+    assert stacked._repr_html_() == expected._repr_html_()
+    assert stacked._repr_html_().count('<table') == 1
+
+
+def test_hstack_offsets_columns():
+    left = IpyTable([['a'], [1]])
+    right = IpyTable([['b', 'c'], [2, 3]])
+    right.set_cell_style(0, 1, row_span=2)
+    right.set_column_formatter(0, '{:.1f}')
+    stacked = hstack([left, right])
+    assert stacked.array[:] == [['a', 'b', 'c'], [1, 2, 3]]
+    assert stacked._row_spans == {(0, 2): 2}
+    assert stacked._column_formatters == {1: '{:.1f}'}
+    assert concat([left, right], axis=1).array[:] == stacked.array[:]
+
+
+def test_borders_propagate_across_seams():
+    top, bottom = _pair()
+    top.set_row_style(1, thick_border='bottom')
+    bottom.set_row_style(0, no_border='top')
+    stacked = vstack([top, bottom])
+    assert stacked._cell_styles[2][0]['thick_border'] == 'top'
+    assert stacked._cell_styles[1][0]['no_border'] == 'bottom'
+    # The stacked tables are unchanged
+    assert 'thick_border' not in bottom._cell_styles[0][0]
+    assert 'no_border' not in top._cell_styles[1][0]
+
+    left = IpyTable([['a'], [1]])
+    left.set_column_style(0, thick_border='right')
+    stacked = hstack([left, IpyTable([['b'], [2]])])
+    assert stacked._cell_styles[1][1]['thick_border'] == 'left'
+
+
+def test_shares_rows_until_written():
+    top, bottom = _pair()
+    stacked = vstack([top, bottom])
+    assert stacked.array[2] is bottom.array[0]
+    stacked.set_value(2, 0, 'fig')
+    stacked.set_cell_style(0, 0, italic=True)
+    assert bottom.array[0] == ['pear', 2]
+    assert not top._cell_styles[0][0].get('italic')
+    assert pickle.loads(pickle.dumps(stacked)).array[2] == ['fig', 2]
+
+    stacked = vstack([top, bottom])
+    sliced = stacked[1:]
+    bottom.append_rows([['fig', 4]])
+    with pytest.raises(ValueError):
+        stacked.array[2]
+    with pytest.raises(ValueError):
+        sliced._repr_html_()
+
+
+def test_bad_arguments():
+    top, bottom = _pair()
+    with pytest.raises(ValueError):
+        vstack([top, IpyTable([['x']])])
+    with pytest.raises(ValueError):
+        hstack([top, IpyTable([['x']])])
+    with pytest.raises(ValueError):
+        concat([top, bottom], axis=2)
+    with pytest.raises(ValueError):
+        vstack([])
+    other = IpyTable([['x', 1]])
+    other.set_column_formatter(1, '{:.2f}')
+    with pytest.raises(ValueError):
+        vstack([bottom, other])
+
+
+def test_views_of_stacked_tables_keep_seam_borders():
+    top, bottom = _pair()
+    top.set_row_style(1, thick_border='bottom')
+    stacked = vstack([top, bottom])
+    sliced = stacked[1:4]
+    assert sliced._cell_styles[1][0]['thick_border'] == 'top'
+    assert sliced._repr_html_() == stacked.render_rows(1, 4)
+    ordered = stacked.sort_by('qty', descending=True)
+    assert ordered.array[:] == [['name', 'qty'], ['plum', 3], ['pear', 2],
+                                ['apple', 1]]
+    assert ordered._cell_styles[2][0]['thick_border'] == 'top'
+
+
+def test_stacked_summaries_and_revisions_follow_the_tables():
+    top, bottom = _pair()
+    bottom.add_summary_row({1: 'sum'}, header_rows=0)
+    stacked = vstack([top, bottom])
+    assert stacked.array[-1][1] == 5
+    revision = stacked._revision
+    bottom.set_value(0, 1, 10)
+    assert stacked._revision != revision
+    assert '<b>013</b>' in stacked._repr_html_()
+    assert stacked.array[-1][1] == 13
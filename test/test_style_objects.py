@@ -0,0 +1,72 @@
+import pickle
+
+import pytest
+
+import ipy_table
+from ipy_table import IpyTable, RingTable, Style
+
+
+def _table():
+    return IpyTable([['a', 'b', 'c'], [1, 2, 3], [4, 5, 6]])
+
+
+def test_style_is_normalized_immutable_and_hashable():
+    style = Style(bold=True, thick_border='all')
+    assert dict(style) == {'bold': True,
+                           'thick_border': 'left,right,top,bottom'}
+    assert style == Style(thick_border='all', bold=True)
+    assert len(set([style, Style(thick_border='all', bold=True)])) == 1
+    assert style != Style(bold=True)
+    with pytest.raises(AttributeError):
+        style.color = 'Red'
+    assert pickle.loads(pickle.dumps(style)) == style
+    assert repr(Style(italic=True)) == 'Style(italic=True)'
+
+
+def test_style_validation():
+    with pytest.raises(TypeError):
+        Style(thick_border=1)
+    with pytest.raises(ValueError):
+        Style(no_border='middle')
+
+
+def test_combining_styles_merges_borders():
+    combined = (Style(color='Red', thick_border='left') +
+                Style(color='Blue', thick_border='top'))
+    assert dict(combined) == {'color': 'Blue',
+                              'thick_border': 'left,top'}
+
+
+def test_style_applies_like_style_arguments():
+    style = Style(bold=True, thick_border='right,bottom', color='Yellow')
+    with_style = _table()
+    with_args = _table()
+    with_style.set_cell_style(1, 1, style)
+    with_args.set_cell_style(1, 1, **style)
+    with_style.set_row_style(0, style, italic=True)
+    with_args.set_row_style(0, italic=True, **style)
+    with_style.set_column_style(2, style)
+    with_args.set_column_style(2, **style)
+    with_style.set_global_style(style)
+    with_args.set_global_style(**style)
+    assert with_style._repr_html_() == with_args._repr_html_()
+    # The applied style is unchanged
+    assert dict(style) == {'bold': True, 'thick_border': 'right,bottom',
+                           'color': 'Yellow'}
+
+
+def test_style_of_appended_rows_and_interactive_functions():
+    table = _table()
+    table.append_rows([[7, 8, 9]], style=Style(italic=True))
+    assert table._cell_styles[3][0]['italic']
+
+    ring = RingTable(2, header=['a'])
+    ring.push_row([1], style=Style(italic=True))
+    assert ring._cell_styles[1][0]['italic']
+    with pytest.raises(ValueError):
+        ring.set_cell_style(1, 0, Style(row_span=2))
+
+    with ipy_table.session():
+        ipy_table.make_table([[1, 2]])
+        table = ipy_table.set_row_style(0, Style(bold=True))
+        assert table._cell_styles[0][1]['bold']
@@ -0,0 +1,73 @@
+import pytest
+
+from ipy_table import IpyTable, RingTable
+
+
+def _sales_table():
+    return IpyTable([['item', 'qty', 'price'],
+                     ['apple', 1, 2.5],
+                     ['pear', 3, float('nan')],
+                     ['plum', None, 1.0]])
+
+
+def test_aggregates_and_label():
+    table = _sales_table()
+    table.add_summary_row({'qty': 'sum', 'price': 'mean'}, label='Total')
+    table.add_summary_row({1: 'count', 2: 'max'})
+    table._repr_html_()
+    assert table.array[-2:] == [['Total', 4, 1.75], ['', 2, 2.5]]
+    assert table._cell_styles[-2][1]['bold']
+    assert table._cell_styles[-2][1]['thick_border'] == 'top'
+
+    table.add_summary_row({1: 'min', 2: 'min'})
+    restored = IpyTable.from_bytes(table.to_bytes())
+    assert restored._repr_html_() == table._repr_html_()
+    assert restored.array[-1] == ['', 1, 1.0]
+
+
+def test_rows_are_appended_above_summary_rows():
+    table = _sales_table()
+    table.apply_theme('basic')
+    table.add_summary_row({'qty': 'sum'}, label='Total')
+    assert table._cell_styles[-1][0]['color'] == 'AliceBlue'
+    table.append_rows([['fig', 10, 4.0]])
+    table._repr_html_()
+    assert table.array[-2:] == [['fig', 10, 4.0], ['Total', 14, '']]
+    # Theme colors follow the new row parity
+    assert table._cell_styles[-1][0]['color'] == 'Ivory'
+    assert table._cell_styles[-1][0]['bold']
+
+    table.delete_rows(table._num_rows - 1)
+    table.append_rows([['kiwi', 1, 1.0]])
+    assert table.array[-1] == ['kiwi', 1, 1.0]
+
+
+def test_recomputed_only_when_data_changes():
+    calls = []
+
+    def total(values):
+        calls.append(values)
+        return sum(values)
+
+    table = _sales_table()
+    table.add_summary_row({'qty': total})
+    table._repr_html_()
+    table.set_row_style(1, italic=True)
+    table._repr_html_()
+    table.render_rows(1, 3)
+    assert calls == [[1, 3]]
+    table.set_value(1, 1, 5)
+    assert table.render_rows(4, 5).count('<b>8</b>') == 1
+    assert calls == [[1, 3], [5, 3]]
+
+
+def test_bad_arguments():
+    table = _sales_table()
+    with pytest.raises(ValueError):
+        table.add_summary_row({'missing': 'sum'})
+    with pytest.raises(ValueError):
+        table.add_summary_row({1: 'median'})
+    with pytest.raises(TypeError):
+        RingTable(3, header=['a']).add_summary_row({0: 'sum'})
+    with pytest.raises(TypeError):
+        RingTable(3, header=['a']).delete_rows(0)
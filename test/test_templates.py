@@ -0,0 +1,66 @@
+import pickle
+
+import pytest
+
+from ipy_table import IpyTable, TableTemplate
+
+
+def _data(offset):
+    return [['name', 'qty', 'price']] + [
+        ['item %d' % row, row + offset, row * 1.5] for row in range(6)]
+
+
+def _styled(data):
+    table = IpyTable(data)
+    table.apply_theme('basic')
+    table.set_column_style(2, align='right', italic=True)
+    table.set_cell_style(1, 0, row_span=2, thick_border='bottom')
+    table.set_column_formatter(1, '{:03d}')
+    return table
+
+
+def test_renders_like_a_restyled_table():
+    template = _styled(_data(0)).to_template()
+    assert isinstance(template, TableTemplate)
+    assert template.shape == (7, 3)
+    for offset in (10, 20):
+        table = IpyTable.from_template(template, _data(offset))
+        assert table._repr_html_() == _styled(_data(offset))._repr_html_()
+        assert table.render_rows(2, 5) == \
+            _styled(_data(offset)).render_rows(2, 5)
+    # Distinct style rows are stored once
+    assert len(template._row_styles) < 7
+
+
+def test_template_is_independent_of_tables():
+    source = _styled(_data(0))
+    template = source.to_template()
+    source.set_row_style(3, color='Red')
+
+    table = IpyTable.from_template(template, _data(1))
+    table.set_cell_style(4, 1, bold=True)
+    table.append_rows([['extra', 1, 2.0]])
+    assert table._cell_styles[4][1]['bold']
+    other = IpyTable.from_template(template, _data(1))
+    assert other._repr_html_() == _styled(_data(1))._repr_html_()
+    assert pickle.loads(pickle.dumps(other))._repr_html_() == \
+        other._repr_html_()
+
+
+def test_views_of_template_tables_clip_spans():
+    table = IpyTable.from_template(_styled(_data(0)).to_template(),
+                                   _data(0))
+    assert table[2:4]._row_spans == {}
+    assert table[2:4].array[0][0] == 'item 0'
+
+
+def test_shape_is_validated():
+    template = _styled(_data(0)).to_template()
+    with pytest.raises(ValueError):
+        IpyTable.from_template(template, _data(0)[:-1])
+    with pytest.raises(ValueError):
+        IpyTable.from_template(template, [row[:2] for row in _data(0)])
+    table = _styled(_data(0))
+    table.add_summary_row({'qty': 'sum'})
+    with pytest.raises(ValueError):
+        table.to_template()
@@ -0,0 +1,54 @@
+from ipy_table import IpyTable
+
+
+def _status_table(num_rows):
+    statuses = ['ok', 'warning <!>', 'failed']
+    return IpyTable([['status', 'value']] +
+                    [[statuses[row % 3], row * 0.5] for row in range(num_rows)])
+
+
+def test_low_cardinality_column_is_memoized_automatically():
+    table = _status_table(300)
+    plain = _status_table(300)
+    plain.set_column_memoization(0, False)
+    assert table._repr_html_() == plain._repr_html_()
+    info = table.format_memo_info()
+    assert list(info) == [0]
+    assert info[0]['misses'] == 4
+    assert info[0]['hits'] == 297
+
+
+def test_memo_key_includes_style():
+    table = _status_table(6)
+    table.set_column_memoization(0, True)
+    table.set_column_memoization(1, True)
+    table.set_cell_style(2, 0, wrap=True, escape=False)
+    table.set_cell_style(2, 1, float_format='%0.1f')
+    html = table._repr_html_()
+    assert '>warning <!></td>' in html
+    assert '>warning&nbsp;&lt;!&gt;</td>' in html
+    assert '>0.5</td>' in html and '>2.0000</td>' in html
+
+
+def test_memo_eviction_and_unhashable_values():
+    table = IpyTable([[row, [row]] for row in range(10)])
+    table.set_column_memoization(0, True, max_entries=4)
+    table.set_column_memoization(1, True)
+    table._repr_html_()
+    info = table.format_memo_info()
+    assert info[0] == dict(hits=0, misses=10, entries=4, max_entries=4)
+    assert info[1]['entries'] == 0
+
+
+def test_equal_values_which_format_differently():
+    from decimal import Decimal
+    rows = [[-0.0 if row % 2 else 0.0, Decimal('1.00' if row % 2 else '1.0')]
+            for row in range(200)]
+    table = IpyTable(rows)
+    plain = IpyTable(rows)
+    plain.set_column_memoization(0, False)
+    plain.set_column_memoization(1, False)
+    html = table._repr_html_()
+    assert html == plain._repr_html_()
+    assert '>0.0000<' in html and '>-0.0000<' in html
+    assert table.format_memo_info()[0]['entries'] == 2
@@ -0,0 +1,158 @@
+import re
+
+import pytest
+
+from ipy_table import IpyTable, TableView
+
+
+def _cells(html):
+    return re.findall(r'<td[^>]*>(.*?)</td>', html)
+
+
+def _table():
+    table = IpyTable([['name', 'score'],
+                      ['bob', 2],
+                      ['amy', 1],
+                      ['cat', 3],
+                      ['dan', 1]])
+    table.apply_theme('basic')
+    table.set_cell_style(3, 1, bold=True)
+    return table
+
+
+def test_sort_shares_rows_and_styles():
+    table = _table()
+    view = table.sort_by('score', descending=True)
+    assert isinstance(view, TableView)
+    assert view.array[:] == [['name', 'score'], ['cat', 3], ['bob', 2],
+                             ['amy', 1], ['dan', 1]]
+    # Styles follow their rows, and are not copied
+    assert view._cell_styles[1][1] is table._cell_styles[3][1]
+    assert view._cell_styles[1][1]['bold']
+    assert view.sort_by(0)._rows == [0, 2, 1, 3, 4]
+
+
+def test_view_renders_like_an_equivalent_table():
+    table = _table()
+    view = table.filter(lambda row_data: row_data[1] > 1)
+    expected = IpyTable([['name', 'score'], ['bob', 2], ['cat', 3]])
+    expected.apply_theme('basic')
+    expected.set_row_style(2, color='Ivory')
+    expected.set_cell_style(2, 1, bold=True)
+    assert view._repr_html_() == expected._repr_html_()
+    assert table.filter([True, False, False, True]).array[:] == [
+        ['name', 'score'], ['bob', 2], ['dan', 1]]
+
+
+def test_parent_changes_show_through_and_copy_on_write():
+    table = _table()
+    view = table.sort_by(1)
+    revision = view._revision
+    table.set_value(1, 0, 'rob')
+    assert view._revision != revision
+    assert 'rob' in _cells(view._repr_html_())
+
+    view.set_cell_style(1, 0, italic=True)
+    view.set_value(2, 0, 'changed')
+    assert 'italic' not in table._cell_styles[2][0]
+    assert table.array[4][0] == 'dan'
+    assert view.array[1][0] == 'amy'
+    assert view.array[2][0] == 'changed'
+
+
+def test_row_spans_are_clipped():
+    table = _table()
+    table.set_cell_style(1, 0, row_span=3)
+    # Rows 1 and 3 of the span are adjacent in the filtered view
+    view = table.filter([True, False, True, True])
+    assert view._row_spans == {(1, 0): 2}
+    cells = _cells(view._repr_html_())
+    assert cells[2:6] == ['bob', '2', '<b>3</b>', 'dan']
+    # Sorting splits the span; every part shows the spanned value
+    view = table.sort_by(1)
+    assert view._rows == [0, 2, 4, 1, 3]
+    assert view._row_spans == {(3, 0): 2}
+    assert [row_data[0] for row_data in view.array] == [
+        'name', 'bob', 'dan', 'bob', 'cat']
+    assert view._cell_styles[4][0]['suppress']
+
+
+def _grid():
+    table = IpyTable([['a', 'b', 'c', 'd'],
+                      [1, 2, 3, 4],
+                      [5, 6, 7, 8],
+                      [9, 10, 11, 12]])
+    table.set_cell_style(1, 1, column_span=2)
+    table.set_cell_style(2, 0, row_span=2)
+    return table
+
+
+def test_slicing_rows_and_columns():
+    table = _grid()
+    assert table[1:3].array[:] == [[1, 2, 3, 4], [5, 6, 7, 8]]
+    assert table[:, [0, 3]].array[:] == [['a', 'd'], [1, 4], [5, 8],
+                                         [9, 12]]
+    view = table[[True, False, True, True], -2:]
+    assert view.array[:] == [['c', 'd'], [7, 8], [11, 12]]
+    # Views of views index the parent directly
+    assert view[1:, 1]._parent is table
+    assert view[1:, 1].array[:] == [[8], [12]]
+    with pytest.raises(IndexError):
+        table[9]
+    with pytest.raises(IndexError):
+        table[:, [True]]
+
+
+def test_slicing_clips_spans():
+    table = _grid()
+    # The column span of cell (1, 1) is cut by the view's left edge
+    view = table[1:3, 2:]
+    assert _cells(view._repr_html_()) == ['2', '4', '7', '8']
+    assert 'column_span' not in view._cell_styles[0][0]
+    assert table[0:2, 1:].array[1] == [2, 3, 4]
+    assert table[0:2, 1:]._cell_styles[1][0]['column_span'] == 2
+    # The row span of cell (2, 0) is cut by the view's top edge
+    assert table[3:, :1].array[:] == [[5]]
+    assert table[2:, :1]._row_spans == {(0, 0): 2}
+
+
+def test_slice_copy_on_write():
+    table = _grid()
+    view = table[1:, 1:]
+    view.set_global_style(color='Red')
+    view.set_column_formatter(0, '{:03d}')
+    assert 'color' not in table._cell_styles[1][1]
+    assert _cells(view._repr_html_())[0] == '002'
+
+
+def test_views_of_moved_rows_raise():
+    table = _table()
+    table.add_summary_row({1: 'sum'}, label='Total')
+    view = table.sort_by(1)
+    copied = table.sort_by(1)
+    copied.set_value(1, 0, 'copy')
+    table.append_rows([['eve', 9]])
+    with pytest.raises(ValueError):
+        view._repr_html_()
+    with pytest.raises(ValueError):
+        view[1:]
+    assert copied.array[-1][0] == 'Total'
+
+    view = table.filter(lambda row_data: True)
+    table.delete_rows(1)
+    with pytest.raises(ValueError):
+        view.array[-1]
+
+
+def test_sort_ring_table():
+    from ipy_table import RingTable
+    table = RingTable(3, header=['n'])
+    for value in (5, 1, 4, 2):
+        table.push_row([value])
+    view = table.sort_by(0)
+    assert view.array[:] == [['n'], [1], [2], [4]]
+    assert table.array[-1] == [2]
+    assert table.array[1:3] == [[1], [4]]
+    table.push_row([3])
+    with pytest.raises(ValueError):
+        view.array[1]
@@ -0,0 +1,76 @@
+import pytest
+
+from ipy_table import IpyTable, VirtualTable
+from ipy_table.virtual_scroll import LocalFrontend
+
+
+def _table(num_rows):
+    table = IpyTable([['index', 'value']] +
+                     [[row, row * 0.25] for row in range(1, num_rows)])
+    table.apply_theme('basic')
+    return table
+
+
+def test_output_size_does_not_depend_on_table_size():
+    small = VirtualTable(_table(200), window_rows=20)._repr_html_()
+    large = VirtualTable(_table(20000), window_rows=20)._repr_html_()
+    assert abs(len(large) - len(small)) < 100
+    assert small.count('<tr>') == 41
+
+
+def test_window_requests_through_comm():
+    table = _table(1000)
+    virtual_table = VirtualTable(table, window_rows=20)
+    virtual_table._repr_html_()
+    frontend = LocalFrontend(virtual_table.table_id)
+
+    response = frontend.request(101, 141)
+    assert (response['request_id'], response['start'], response['stop']) == (1, 101, 141)
+    assert response['html'] == table.render_rows(101, 141, header_rows=1)
+
+    # Windows are clamped to the table
+    response = frontend.request(990, 1030)
+    assert (response['start'], response['stop']) == (990, 1000)
+
+
+def test_window_cache():
+    table = _table(1000)
+    virtual_table = VirtualTable(table, window_rows=20, cache_windows=2)
+    virtual_table._repr_html_()
+    frontend = LocalFrontend(virtual_table.table_id)
+    frontend.request(21, 61)
+    frontend.request(21, 61)
+    assert virtual_table.window_cache_info() == dict(hits=1, misses=2, windows=2)
+
+    # Modifying the table invalidates the cache
+    table.set_cell_style(30, 0, bold=True)
+    assert '<b>30</b>' in frontend.request(21, 61)['html']
+    assert virtual_table.window_cache_info()['windows'] == 1
+
+
+def test_unknown_table_id():
+    frontend = LocalFrontend('no-such-table')
+    assert 'error' in frontend.comm.sent[0]
+
+
+def test_close_releases_the_table():
+    import gc
+    import weakref
+    from ipy_table.virtual_scroll import _VIRTUAL_TABLES
+
+    table = _table(100)
+    table_ref = weakref.ref(table)
+    virtual_table = VirtualTable(table, window_rows=20)
+    virtual_table._repr_html_()
+    frontend = LocalFrontend(virtual_table.table_id)
+    frontend.request(21, 61)
+    del table
+    virtual_table.close()
+    gc.collect()
+    assert table_ref() is None
+    assert virtual_table.table_id not in _VIRTUAL_TABLES
+    assert frontend.comm.closed
+    assert 'error' in frontend.request(21, 61)
+    assert 'error' in LocalFrontend(virtual_table.table_id).comm.sent[0]
+    with pytest.raises(ValueError):
+        virtual_table.render_window(21, 61)